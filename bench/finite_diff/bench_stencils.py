@@ -0,0 +1,99 @@
+"""Benchmark of the finite difference operators (2D, periodic)
+
+Compares the stencil kernels with the sparse matrix-vector products and the
+vectorized assembly of the sparse matrices with the previous assembly (Python
+loop, only for the smallest sizes)::
+
+  python bench_stencils.py
+  python bench_stencils.py 1e6 1e7 1e8
+
+The stencil kernels are much faster when compiled with Pythran (see
+``fluidsim.operators.op_finitediff2d``). Note that 1e8 points needs a few GB
+of memory.
+
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+import scipy.sparse as sparse
+
+from fluidsim.base.params import Parameters
+from fluidsim.operators.op_finitediff2d import OperatorFiniteDiff2DPeriodic
+
+
+def create_sparse_loop(oper, values, func_i1_mat):
+    """Previous assembly of the sparse matrices (Python double loop)"""
+    size = oper.size
+    nb_values = len(values)
+    data = np.empty(size * nb_values)
+    i0s = np.empty(size * nb_values)
+    i1s = np.empty(size * nb_values)
+    for i0_mat in range(size):
+        for iv, v in enumerate(values):
+            data[nb_values * i0_mat + iv] = v
+            i0s[nb_values * i0_mat + iv] = i0_mat
+            i1s[nb_values * i0_mat + iv] = func_i1_mat(i0_mat, iv)
+    return sparse.coo_matrix((data, (i0s, i1s)), shape=(size, size))
+
+
+def timeit(func, nb_repeat=3):
+    times = []
+    for _ in range(nb_repeat):
+        t0 = perf_counter()
+        func()
+        times.append(perf_counter() - t0)
+    return min(times)
+
+
+def bench(size):
+    n = int(round(np.sqrt(size)))
+    params = Parameters(tag="params", attribs={"ONLY_COARSE_OPER": False})
+    params._set_child("oper", attribs={"nx": n, "ny": n, "Lx": 8, "Ly": 8})
+
+    t0 = perf_counter()
+    oper = OperatorFiniteDiff2DPeriodic(params)
+    t_init = perf_counter() - t0
+    print(f"\nnx = ny = {n} ({n**2:.1e} points)")
+    print(f"  init: {t_init:.3g} s")
+    t0 = perf_counter()
+    for name in ("px", "pxx", "py", "pyy"):
+        getattr(oper, "sparse_" + name)
+    print(f"  vectorized assembly of 4 matrices: {perf_counter() - t0:.3g} s")
+
+    if n**2 <= 1e6:
+        nx = n
+
+        def func_i1_mat(i0_mat, iv):
+            i1 = i0_mat % nx
+            i0 = i0_mat // nx
+            return i0 * nx + (i1 + (1 if iv == 0 else -1)) % nx
+
+        t_loop = timeit(
+            lambda: create_sparse_loop(oper, np.array([1, -1]), func_i1_mat), 1
+        )
+        t_vect = timeit(
+            lambda: oper._create_sparse(np.array([1, -1]), [(0, 1), (0, -1)])
+        )
+        print(
+            f"  assembly 1 matrix: loop {t_loop:.3g} s, vectorized {t_vect:.3g} s"
+        )
+
+    a = np.random.rand(n, n)
+    out = np.empty_like(a)
+    for name in ("px", "pxx", "py", "pyy"):
+        matrix = getattr(oper, "sparse_" + name)
+        method = getattr(oper, name)
+        t_sparse = timeit(lambda: matrix.dot(a.ravel()))
+        t_stencil = timeit(lambda: method(a, out=out))
+        print(
+            f"  {name:3s}: sparse {t_sparse:.3g} s, stencil {t_stencil:.3g} s "
+            f"(speedup {t_sparse / t_stencil:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1e6, 1e7]
+    for size in sizes:
+        bench(size)
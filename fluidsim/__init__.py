@@ -23,6 +23,7 @@ The package is organised in four sub-packages:
 
 """
 
+from importlib import import_module
 from pathlib import Path
 import os
 import sys
@@ -80,34 +81,50 @@ except TypeError:
     # to be able to import for transonic
     path_dir_results = None
 
-from .util import (
-    available_solver_keys,
-    import_module_solver_from_key,
-    import_simul_class_from_key,
-    load_sim_for_plot,
-    load_state_phys_file,
-    modif_resolution_from_dir,
-    modif_resolution_all_dir,
-    modif_resolution_from_dir_memory_efficient,
-    load_for_restart,
-    load_params_simul,
-)
+import fluiddyn
 
-from .base.params import load_params_simul
+from .util.lazy import set_lazy_attribute
 
+# fld.show is defined when fluiddyn.output (and matplotlib) is imported
+set_lazy_attribute(fluiddyn, "show", "fluiddyn.output")
 
-# clean up
-from . import util
+# The subpackages and the functions of fluidsim.util are imported lazily (at
+# first access) to keep "import fluidsim" fast (see fluidsim.util.lazy).
+_subpackages = ("base", "extend_simul", "magic", "operators", "solvers", "util")
+
+_lazy_objects = {
+    "load_ipython_extension": "magic",
+    "load_params_simul": "base.params",
+    # useful alias
+    "load": ("util", "load_sim_for_plot"),
+}
+
+
+def __getattr__(name):
+    if name in _subpackages:
+        return import_module("." + name, __name__)
+    if name in _lazy_objects:
+        name_module = _lazy_objects[name]
+        if isinstance(name_module, tuple):
+            name_module, name_object = name_module
+        else:
+            name_object = name
+    elif name in __all__:
+        name_module, name_object = "util", name
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = import_module("." + name_module, __name__)
+    except ImportError as error:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r} ({error})"
+        )
+    return getattr(module, name_object)
 
-try:
-    from .magic import load_ipython_extension
-except ImportError:
-    pass
 
-del util
+def __dir__():
+    return sorted(set(globals()).union(__all__, _subpackages, _lazy_objects))
 
-# useful alias
-load = load_sim_for_plot
 
 __citation__ = r"""
 @article{fluiddyn,
@@ -11,6 +11,8 @@ Provides:
 
 import numpy as np
 
+from fluiddyn.util import mpi
+
 from dedalus import public as dedalus
 
 
@@ -58,7 +60,67 @@ class OperatorsDedalus2D:
         nx = self.nx_seq = len(self.x_seq)
         ny = self.ny_seq = len(self.y_seq)
 
-        self.shapeX_seq = self.shapeX_loc = (ny, nx)
+        self.shapeX_seq = (ny, nx)
+
+        # Dedalus data are distributed (axes ("x", "z") in Dedalus, reversed
+        # in fluidsim). The local parts of the fields are described as for the
+        # fluidfft operators so that the standard outputs can work directly
+        # on the distributed layouts.
+        dist = self.domain.dist
+        self.shapeX_loc, self.seq_indices_first_X = self._get_local_part(
+            dist.grid_layout
+        )
+        self.shapeK_loc, self.seq_indices_first_K = self._get_local_part(
+            dist.coeff_layout
+        )
+
+        # kx (Fourier) and index of the Chebyshev polynomials of the local
+        # coefficients (axes as the arrays returned by
+        # StatePhysDedalus.get_var_coefs)
+        i0_start, i1_start = self.seq_indices_first_K
+        n0_loc, n1_loc = self.shapeK_loc
+        self.kx_seq = self.domain.bases[0].wavenumbers
+        self.kx_loc = self.kx_seq[i1_start : i1_start + n1_loc]
+        self.nz_modes_seq = self.domain.bases[1].coeff_size
+        self.iz_modes_loc = np.arange(i0_start, i0_start + n0_loc)
+
+    @staticmethod
+    def _get_local_part(layout):
+        """Shape and global indices of the local part (fluidsim order)"""
+        slices = layout.slices(scales=1.0)[::-1]
+        shape_loc = tuple(slice_.stop - slice_.start for slice_ in slices)
+        seq_indices_first = tuple(slice_.start for slice_ in slices)
+        return shape_loc, seq_indices_first
+
+    def gather_Xspace(self, field_loc, root=0):
+        """Gather a field in physical space on one process"""
+        if mpi.nb_proc == 1:
+            return field_loc
+
+        parts = mpi.comm.gather(
+            (self.seq_indices_first_X, np.ascontiguousarray(field_loc)),
+            root=root,
+        )
+        if mpi.rank != root:
+            return None
+
+        field_seq = np.empty(self.shapeX_seq, dtype=field_loc.dtype)
+        for (i0_start, i1_start), part in parts:
+            n0, n1 = part.shape
+            field_seq[i0_start : i0_start + n0, i1_start : i1_start + n1] = part
+        return field_seq
+
+    def compute_means(self, fields_loc):
+        """Global means of distributed fields in physical space (one Allreduce)
+
+        As for the Dedalus flow tools, these are means over the grid points
+        (without quadrature weights).
+
+        """
+        sums = np.array([field.sum() for field in fields_loc], dtype=np.float64)
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, sums, op=mpi.MPI.SUM)
+        return sums / (self.nx_seq * self.ny_seq)
 
     def get_grid1d_seq(self, axe="x"):
 
@@ -1,8 +1,20 @@
 """Module to generate output from Dedalus (:mod:`fluidsim.base.dedalus.output`)
 ==================================================================================
 
+The outputs work directly on the distributed layouts of Dedalus: the spatial
+means and the spectra are computed from the local data and reduced with MPI,
+and the physical fields are saved with parallel HDF5 (when h5py supports MPI)
+from the local parts described by the operator (``shapeX_loc`` and
+``seq_indices_first_X``).
+
 Provides:
 
+.. autosummary::
+   :toctree:
+
+   spatial_means
+   spectra
+
 .. autoclass:: OutputDedalus
    :members:
    :private-members:
@@ -27,8 +39,24 @@ class OutputDedalus(OutputBase):
 
         classes.PhysFields.class_name = "PhysFieldsBase2D"
 
+        classes._set_child(
+            "SpatialMeans",
+            attribs={
+                "module_name": "fluidsim.base.dedalus.output.spatial_means",
+                "class_name": "SpatialMeansDedalus",
+            },
+        )
+
+        classes._set_child(
+            "Spectra",
+            attribs={
+                "module_name": "fluidsim.base.dedalus.output.spectra",
+                "class_name": "SpectraDedalus",
+            },
+        )
+
     def compute_energy(self):
         """Compute the spatially averaged energy."""
         vx = self.sim.state.get_var("vx")
         vz = self.sim.state.get_var("vz")
-        return 0.5 * (vx**2 + vz**2).mean()
+        return self.oper.compute_means([0.5 * (vx**2 + vz**2)])[0]
@@ -0,0 +1,45 @@
+"""Spatial means (:mod:`fluidsim.base.dedalus.output.spatial_means`)
+=====================================================================
+
+Provides:
+
+.. autoclass:: SpatialMeansDedalus
+   :members:
+   :private-members:
+
+"""
+
+from fluiddyn.util import mpi
+
+from fluidsim.base.output.spatial_means import SpatialMeansJSON
+
+
+class SpatialMeansDedalus(SpatialMeansJSON):
+    """Spatial means computed on the distributed grid data of Dedalus
+
+    The local sums are reduced with one ``Allreduce`` (no gathering of the
+    fields).
+
+    """
+
+    def _save_one_time(self):
+        tsim = self.sim.time_stepping.t
+        self.t_last_save = tsim
+
+        get_var = self.sim.state.get_var
+        vx = get_var("vx")
+        vz = get_var("vz")
+        b = get_var("b")
+
+        energy, energy_b, mean_b = self.oper.compute_means(
+            [0.5 * (vx**2 + vz**2), 0.5 * b**2, b]
+        )
+
+        if mpi.rank == 0:
+            result = {"t": tsim, "E": energy, "Eb": energy_b, "b": mean_b}
+        else:
+            result = None
+
+        super()._save_one_time(result)
+        if mpi.rank == 0:
+            self.file.flush()
@@ -0,0 +1,152 @@
+"""Spectra (:mod:`fluidsim.base.dedalus.output.spectra`)
+=========================================================
+
+Provides:
+
+.. autoclass:: SpectraDedalus
+   :members:
+   :private-members:
+
+"""
+
+import numpy as np
+import h5py
+
+from fluiddyn.util import mpi
+
+from fluidsim.base.output.base import SpecificOutput
+
+
+class SpectraDedalus(SpecificOutput):
+    """1D spectra computed on the distributed coefficients of Dedalus
+
+    The spectra are functions of the Fourier wavenumber ``kx`` and of the index
+    of the Chebyshev polynomials (``iz_modes``). Each process accumulates the
+    contributions of its local coefficients in one buffer, which is reduced on
+    the process 0 with one ``Reduce`` (no gathering of the fields).
+
+    """
+
+    _tag = "spectra"
+    _name_file = "spectra1d.h5"
+
+    @classmethod
+    def _complete_params_with_default(cls, params):
+        params.output.periods_save._set_attrib(cls._tag, 0)
+        params.output._set_child(cls._tag, attribs={"HAS_TO_PLOT_SAVED": False})
+
+    def __init__(self, output):
+        oper = output.sim.oper
+        self.nkx = len(oper.kx_seq)
+        self.nz_modes = oper.nz_modes_seq
+        self.deltakx = 2 * np.pi / oper.Lx
+
+        i0_start, i1_start = oper.seq_indices_first_K
+        n0_loc, n1_loc = oper.shapeK_loc
+        self._slice_kx = slice(i1_start, i1_start + n1_loc)
+        self._slice_iz = slice(self.nkx + i0_start, self.nkx + i0_start + n0_loc)
+        # only the modes with kx >= 0 are stored
+        self._weights = np.where(oper.kx_loc == 0, 1.0, 2.0)
+        self._buffer = np.empty((2, self.nkx + self.nz_modes))
+
+        params = output.sim.params
+        super().__init__(
+            output,
+            period_save=params.output.periods_save.spectra,
+            has_to_plot_saved=params.output.spectra.HAS_TO_PLOT_SAVED,
+            arrays_1st_time={
+                "kx": oper.kx_seq,
+                "iz_modes": np.arange(self.nz_modes),
+            },
+        )
+
+    def compute(self):
+        """compute the values at one time."""
+        get_var_coefs = self.sim.state.state_phys.get_var_coefs
+        vx_c = get_var_coefs("vx")
+        vz_c = get_var_coefs("vz")
+        b_c = get_var_coefs("b")
+
+        energies = (
+            0.5 * self._weights * (abs(vx_c) ** 2 + abs(vz_c) ** 2),
+            0.5 * self._weights * abs(b_c) ** 2,
+        )
+
+        buffer = self._buffer
+        buffer.fill(0.0)
+        for spectra, energy in zip(buffer, energies):
+            spectra[self._slice_kx] = energy.sum(axis=0)
+            spectra[self._slice_iz] = energy.sum(axis=1)
+
+        if mpi.nb_proc > 1:
+            if mpi.rank == 0:
+                mpi.comm.Reduce(mpi.MPI.IN_PLACE, buffer, op=mpi.MPI.SUM, root=0)
+            else:
+                mpi.comm.Reduce(buffer, None, op=mpi.MPI.SUM, root=0)
+
+        spectra_E, spectra_Eb = buffer
+        nkx = self.nkx
+        return {
+            "spectrum_kx_E": spectra_E[:nkx] / self.deltakx,
+            "spectrum_kx_Eb": spectra_Eb[:nkx] / self.deltakx,
+            "spectrum_iz_E": spectra_E[nkx:].copy(),
+            "spectrum_iz_Eb": spectra_Eb[nkx:].copy(),
+        }
+
+    def load(self):
+        """Load the spectra saved in the file ``spectra1d.h5``"""
+        with h5py.File(self.path_file, "r") as file:
+            return {
+                key: dataset[...]
+                for key, dataset in file.items()
+                if isinstance(dataset, h5py.Dataset)
+            }
+
+    def load1d_mean(self, tmin=None, tmax=None):
+        """Load the spectra averaged over the times between tmin and tmax"""
+        data = self.load()
+        times = data["times"]
+        if tmin is None:
+            tmin = times.min()
+        if tmax is None:
+            tmax = times.max()
+        cond = (times >= tmin) & (times <= tmax)
+        if not cond.any():
+            raise ValueError(f"No spectra saved for {tmin = } and {tmax = }")
+
+        results = {"kx": data["kx"], "iz_modes": data["iz_modes"]}
+        for key, value in data.items():
+            if key.startswith("spectrum_"):
+                results[key] = value[cond].mean(0)
+        return results
+
+    def plot1d(self, tmin=None, tmax=None, direction="kx"):
+        """Plot the spectra averaged over the times between tmin and tmax
+
+        Parameters
+        ----------
+
+        direction : str
+
+          "kx" (Fourier wavenumber) or "iz" (index of the Chebyshev
+          polynomials).
+
+        """
+        if direction not in ("kx", "iz"):
+            raise ValueError(f"direction should be 'kx' or 'iz' ({direction})")
+        results = self.load1d_mean(tmin, tmax)
+        if direction == "kx":
+            coords = results["kx"]
+            xlabel = "$k_x$"
+        else:
+            coords = results["iz_modes"]
+            xlabel = "index of the Chebyshev polynomials"
+
+        fig, ax = self.output.figure_axe()
+        # the first mode (mean) cannot be plotted in log-log scale
+        for key, label in (("E", "$E$"), ("Eb", "$E_b$")):
+            spectrum = results[f"spectrum_{direction}_{key}"]
+            ax.loglog(coords[1:], spectrum[1:], label=label)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel("spectra")
+        ax.legend()
@@ -26,6 +26,12 @@ class StatePhysDedalus:
         field.set_scales(1.0)
         return field["g"].transpose()
 
+    def get_var_coefs(self, key):
+        """Local part of the coefficients of a field (axes ("z", "x"))"""
+        field = self.dedalus_solver.state[key]
+        field.set_scales(1.0)
+        return field["c"].transpose()
+
     def set_var(self, key, value):
         field = self.dedalus_solver.state[key]
         field.set_scales(1.0)
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+
+import fluiddyn.util.mpi as mpi
+
+from fluidsim.util.testing import TestSimul, classproperty
+
+pytest.importorskip("dedalus")
+
+
+class TestSimulDedalus(TestSimul):
+    @classproperty
+    def Simul(cls):
+        from fluidsim.base.dedalus.solver import Simul
+
+        return Simul
+
+    @classmethod
+    def init_params(cls):
+        super().init_params()
+        params = cls.params
+        params.oper.nx = 16
+        params.oper.nz = 8
+        params.time_stepping.it_end = 4
+        params.time_stepping.deltat0 = 0.01
+
+        periods = params.output.periods_save
+        periods.phys_fields = 0.02
+        periods.spatial_means = 0.01
+        periods.spectra = 0.01
+
+    def test_outputs(self):
+        sim = self.sim
+        oper = sim.oper
+
+        # local parts of the distributed layouts
+        b = sim.state.get_var("b")
+        assert b.shape == oper.shapeX_loc
+        rng = np.random.default_rng(mpi.rank)
+        b[:] = 1e-2 * rng.standard_normal(b.shape)
+        vx = sim.state.get_var("vx")
+        vx[:] = 1e-2 * rng.standard_normal(vx.shape)
+
+        b_seq = oper.gather_Xspace(sim.state.get_var("b"))
+        mean_b = oper.compute_means([sim.state.get_var("b")])[0]
+        if mpi.rank == 0:
+            assert b_seq.shape == oper.shapeX_seq
+            assert np.isclose(mean_b, b_seq.mean())
+
+        sim.time_stepping.start()
+
+        spectra = sim.output.spectra
+        results = spectra.compute()
+        energy = sim.output.compute_energy()
+        b = sim.state.get_var("b")
+        energy_b = oper.compute_means([0.5 * b**2])[0]
+
+        if mpi.rank > 0:
+            return
+
+        assert results["spectrum_kx_E"].shape == (len(oper.kx_seq),)
+        assert results["spectrum_iz_E"].shape == (oper.nz_modes_seq,)
+        assert energy > 0
+        # both spectra are sums over the same coefficients
+        for key in ("E", "Eb"):
+            assert np.isclose(
+                results["spectrum_kx_" + key].sum() * spectra.deltakx,
+                results["spectrum_iz_" + key].sum(),
+            )
+        # Parseval: on the Gauss grid, the mean of T_n**2 is 1 for n = 0 and
+        # 1/2 for n > 0 (the factor 2 for kx > 0 is included in the spectra)
+        weights_iz = np.full(oper.nz_modes_seq, 0.5)
+        weights_iz[0] = 1.0
+        assert np.isclose((weights_iz * results["spectrum_iz_E"]).sum(), energy)
+        assert np.isclose(
+            (weights_iz * results["spectrum_iz_Eb"]).sum(), energy_b
+        )
+
+        df = sim.output.spatial_means.load()
+        assert len(df["t"]) >= 2
+        assert np.all(df["E"] > 0)
+
+        data = spectra.load()
+        assert data["spectrum_kx_Eb"].shape == (
+            len(data["times"]),
+            len(data["kx"]),
+        )
+        means = spectra.load1d_mean()
+        assert np.allclose(means["spectrum_iz_E"], data["spectrum_iz_E"].mean(0))
+        spectra.plot1d()
+        spectra.plot1d(direction="iz")
+
+        set_of_phys_files = sim.output.phys_fields.set_of_phys_files
+        set_of_phys_files.update_times()
+        assert set_of_phys_files.times.size >= 2
+        field, _ = set_of_phys_files.get_field_to_plot(key="b")
+        assert field.shape == oper.shapeX_seq
+        plt.close("all")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,13 +12,15 @@ from math import degrees
 from math import pi
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 
 from fluiddyn.calcul.easypyfft import fftw_grid_size
 
 from fluidsim.base.forcing.specific import TimeCorrelatedRandomPseudoSpectral
 from fluidsim.util import ensure_radians
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+patches = lazy_import("matplotlib.patches")
 
 
 class TimeCorrelatedRandomPseudoSpectralAnisotropic(
@@ -150,6 +150,11 @@ key_forced: {None} or str
     def get_forcing(self):
         return self.forcing_maker.forcing_phys
 
+    def add_forcing_to(self, tendencies):
+        """Add the forcing to the tendencies (in place)"""
+        tendencies += self.get_forcing()
+        return tendencies
+
     def is_initialized(self):
         if hasattr(self.forcing_maker, "is_initialized"):
             return self.forcing_maker.is_initialized
@@ -194,3 +199,21 @@ class ForcingBasePseudoSpectral(ForcingBase):
 
     def get_forcing(self):
         return self.forcing_maker.forcing_fft
+
+    def add_forcing_to(self, tendencies_fft):
+        """Add the forcing to the tendencies (in place)
+
+        If the forcing maker declares a sparse support (attribute
+        ``sparse_indices``, local flat indices of the modes of ``forcing_fft``
+        that can be non-zero), only these modes are added so that the cost is
+        proportional to the number of forced modes.
+
+        """
+        forcing_fft = self.get_forcing()
+        indices = getattr(self.forcing_maker, "sparse_indices", None)
+        if indices is None or not tendencies_fft.flags.c_contiguous:
+            tendencies_fft += forcing_fft
+        else:
+            tendencies_flat = tendencies_fft.reshape(-1)
+            tendencies_flat[indices] += forcing_fft.reshape(-1)[indices]
+        return tendencies_fft
@@ -163,6 +163,7 @@ class KolmogorovFlow(_KolmogorovFlowBase, SpecificForcingPseudoSpectralSimple):
             **{key_forced: amplitude * np.sin(2 * np.pi * ik / length * variable)}
         )
         self.fstate.statespect_from_statephys()
+        self._init_sparse_indices_from_forcing()
 
     def compute(self):
         # nothing to do here
@@ -11,12 +11,14 @@ forcing(x, y, z) = sigma * solid(x, y) * (speed_target - velocity(x, y, z))
 from math import sin, cos, pi
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 
 from fluiddyn.util import mpi
 
 from .specific import SpecificForcingPseudoSpectralSimple as Base
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+animation = lazy_import("matplotlib.animation")
 
 
 def step(x, limit, smoothness):
@@ -110,7 +112,27 @@ class ForcingMilestone(Base):
     @classmethod
     def _complete_params_with_default(cls, params):
         Base._complete_params_with_default(params)
-        milestone = params.forcing._set_child(cls.tag, dict(nx_max=None))
+        milestone = params.forcing._set_child(
+            cls.tag, dict(nx_max=None, nb_phases_solid=0)
+        )
+        milestone._set_doc(
+            """
+nx_max: int or None (default None)
+
+    Number of points (along x) of the coarse grid on which the solid field is
+    computed (the full resolution if None).
+
+nb_phases_solid: int (default 0)
+
+    If > 0, the solid field (at full resolution) is tabulated once for this
+    number of phases over a period of the movement. During the simulation,
+    it is then linearly interpolated in time without communication. The
+    displacement of the objects between 2 phases should be small compared
+    to width_boundary_layers. If 0, the solid field is recomputed at each
+    time step.
+
+"""
+        )
         milestone._set_child(
             "objects",
             dict(
@@ -257,6 +279,76 @@ class ForcingMilestone(Base):
         else:
             raise NotImplementedError
 
+        self._init_solid_phases()
+
+    def _get_period_movement(self):
+        """Period of the movement (None for objects at rest)"""
+        try:
+            return self.period
+        except AttributeError:
+            pass
+        movement = self.params_milestone.movement
+        if movement.type == "uniform":
+            if movement.uniform.speed == 0:
+                return None
+            return self.params.oper.Lx / abs(movement.uniform.speed)
+        elif movement.type == "sinusoidal":
+            return movement.sinusoidal.period
+        raise NotImplementedError
+
+    def _init_solid_phases(self):
+        """Tabulate the solid field (full resolution) over a period"""
+        self._solid_phases = None
+        try:
+            nb_phases = self.params_milestone.nb_phases_solid
+        except AttributeError:
+            # parameters of old simulations
+            return
+        if not nb_phases:
+            return
+
+        self._period_solid = self._get_period_movement()
+        if self._period_solid is None:
+            nb_phases = 1
+            self._period_solid = 1.0
+
+        solid_phases = None
+        for index in range(nb_phases):
+            time = index * self._period_solid / nb_phases
+            solid = self._compute_solid_full(time)
+            if self.ndim == 3:
+                # the solid field does not depend on z
+                solid = solid[0]
+            if solid_phases is None:
+                solid_phases = np.empty((nb_phases,) + solid.shape)
+            solid_phases[index] = solid
+
+        self._solid_phases = solid_phases
+        self._solid_interp = self.sim.oper.create_arrayX(value=0)
+
+    def _compute_solid_full(self, time):
+        """Compute the solid field at full resolution (collective)"""
+        solid, x_coors, y_coors = self.get_solid_field(time)
+        if self._is_using_coarse_oper:
+            solid = self._full_from_coarse(solid)
+        return solid
+
+    def get_solid_full(self, time):
+        """Solid field at full resolution (local array)"""
+        if self._solid_phases is None:
+            return self._compute_solid_full(time)
+
+        nb_phases = self._solid_phases.shape[0]
+        phase = (time % self._period_solid) / self._period_solid * nb_phases
+        index0 = int(phase) % nb_phases
+        index1 = (index0 + 1) % nb_phases
+        weight1 = phase - int(phase)
+
+        solid = self._solid_interp
+        solid[...] = (1 - weight1) * self._solid_phases[index0]
+        solid += weight1 * self._solid_phases[index1]
+        return solid
+
     def get_solid_field(self, time):
 
         if mpi.rank > 0 and (self._is_using_coarse_oper or self.ndim == 3):
@@ -434,10 +526,7 @@ class ForcingMilestone(Base):
         if time is None:
             time = sim.time_stepping.t
 
-        solid, x_coors, y_coors = self.get_solid_field(time)
-
-        if self._is_using_coarse_oper:
-            solid = self._full_from_coarse(solid)
+        solid = self.get_solid_full(time)
 
         ux = sim.state.state_phys.get_var("ux")
         fx = self.sigma * solid * (self.get_speed(time) - ux)
@@ -59,6 +59,8 @@ class SpecificForcing:
     """Base class for specific forcing"""
 
     tag = "specific"
+    # local flat indices of the forced modes (None for dense forcings)
+    sparse_indices = None
 
     @classmethod
     def _complete_params_with_default(cls, params):
@@ -95,6 +97,23 @@ class SpecificForcingPseudoSpectralSimple(SpecificForcing):
     def compute_forcing_fft_each_time(self):
         raise NotImplementedError
 
+    def _init_sparse_indices_from_forcing(self, rtol=1e-14):
+        """Declare a sparse support from the non-zero modes of the forcing
+
+        Only for forcings constant in time. The modes with a modulus smaller
+        than ``rtol`` times the maximum modulus (round-off errors of the FFT)
+        are set to zero.
+
+        """
+        forcing_flat = self.forcing_fft.reshape(-1)
+        modulus = abs(forcing_flat)
+        max_modulus = modulus.max() if modulus.size else 0.0
+        if mpi.nb_proc > 1:
+            max_modulus = mpi.comm.allreduce(max_modulus, op=mpi.MPI.MAX)
+        is_zero = modulus <= rtol * max_modulus
+        forcing_flat[is_zero] = 0.0
+        self.sparse_indices = np.flatnonzero(~is_zero)
+
 
 class InScriptForcingPseudoSpectral(SpecificForcingPseudoSpectralSimple):
     """Forcing maker for forcing defined by the user in the launching script
@@ -240,6 +259,8 @@ class SpecificForcingPseudoSpectralCoarse(SpecificForcing):
                 self.shapeK_loc_coarse, root=0
             )
 
+        self.sparse_indices = self._compute_sparse_indices()
+
     def _create_params_coarse(self, fft_size):
         params_coarse = deepcopy(self.sim.params)
         params_coarse.oper.type_fft = "sequential"
@@ -278,6 +299,30 @@ class SpecificForcingPseudoSpectralCoarse(SpecificForcing):
 
         return COND_NO_F
 
+    def _compute_sparse_indices(self):
+        """Local flat indices of the modes of forcing_fft set from the coarse array
+
+        The other modes of ``forcing_fft`` are always zero.
+
+        """
+        if mpi.rank == 0:
+            oper_coarse = self.oper_coarse
+            probe = np.ones(self.fstate_coarse.state_spect.shape, np.complex128)
+            if len(self.oper.axes) == 2:
+                # these modes have to be zero (see _compute_cond_no_forcing)
+                nkyc, nkxc = self.shapeK_loc_coarse
+                probe[:, nkyc // 2, :] = 0.0
+                probe[:, :, nkxc - 1] = 0.0
+        else:
+            oper_coarse = None
+            probe = None
+
+        probe_full = np.zeros(self.forcing_fft.shape, np.complex128)
+        self.oper.put_coarse_array_in_array_fft(
+            probe, probe_full, oper_coarse, self.shapeK_loc_coarse
+        )
+        return np.flatnonzero(probe_full)
+
     def put_forcingc_in_forcing(self):
         """Copy data from self.fstate_coarse.state_spect into forcing_fft."""
         if mpi.rank == 0:
@@ -51,6 +51,9 @@ class TestKolmo(TestSimulBase):
 
     def test_kolmo(self):
         sim = self.sim
+        if mpi.nb_proc == 1 and sim.params.forcing.type == "kolmogorov_flow":
+            # modes (ik, -ik) along the gradient for the forced variable
+            assert sim.forcing.forcing_maker.sparse_indices.size == 2
         sim.time_stepping.start()
         if mpi.rank == 0:
             self.check_results(sim)
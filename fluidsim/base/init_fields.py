@@ -21,6 +21,7 @@ from fluiddyn.util import mpi
 from fluidsim_core.params import iter_complete_params
 
 from fluidsim.base.setofvariables import SetOfVariables
+from fluidsim.util.philox import compute_random_uniform_phys_loc
 
 
 class InitFieldsBase:
@@ -491,11 +492,20 @@ max: float (default 1.)
 
     def __call__(self):
         state_phys = self.sim.state.state_phys
-        state_phys[...] = (
-            self.sim.params.init_fields.noise.max
-            / 0.5
-            * (np.random.rand(*state_phys.shape) - 0.5)
-        )
+        shapeX_loc = state_phys.shape[1:]
+        oper = getattr(self.sim, "oper", None)
+        shapeX_seq = getattr(oper, "shapeX_seq", None)
+        seq_indices_first_X = getattr(oper, "seq_indices_first_X", None)
+        if shapeX_seq is None or len(shapeX_seq) != len(shapeX_loc):
+            shapeX_seq = seq_indices_first_X = None
+
+        coef = self.sim.params.init_fields.noise.max / 0.5
+        for index in range(state_phys.shape[0]):
+            # same field for any number of processes (counter-based generator)
+            noise = compute_random_uniform_phys_loc(
+                shapeX_loc, shapeX_seq, seq_indices_first_X, stream=index
+            )
+            state_phys[index] = coef * (noise - 0.5)
 
         if hasattr(self.sim.state, "statespect_from_statephys"):
             self.sim.state.statespect_from_statephys()
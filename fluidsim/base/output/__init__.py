@@ -7,6 +7,7 @@ Provides:
    :toctree:
 
    base
+   conservation_diagnostics
    cross_corr3d
    horiz_means
    increments
@@ -25,6 +26,7 @@ Provides:
    spectra3d
    temporal_spectra
    time_signals_fft
+   timings
 
 .. autoclass:: OutputBase
    :members:
@@ -43,13 +45,12 @@ from glob import glob
 import argparse
 
 import h5py
-import matplotlib as mpl
 
-import fluiddyn.output
+from fluidsim.util.lazy import register_import_hook
 
 from .base import OutputBase, OutputBasePseudoSpectral
 
-mpl.rc("axes", titlesize=10)
+register_import_hook("matplotlib", lambda mpl: mpl.rc("axes", titlesize=10))
 
 __all__ = ["OutputBase", "OutputBasePseudoSpectral"]
 
@@ -31,7 +31,6 @@ from warnings import warn
 
 import numpy as np
 import h5py
-import matplotlib.pyplot as plt
 
 import fluiddyn
 from fluiddyn.util import mpi
@@ -42,6 +41,9 @@ from fluidsim_core.params import iter_complete_params
 
 import fluidsim
 from fluidsim.util import open_patient, get_mean_values_from_path
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SimReprMaker(SimReprMakerCore):
@@ -83,6 +85,14 @@ class OutputBase(OutputCore):
             },
         )
 
+        classes._set_child(
+            "Timings",
+            attribs={
+                "module_name": "fluidsim.base.output.timings",
+                "class_name": "Timings",
+            },
+        )
+
     @staticmethod
     def _complete_params_with_default(params, info_solver):
         """This static method is used to complete the *params* container."""
@@ -305,6 +315,9 @@ are called.
                 )
             self.__dict__[Class._tag] = Class(self)
 
+        if "timings" in self.__dict__:
+            self.timings._instrument_outputs()
+
         print_memory_usage("\nMemory usage at the end of init. (equiv. seq.)")
 
         try:
@@ -365,6 +378,13 @@ are called.
             if self.sim.output.phys_fields.t_last_save < self.sim.time_stepping.t:
                 self.phys_fields.save()
 
+        if "timings" in self.__dict__:
+            self.print_stdout(self.timings.make_summary())
+
+        vars_computed = self.sim.state.vars_computed
+        if vars_computed.nb_misses:
+            self.print_stdout(vars_computed.make_summary())
+
         path_run = Path(self.path_run)
         self.print_stdout(
             f"Computation completed in {total_time:8.6g} s\n"
@@ -0,0 +1,131 @@
+"""Conservation diagnostics
+===========================
+
+Provides:
+
+.. autoclass:: ConservationDiagnostics
+    :members:
+    :private-members:
+    :noindex:
+    :undoc-members:
+
+"""
+
+import h5py
+import numpy as np
+
+from fluiddyn.util import mpi
+
+from .base import SpecificOutput
+
+
+class ConservationDiagnostics(SpecificOutput):
+    """Check that the nonlinear terms conserve quadratic quantities
+
+    This output is disabled by default (``params.output.periods_save.
+    conservation_diagnostics = 0``). At each save, the nonlinear tendencies
+    (without forcing) are computed and, for each quadratic quantity, the
+    total transfer :math:`\\sum_k T(k)` and the sum of its absolute value
+    :math:`\\sum_k |T(k)|` are saved in the file
+    ``conservation_diagnostics.h5``. For a quantity conserved by the
+    nonlinear terms, the ratio of these two sums should be of the order of the
+    round-off errors.
+
+    The quadratic quantities are half the square of each spectral variable
+    and, for states containing only the vorticity (2D incompressible flows),
+    the energy. Solvers for which these quantities are not conserved
+    overwrite the method :meth:`compute_transfers` (see
+    :class:`fluidsim.solvers.sphere.sw1l.output.ConservationDiagnosticsSphereSW1L`).
+
+    """
+
+    _tag = "conservation_diagnostics"
+    _name_file = _tag + ".h5"
+
+    @staticmethod
+    def _complete_params_with_default(params):
+        tag = "conservation_diagnostics"
+
+        params.output.periods_save._set_attrib(tag, 0)
+        params.output._set_child(tag, attribs={"HAS_TO_PLOT_SAVED": False})
+
+    def __init__(self, output):
+        params = output.sim.params
+        self._tendencies = None
+        super().__init__(
+            output,
+            period_save=params.output.periods_save.conservation_diagnostics,
+            has_to_plot_saved=params.output.conservation_diagnostics.HAS_TO_PLOT_SAVED,
+        )
+
+    def compute_transfers(self, tendencies):
+        """Compute the transfers (spectral arrays) of the quadratic quantities"""
+        state_spect = self.sim.state.state_spect
+        transfers = {}
+        for key in state_spect.keys:
+            name = key.rsplit("_", 1)[0]
+            transfers[name] = np.real(
+                tendencies.get_var(key).conj() * state_spect.get_var(key)
+            )
+        if list(transfers) == ["rot"]:
+            transfers["energy"] = transfers["rot"] / self.oper.K2_not0
+        return transfers
+
+    def compute(self):
+        """Compute the total transfers at one time"""
+        sim = self.sim
+        self._tendencies = tendencies = sim.tendencies_nonlin(
+            old=self._tendencies
+        )
+        if sim.params.forcing.enable:
+            tendencies -= sim.forcing.get_forcing()
+
+        sum_wavenumbers = self.oper.sum_wavenumbers
+        results = {}
+        for name, transfer in self.compute_transfers(tendencies).items():
+            total = sum_wavenumbers(transfer)
+            total_abs = sum_wavenumbers(abs(transfer))
+            results["T_" + name] = total
+            results["T_abs_" + name] = total_abs
+            results["ratio_" + name] = (
+                abs(total) / total_abs if total_abs > 0 else 0.0
+            )
+        return results
+
+    def _init_online_plot(self):
+        if mpi.rank == 0:
+            self.fig, self.axe = self.output.figure_axe(numfig=6_000_000)
+            self.axe.set_xlabel("$t$")
+            self.axe.set_ylabel(r"$|\sum T| / \sum |T|$")
+            self.axe.set_yscale("log")
+            self.axe.set_title(
+                "conservation diagnostics\n" + self.output.summary_simul
+            )
+
+    def _online_plot_saving(self, dict_results):
+        t = self.sim.time_stepping.t
+        for key, value in dict_results.items():
+            if key.startswith("ratio_"):
+                self.axe.plot(t, max(value, 1e-20), "k.")
+
+    def load(self):
+        """Load the saved data"""
+        with h5py.File(self.path_file, "r") as file:
+            return {
+                key: file[key][...]
+                for key in file.keys()
+                if key == "times" or key.startswith(("T_", "ratio_"))
+            }
+
+    def plot(self):
+        """Plot the ratios |sum T| / sum |T| as a function of time"""
+        data = self.load()
+        times = data["times"]
+        fig, ax = self.output.figure_axe()
+        for key, values in data.items():
+            if key.startswith("ratio_"):
+                ax.semilogy(times, values, label=key[len("ratio_") :])
+        ax.set_xlabel("$t$")
+        ax.set_ylabel(r"$|\sum T| / \sum |T|$")
+        ax.set_title("conservation diagnostics\n" + self.output.summary_simul)
+        ax.legend()
@@ -1,8 +1,19 @@
 """Cross correlations
 =====================
 
+The spectra of the cross correlations of all pairs of state variables (1D, 3D
+and, when they have to be saved, kz-kh spectra) are computed in one pass over
+the Fourier modes by the kernel :func:`compute_spectra_cross_corr`, which
+accumulates the spectra in a preallocated buffer (reduced on the process 0
+with one ``Reduce`` with MPI). The indices and weights of the modes are
+computed once by :func:`compute_indices_modes_spectra3d`.
+
 Provides:
 
+.. autofunction:: compute_indices_modes_spectra3d
+
+.. autofunction:: compute_spectra_cross_corr
+
 .. autoclass:: CrossCorrelations
    :members:
    :private-members:
@@ -16,8 +27,20 @@ import itertools
 
 import numpy as np
 
+from transonic import boost, Array, Transonic
+from fluiddyn.util import mpi
+
+from fluidsim import _is_testing
 from fluidsim.base.output.spectra3d import BaseSpectra
 
+ts = Transonic()
+
+A4c = Array[np.complex128, "4d"]
+Af = Array[np.float64, "3d"]
+Ai = Array[np.int64, "3d"]
+Ai1 = Array[np.int64, "1d"]
+A2f = Array[np.float64, "2d"]
+
 
 def _make_small_key(key):
     small_key = key[:-4]
@@ -26,46 +49,296 @@ def _make_small_key(key):
     return small_key
 
 
+def compute_indices_modes_spectra3d(oper):
+    """Compute the indices and weights of the local modes for the spectra
+
+    The weights (1 or 2) take into account that only the modes with
+    :math:`k_x \\geq 0` are stored (as in ``oper._compute_spectrum3d_loc``).
+    The 1D spectra as a function of :math:`k_y` and :math:`k_z` are folded.
+    For the 3D spectra (indices ``iks``) and the kz-kh spectra (indices
+    ``ikhs``), the value of a mode is shared between the shells ``ik`` and
+    ``ik + 1``, as in ``oper.compute_3dspectrum`` and
+    ``oper.compute_spectrum_kzkh``.
+
+    """
+    ikxs = np.round(oper.Kx / oper.deltakx).astype(np.int64)
+    ikys = np.round(oper.Ky / oper.deltaky).astype(np.int64) % oper.ny_seq
+    ikys = np.minimum(ikys, oper.ny_seq - ikys)
+    ikzs = np.round(oper.Kz / oper.deltakz).astype(np.int64) % oper.nz_seq
+    ikzs = np.minimum(ikzs, oper.nz_seq - ikzs)
+
+    weights = np.full(oper.shapeK_loc, 2.0)
+    weights[ikxs == 0] = 1.0
+    if oper.nx_seq % 2 == 0:
+        weights[ikxs == oper.nx_seq // 2] = 1.0
+
+    def compute_shells(kappa, ks, deltak):
+        nk = len(ks)
+        iks = (kappa / deltak).astype(np.int64)
+        iks_clipped = np.minimum(iks, nk - 1)
+        coefs_share = (kappa - ks[iks_clipped]) / deltak
+        coefs_share[iks >= nk - 1] = 0.0
+        return iks_clipped, coefs_share
+
+    iks, coefs_share = compute_shells(
+        np.sqrt(oper.K2), oper.k_spectra3d, oper.deltak_spectra3d
+    )
+    ikhs, coefs_share_kh = compute_shells(
+        np.sqrt(oper.Kx**2 + oper.Ky**2), oper.kh_spectra, oper.deltakh
+    )
+
+    return {
+        "weights": weights,
+        "ikxs": ikxs,
+        "ikys": ikys,
+        "ikzs": ikzs,
+        "iks": iks,
+        "coefs_share": coefs_share,
+        "ikhs": ikhs,
+        "coefs_share_kh": coefs_share_kh,
+    }
+
+
+@boost
+def compute_spectra_cross_corr(
+    fields_fft: A4c,
+    ivars0: Ai1,
+    ivars1: Ai1,
+    weights: Af,
+    ikxs: Ai,
+    ikys: Ai,
+    ikzs: Ai,
+    iks: Ai,
+    coefs_share: Af,
+    ikhs: Ai,
+    coefs_share_kh: Af,
+    spectra_kx: A2f,
+    spectra_ky: A2f,
+    spectra_kz: A2f,
+    spectra3d: A2f,
+    spectra_kzkh: A2f,
+    with_kzkh: bool,
+):
+    """Accumulate the spectra of the cross correlations in one pass
+
+    The cross correlation of the pair ``ipair`` is
+    ``-Re(conj(fields_fft[ivars0[ipair]]) * fields_fft[ivars1[ipair]])``.
+    The kz-kh spectra are stored as 2d arrays of shape ``(nb_pairs, nkz *
+    nkh)``. The spectra are not divided by the wavenumber steps.
+
+    """
+    n0, n1, n2 = weights.shape
+    nb_pairs = ivars0.size
+    nk = spectra3d.shape[1]
+    nkh = spectra_kzkh.shape[1] // spectra_kz.shape[1]
+    for i0 in range(n0):
+        for i1 in range(n1):
+            for i2 in range(n2):
+                weight = weights[i0, i1, i2]
+                ikx = ikxs[i0, i1, i2]
+                iky = ikys[i0, i1, i2]
+                ikz = ikzs[i0, i1, i2]
+                ik = iks[i0, i1, i2]
+                coef_share = coefs_share[i0, i1, i2]
+                ikh = ikhs[i0, i1, i2]
+                coef_share_kh = coefs_share_kh[i0, i1, i2]
+                for ipair in range(nb_pairs):
+                    field0 = fields_fft[ivars0[ipair], i0, i1, i2]
+                    field1 = fields_fft[ivars1[ipair], i0, i1, i2]
+                    value = -weight * (
+                        field0.real * field1.real + field0.imag * field1.imag
+                    )
+                    spectra_kx[ipair, ikx] += value
+                    spectra_ky[ipair, iky] += value
+                    spectra_kz[ipair, ikz] += value
+                    spectra3d[ipair, ik] += (1 - coef_share) * value
+                    if ik < nk - 1:
+                        spectra3d[ipair, ik + 1] += coef_share * value
+                    if with_kzkh:
+                        index = ikz * nkh + ikh
+                        spectra_kzkh[ipair, index] += (1 - coef_share_kh) * value
+                        if ikh < nkh - 1:
+                            spectra_kzkh[ipair, index + 1] += (
+                                coef_share_kh * value
+                            )
+
+
+def compute_spectra_cross_corr_numpy(
+    fields_fft: A4c,
+    ivars0: Ai1,
+    ivars1: Ai1,
+    weights: Af,
+    ikxs: Ai,
+    ikys: Ai,
+    ikzs: Ai,
+    iks: Ai,
+    coefs_share: Af,
+    ikhs: Ai,
+    coefs_share_kh: Af,
+    spectra_kx: A2f,
+    spectra_ky: A2f,
+    spectra_kz: A2f,
+    spectra3d: A2f,
+    spectra_kzkh: A2f,
+    with_kzkh: bool,
+):
+    nkx = spectra_kx.shape[1]
+    nky = spectra_ky.shape[1]
+    nkz = spectra_kz.shape[1]
+    nk = spectra3d.shape[1]
+    nkzkh = spectra_kzkh.shape[1]
+    nkh = nkzkh // nkz
+    weights = weights.ravel()
+    ikxs = ikxs.ravel()
+    ikys = ikys.ravel()
+    ikzs = ikzs.ravel()
+    iks = iks.ravel()
+    coefs_share = coefs_share.ravel()
+    if with_kzkh:
+        ikhs = ikhs.ravel()
+        coefs_share_kh = coefs_share_kh.ravel()
+        indices_kzkh = ikzs * nkh + ikhs
+        # the value of the modes with ikh == nkh - 1 is not shared
+        coefs_share_kh = np.where(ikhs < nkh - 1, coefs_share_kh, 0.0)
+    for ipair, (ivar0, ivar1) in enumerate(zip(ivars0, ivars1)):
+        field0 = fields_fft[ivar0].ravel()
+        field1 = fields_fft[ivar1].ravel()
+        values = -weights * (
+            field0.real * field1.real + field0.imag * field1.imag
+        )
+        spectra_kx[ipair] += np.bincount(ikxs, values, nkx)
+        spectra_ky[ipair] += np.bincount(ikys, values, nky)
+        spectra_kz[ipair] += np.bincount(ikzs, values, nkz)
+        spectra3d[ipair] += np.bincount(iks, (1 - coefs_share) * values, nk)
+        # coefs_share == 0 for iks == nk - 1
+        spectra3d[ipair, 1:] += np.bincount(iks, coefs_share * values, nk)[:-1]
+        if with_kzkh:
+            spectra_kzkh[ipair] += np.bincount(
+                indices_kzkh, (1 - coefs_share_kh) * values, nkzkh
+            )
+            spectra_kzkh[ipair, 1:] += np.bincount(
+                indices_kzkh, coefs_share_kh * values, nkzkh
+            )[:-1]
+
+
+if not ts.is_transpiling and not ts.is_compiled and not _is_testing:
+    # for example if Pythran is not available
+    compute_spectra_cross_corr = compute_spectra_cross_corr_numpy
+
+
 class CrossCorrelations(BaseSpectra):
 
     _tag = "cross_corr"
 
-    def compute(self):
-        """compute the values at one time."""
+    def _init_buffers(self):
+        oper = self.oper
+        self._indices_modes = compute_indices_modes_spectra3d(oper)
 
         keys = self.sim.state.keys_state_spect
+        keys_spect = list(self.sim.state.state_spect.keys)
+        pairs = list(itertools.combinations(keys, 2))
+        self._keys_cc = [
+            _make_small_key(key0) + _make_small_key(key1) for key0, key1 in pairs
+        ]
+        self._ivars0 = np.array(
+            [keys_spect.index(key0) for key0, _ in pairs], dtype=np.int64
+        )
+        self._ivars1 = np.array(
+            [keys_spect.index(key1) for _, key1 in pairs], dtype=np.int64
+        )
 
-        combinations = itertools.combinations(keys, 2)
+        nb_pairs = len(pairs)
+        sizes = [
+            oper.nkx_spectra,
+            oper.nky_spectra,
+            oper.nkz_spectra,
+            oper.nk_spectra3d,
+            oper.nkz_spectra * oper.nkh_spectra,
+        ]
+        # one buffer for all spectra (one Reduce); the kz-kh spectra are
+        # stored at the end so that they can be excluded from the reduction
+        self._buffer = np.empty(nb_pairs * sum(sizes))
+        self._size_without_kzkh = nb_pairs * sum(sizes[:-1])
+        (
+            self._spectra_kx,
+            self._spectra_ky,
+            self._spectra_kz,
+            self._spectra3d,
+            self._spectra_kzkh,
+        ) = (
+            buffer.reshape(nb_pairs, size)
+            for buffer, size in zip(
+                np.split(self._buffer, nb_pairs * np.cumsum(sizes)[:-1]), sizes
+            )
+        )
 
-        dict_spectra1d = {}
-        dict_spectra3d = {}
+    def compute(self):
+        """compute the values at one time.
 
-        has_to_save_kzkh = self.has_to_save_kzkh()
+        Note that the returned spectra are views on buffers overwritten at
+        each call. They are only meaningful on the process 0.
 
-        if has_to_save_kzkh:
-            dict_kzkh = {}
-        else:
-            dict_kzkh = None
+        """
+        if not hasattr(self, "_buffer"):
+            self._init_buffers()
 
-        for key0, key1 in combinations:
-            key_cc = _make_small_key(key0) + _make_small_key(key1)
+        has_to_save_kzkh = bool(self.has_to_save_kzkh())
 
-            field0 = self.sim.state.get_var(key0)
-            field1 = self.sim.state.get_var(key1)
+        indices = self._indices_modes
+        self._buffer.fill(0.0)
+        compute_spectra_cross_corr(
+            np.asarray(self.sim.state.state_spect),
+            self._ivars0,
+            self._ivars1,
+            indices["weights"],
+            indices["ikxs"],
+            indices["ikys"],
+            indices["ikzs"],
+            indices["iks"],
+            indices["coefs_share"],
+            indices["ikhs"],
+            indices["coefs_share_kh"],
+            self._spectra_kx,
+            self._spectra_ky,
+            self._spectra_kz,
+            self._spectra3d,
+            self._spectra_kzkh,
+            has_to_save_kzkh,
+        )
 
-            cross_corr_tmp = -np.real(field0.conj() * field1)
+        if has_to_save_kzkh:
+            buffer = self._buffer
+        else:
+            buffer = self._buffer[: self._size_without_kzkh]
+
+        if mpi.nb_proc > 1:
+            if mpi.rank == 0:
+                mpi.comm.Reduce(mpi.MPI.IN_PLACE, buffer, op=mpi.MPI.SUM, root=0)
+            else:
+                mpi.comm.Reduce(buffer, None, op=mpi.MPI.SUM, root=0)
 
-            cc_kx, cc_ky, cc_kz = self.oper.compute_1dspectra(cross_corr_tmp)
+        oper = self.oper
+        self._spectra_kx /= oper.deltakx
+        self._spectra_ky /= oper.deltaky
+        self._spectra_kz /= oper.deltakz
+        self._spectra3d /= oper.deltak_spectra3d
 
-            dict_spectra1d[key_cc + "_kx"] = cc_kx
-            dict_spectra1d[key_cc + "_ky"] = cc_ky
-            dict_spectra1d[key_cc + "_kz"] = cc_kz
-            dict_spectra3d[key_cc] = self.oper.compute_3dspectrum(cross_corr_tmp)
+        dict_spectra1d = {}
+        dict_spectra3d = {}
+        if has_to_save_kzkh:
+            self._spectra_kzkh /= oper.deltakz * oper.deltakh
+            dict_kzkh = {}
+        else:
+            dict_kzkh = None
 
+        shape_kzkh = (oper.nkz_spectra, oper.nkh_spectra)
+        for ipair, key_cc in enumerate(self._keys_cc):
+            dict_spectra1d[key_cc + "_kx"] = self._spectra_kx[ipair]
+            dict_spectra1d[key_cc + "_ky"] = self._spectra_ky[ipair]
+            dict_spectra1d[key_cc + "_kz"] = self._spectra_kz[ipair]
+            dict_spectra3d[key_cc] = self._spectra3d[ipair]
             if has_to_save_kzkh:
-                dict_kzkh[key_cc] = self.oper.compute_spectrum_kzkh(
-                    cross_corr_tmp
-                )
+                dict_kzkh[key_cc] = self._spectra_kzkh[ipair].reshape(shape_kzkh)
 
         dict_spectra1d = {"spectra_" + k: v for k, v in dict_spectra1d.items()}
         dict_spectra3d = {"spectra_" + k: v for k, v in dict_spectra3d.items()}
@@ -12,13 +12,15 @@ Provides:
 """
 import numpy as np
 import h5py
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 
 from fluidsim.extend_simul import SimulExtender, extend_simul_class
 
 from .base import SpecificOutput
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 __all__ = ["extend_simul_class", "HorizontalMeans"]
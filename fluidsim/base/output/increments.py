@@ -15,13 +15,21 @@ import h5py
 import os
 import numpy as np
 
-from transonic import boost, Array
+from transonic import boost, Array, Transonic
 from fluiddyn.util import mpi
 
+from fluidsim import _is_testing
+
 from .base import SpecificOutput
 
+ts = Transonic()
+
 Ai = Array[np.int32, "1d"]
+Af1 = Array[float, "1d"]
 Af = Array[float, "2d"]
+Ai2 = Array[np.int64, "2d"]
+Ai2_32 = Array[np.int32, "2d"]
+Af3 = Array[float, "3d"]
 
 
 @boost
@@ -39,6 +47,145 @@ def strfunc_from_pdf(
     return S_order
 
 
+@boost
+def compute_minmax_increments_dim1(var: Af, rxs: Ai):
+    """Compute the min and max of the periodic increments over the dim 1
+
+    The field is swept once for all the separations ``rxs``.
+
+    """
+    n0, n1 = var.shape
+    nrx = rxs.size
+    mins = np.empty(nrx)
+    maxs = np.empty(nrx)
+    mins[:] = np.inf
+    maxs[:] = -np.inf
+    for i0 in range(n0):
+        for i1 in range(n1):
+            value = var[i0, i1]
+            for irx in range(nrx):
+                i1r = i1 + rxs[irx]
+                if i1r >= n1:
+                    i1r -= n1
+                inc = var[i0, i1r] - value
+                if inc < mins[irx]:
+                    mins[irx] = inc
+                if inc > maxs[irx]:
+                    maxs[irx] = inc
+    return mins, maxs
+
+
+@boost
+def compute_histograms_increments_dim1(
+    var: Af, rxs: Ai, mins: Af1, maxs: Af1, hists: Ai2
+):
+    """Accumulate the histograms of the periodic increments over the dim 1
+
+    ``hists`` (shape ``(rxs.size, nbins)``) is incremented in place. As with
+    ``np.histogram``, the last bin includes its right edge.
+
+    """
+    n0, n1 = var.shape
+    nrx = rxs.size
+    nbins = hists.shape[1]
+    coefs = nbins / (maxs - mins)
+    for i0 in range(n0):
+        for i1 in range(n1):
+            value = var[i0, i1]
+            for irx in range(nrx):
+                i1r = i1 + rxs[irx]
+                if i1r >= n1:
+                    i1r -= n1
+                inc = var[i0, i1r] - value
+                ibin = int((inc - mins[irx]) * coefs[irx])
+                if ibin >= nbins:
+                    ibin = nbins - 1
+                elif ibin < 0:
+                    ibin = 0
+                hists[irx, ibin] += 1
+
+
+@boost
+def compute_sums_products_increments_dim1(
+    variables: Af3, indices: Ai2_32, rxs: Ai
+):
+    """Compute the sums of products of 3 periodic increments over the dim 1
+
+    ``variables`` has the shape ``(nb_vars, n0, n1)`` and the row ``iprod``
+    of ``indices`` gives the indices of the 3 variables of the product
+    ``iprod``. The fields are swept once for all the separations ``rxs``.
+    Returns an array of shape ``(indices.shape[0], rxs.size)``.
+
+    """
+    nb_vars, n0, n1 = variables.shape
+    nrx = rxs.size
+    nb_products = indices.shape[0]
+    sums = np.zeros((nb_products, nrx))
+    incs = np.empty(nb_vars)
+    for i0 in range(n0):
+        for i1 in range(n1):
+            for irx in range(nrx):
+                i1r = i1 + rxs[irx]
+                if i1r >= n1:
+                    i1r -= n1
+                for ivar in range(nb_vars):
+                    incs[ivar] = (
+                        variables[ivar, i0, i1r] - variables[ivar, i0, i1]
+                    )
+                for iprod in range(nb_products):
+                    sums[iprod, irx] += (
+                        incs[indices[iprod, 0]]
+                        * incs[indices[iprod, 1]]
+                        * incs[indices[iprod, 2]]
+                    )
+    return sums
+
+
+def _compute_increments_periodic(var, rx):
+    return np.roll(var, -rx, axis=1) - var
+
+
+def compute_minmax_increments_dim1_numpy(var: Af, rxs: Ai):
+    mins = np.empty(rxs.size)
+    maxs = np.empty(rxs.size)
+    for irx, rx in enumerate(rxs):
+        inc = _compute_increments_periodic(var, rx)
+        mins[irx] = inc.min()
+        maxs[irx] = inc.max()
+    return mins, maxs
+
+
+def compute_histograms_increments_dim1_numpy(
+    var: Af, rxs: Ai, mins: Af1, maxs: Af1, hists: Ai2
+):
+    nbins = hists.shape[1]
+    for irx, rx in enumerate(rxs):
+        inc = _compute_increments_periodic(var, rx)
+        hists[irx] += np.histogram(inc, bins=nbins, range=(mins[irx], maxs[irx]))[
+            0
+        ]
+
+
+def compute_sums_products_increments_dim1_numpy(
+    variables: Af3, indices: Ai2_32, rxs: Ai
+):
+    sums = np.empty((indices.shape[0], rxs.size))
+    for irx, rx in enumerate(rxs):
+        incs = np.roll(variables, -rx, axis=2) - variables
+        for iprod, (i0, i1, i2) in enumerate(indices):
+            sums[iprod, irx] = np.sum(incs[i0] * incs[i1] * incs[i2])
+    return sums
+
+
+if not ts.is_transpiling and not ts.is_compiled and not _is_testing:
+    # for example if Pythran is not available
+    compute_minmax_increments_dim1 = compute_minmax_increments_dim1_numpy
+    compute_histograms_increments_dim1 = compute_histograms_increments_dim1_numpy
+    compute_sums_products_increments_dim1 = (
+        compute_sums_products_increments_dim1_numpy
+    )
+
+
 class Increments(SpecificOutput):
     """Handles the saving of pdf of increments."""
 
@@ -116,26 +263,57 @@ class Increments(SpecificOutput):
             self.axe.plot(values_inc + irx, pdf[irx])
 
     def compute(self):
-        """compute the values at one time."""
-        dict_results = {}
-        for key in self.keys_vars_to_compute:
-            var = self.sim.state.get_var(key)
+        """compute the values at one time.
 
-            pdf_var = np.empty([self.nrx, self.nbins])
-            valmin = np.empty([self.nrx])
-            valmax = np.empty([self.nrx])
+        The increments are periodic over the dim 1 (which is not distributed
+        over the processes). For each variable, the field is swept once to
+        compute the ranges of the increments for all separations and once
+        to compute all the histograms. There are only 2 MPI reductions per
+        call (for all variables and separations).
 
-            for irx, rx in enumerate(self.rxs):
-                inc_var = self.oper.compute_increments_dim1(var, rx)
-                (pdf_var[irx], bin_edges_var) = self.oper.pdf_normalized(
-                    inc_var, self.nbins
-                )
-                valmin[irx] = bin_edges_var[0]
-                valmax[irx] = bin_edges_var[self.nbins]
+        """
+        keys = self.keys_vars_to_compute
+        nb_keys = len(keys)
+        rxs = np.ascontiguousarray(self.rxs, dtype=np.int32)
+        nbins = int(self.nbins)
+        variables = [
+            np.ascontiguousarray(self.sim.state.get_var(key), dtype=float)
+            for key in keys
+        ]
+
+        # mins and -maxs (to use only MPI.MIN)
+        mins_maxs = np.empty([nb_keys, 2, self.nrx])
+        for ikey, var in enumerate(variables):
+            mins, maxs = compute_minmax_increments_dim1(var, rxs)
+            mins_maxs[ikey, 0] = mins
+            mins_maxs[ikey, 1] = -maxs
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, mins_maxs, op=mpi.MPI.MIN)
+        valmins = mins_maxs[:, 0]
+        valmaxs = -mins_maxs[:, 1]
+        # same convention as np.histogram for an empty range
+        cond = valmins == valmaxs
+        valmins[cond] -= 0.5
+        valmaxs[cond] += 0.5
+
+        hists = np.zeros([nb_keys, self.nrx, nbins], dtype=np.int64)
+        for ikey, var in enumerate(variables):
+            compute_histograms_increments_dim1(
+                var, rxs, valmins[ikey], valmaxs[ikey], hists[ikey]
+            )
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, hists, op=mpi.MPI.SUM)
+
+        widths_bins = (valmaxs - valmins) / nbins
+        pdfs = hists / (
+            widths_bins[:, :, np.newaxis] * hists.sum(axis=2)[:, :, np.newaxis]
+        )
 
-            dict_results["pdf_delta_" + key] = pdf_var.flatten()
-            dict_results["valmin_" + key] = valmin
-            dict_results["valmax_" + key] = valmax
+        dict_results = {}
+        for ikey, key in enumerate(keys):
+            dict_results["pdf_delta_" + key] = pdfs[ikey].flatten()
+            dict_results["valmin_" + key] = valmins[ikey].copy()
+            dict_results["valmax_" + key] = valmaxs[ikey].copy()
 
         return dict_results
 
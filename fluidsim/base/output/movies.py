@@ -24,12 +24,14 @@ Provides:
 
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import animation
-from matplotlib.widgets import Button
-import mpl_toolkits.axes_grid1
 
 from fluiddyn.util import mpi, is_run_from_jupyter
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+animation = lazy_import("matplotlib.animation")
+widgets = lazy_import("matplotlib.widgets")
+axes_grid1 = lazy_import("mpl_toolkits.axes_grid1")
 
 
 class MoviesBase:
@@ -58,7 +60,7 @@ class MoviesBase:
 
         # see https://stackoverflow.com/a/44989063
         playerax = self.fig.add_axes([0.05, 0.015, 0.22, 0.04])
-        divider = mpl_toolkits.axes_grid1.make_axes_locatable(playerax)
+        divider = axes_grid1.make_axes_locatable(playerax)
         bax = divider.append_axes("right", size="80%", pad=0.05)
         sax = divider.append_axes("right", size="80%", pad=0.05)
         fax = divider.append_axes("right", size="80%", pad=0.05)
@@ -67,7 +69,7 @@ class MoviesBase:
         self._buttons = []
 
         def init_button(ax, label, method):
-            button = Button(ax, label=label)
+            button = widgets.Button(ax, label=label)
             button.on_clicked(method)
             self._buttons.append(button)
 
@@ -17,9 +17,13 @@ Provides:
 
 import re
 import os
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from glob import glob
+from hashlib import sha1
 from pathlib import Path
 from math import isclose
+from warnings import warn
 
 import numpy as np
 import h5py
@@ -31,6 +35,161 @@ from fluidsim.util.output import save_file, h5pack, ext
 from .base import SpecificOutput
 
 
+def _get_index_from_equation(equation, oper=None, ndim=None):
+    """Get the index of the cross-section defined by an equation
+
+    The index can be used for NumPy arrays and h5py datasets (in this case,
+    only the cross-section is read) of 2D ``(y, x)`` or 3D ``(z, y, x)``
+    fields. ``oper`` is needed for equations in physical units (for example
+    "z=1"). ``ndim`` (number of dimensions of the fields) is used to check
+    the equation.
+
+    """
+    if equation is None:
+        return Ellipsis
+
+    for letter in "zyx":
+        if equation.startswith("i" + letter + "="):
+            index = eval(equation[len("i" + letter + "=") :])
+        elif equation.startswith(letter + "="):
+            if oper is None:
+                raise ValueError(
+                    f"The grid is unknown for the equation {equation!r} in "
+                    "physical units. Use an equation with an index (for "
+                    f'example "i{letter}=0") or an object with an output.'
+                )
+            value = eval(equation[len(letter + "=") :])
+            index = abs(oper.get_grid1d_seq(letter) - value).argmin()
+        else:
+            continue
+
+        # number of axes after the axis of the letter
+        nb_axes_after = "xyz".index(letter)
+        if ndim is not None and nb_axes_after >= ndim:
+            raise ValueError(
+                f"Equation {equation!r} incompatible with {ndim}D fields"
+            )
+        return (Ellipsis, index) + nb_axes_after * (slice(None),)
+
+    raise NotImplementedError
+
+
+def _get_signatures_files(path_files):
+    """Modification times (ns) and sizes of files (to detect rewritten files)"""
+    signatures = np.empty((len(path_files), 2), dtype=np.int64)
+    for index, path_file in enumerate(path_files):
+        stat = os.stat(path_file)
+        signatures[index] = stat.st_mtime_ns, stat.st_size
+    return signatures
+
+
+def _is_cache_valid(group, times, signatures):
+    """Check that a cached time average corresponds to the files"""
+    return (
+        "signatures" in group
+        and np.array_equal(group["times"][...], times)
+        and np.array_equal(group["signatures"][...], signatures)
+    )
+
+
+def _compute_time_stats_files(path_files, keys, index):
+    """Compute the running means and sums of squared deviations (Welford)"""
+    nb_files = 0
+    means = {}
+    sums_sq_dev = {}
+    for path_file in path_files:
+        with h5py.File(path_file, "r") as file:
+            group_state_phys = file["state_phys"]
+            nb_files += 1
+            for key in keys:
+                field = np.asarray(group_state_phys[key][index], dtype=float)
+                if nb_files == 1:
+                    means[key] = field
+                    sums_sq_dev[key] = np.zeros_like(field)
+                    continue
+                delta = field - means[key]
+                means[key] += delta / nb_files
+                sums_sq_dev[key] += delta * (field - means[key])
+    return nb_files, means, sums_sq_dev
+
+
+def _combine_time_stats(stats):
+    """Combine partial statistics (parallel algorithm of Chan et al.)"""
+    nb_files = 0
+    means = sums_sq_dev = None
+    for nb_files_b, means_b, sums_sq_dev_b in stats:
+        if nb_files_b == 0:
+            continue
+        if nb_files == 0:
+            nb_files, means, sums_sq_dev = nb_files_b, means_b, sums_sq_dev_b
+            continue
+        nb_files_ab = nb_files + nb_files_b
+        for key, mean in means.items():
+            delta = means_b[key] - mean
+            means[key] = mean + delta * nb_files_b / nb_files_ab
+            sums_sq_dev[key] = (
+                sums_sq_dev[key]
+                + sums_sq_dev_b[key]
+                + delta**2 * nb_files * nb_files_b / nb_files_ab
+            )
+        nb_files = nb_files_ab
+    return nb_files, means, sums_sq_dev
+
+
+def _read_infos_phys_file(path_file):
+    """Read the metadata of a state_phys file
+
+    The offsets (in bytes) of the contiguous datasets are used to read them
+    without the HDF5 library (``None`` for chunked datasets).
+
+    """
+    with h5py.File(path_file, "r") as file:
+        group_state_phys = file["state_phys"]
+        time = float(group_state_phys.attrs["time"])
+        datasets = {
+            key: [list(dset.shape), dset.dtype.str, dset.id.get_offset()]
+            for key, dset in group_state_phys.items()
+            if isinstance(dset, h5py.Dataset)
+        }
+    stat = os.stat(path_file)
+    return {
+        "time": time,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "datasets": datasets,
+    }
+
+
+def _read_region_phys_file(path_file, infos, keys, index):
+    """Read a region of fields saved in a state_phys file
+
+    Contiguous datasets are read through a memory map at their offset in the
+    file (only the pages containing the region are read, without the global
+    lock of h5py). The other datasets are read with a h5py hyperslab
+    selection.
+
+    """
+    fields = {}
+    keys_h5py = []
+    for key in keys:
+        shape, dtype, offset = infos["datasets"][key]
+        if offset is None:
+            keys_h5py.append(key)
+            continue
+        dtype = np.dtype(dtype)
+        field = np.memmap(
+            path_file, dtype=dtype, mode="r", offset=offset, shape=tuple(shape)
+        )
+        fields[key] = np.array(field[index], dtype=dtype.newbyteorder("="))
+        del field
+    if keys_h5py:
+        with h5py.File(path_file, "r") as file:
+            group_state_phys = file["state_phys"]
+            for key in keys_h5py:
+                fields[key] = group_state_phys[key][index]
+    return fields
+
+
 class PhysFieldsBase(SpecificOutput):
     """Manage the output of physical fields."""
 
@@ -256,32 +415,168 @@ class PhysFieldsBase(SpecificOutput):
         if equation is None:
             return field, key_field
 
-        elif equation.startswith("iz="):
-            iz = eval(equation[len("iz=") :])
-            field = field[iz, ...]
-        elif equation.startswith("z="):
-            z = eval(equation[len("z=") :])
-            iz = abs(self.output.sim.oper.get_grid1d_seq("z") - z).argmin()
-            field = field[iz, ...]
-        elif equation.startswith("iy="):
-            iy = eval(equation[len("iy=") :])
-            field = field[:, iy, :]
-        elif equation.startswith("y="):
-            y = eval(equation[len("y=") :])
-            iy = abs(self.output.sim.oper.get_grid1d_seq("y") - y).argmin()
-            field = field[:, iy, :]
-        elif equation.startswith("ix="):
-            ix = eval(equation[len("ix=") :])
-            field = field[..., ix]
-        elif equation.startswith("x="):
-            x = eval(equation[len("x=") :])
-            ix = abs(self.output.sim.oper.get_grid1d_seq("x") - x).argmin()
-            field = field[..., ix]
-        else:
-            raise NotImplementedError
+        field = field[_get_index_from_equation(equation, self.oper, field.ndim)]
 
         return field, key_field
 
+    def compute_time_average(
+        self,
+        keys,
+        tmin=None,
+        tmax=None,
+        equation=None,
+        nb_workers=None,
+        use_cache=True,
+    ):
+        """Compute the time average and variance of fields saved in files
+
+        Only the cross-section defined by ``equation`` is read from the files
+        (hyperslab selection). The files are distributed over the MPI
+        processes or, for sequential runs, over ``nb_workers`` processes. The
+        results are cached in the file ``time_averages.h5`` in the directory of
+        the run so that the same average is not computed twice (a cached
+        average is recomputed if one of the files has been modified).
+
+        Parameters
+        ----------
+
+        keys : str or sequence of str
+
+          Keys of the fields (saved in the files).
+
+        tmin : number, optional
+
+        tmax : number, optional
+
+        equation : str, optional
+
+          Equation of the cross-section (for example "iz=0" or "y=1.").
+          By default, the cross-section used for the plots.
+
+        nb_workers : int, optional
+
+          Number of processes used for sequential runs.
+
+        use_cache : bool, optional
+
+        Returns
+        -------
+
+        means : dict
+
+        variances : dict
+
+        times : np.ndarray
+
+          Times of the files used for the average.
+
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        keys = list(keys)
+        if equation is None:
+            equation = self._equation
+
+        set_of_phys_files = self.set_of_phys_files
+        set_of_phys_files.update_times()
+        times = set_of_phys_files.times
+        if times.size == 0:
+            raise FileNotFoundError(
+                "No state_phys files were detected in directory: "
+                f"{set_of_phys_files.path_dir}"
+            )
+        if tmin is None:
+            tmin = times.min()
+        if tmax is None:
+            tmax = times.max()
+        cond = (times >= tmin) & (times <= tmax)
+        if not cond.any():
+            raise ValueError(f"No state_phys files for {tmin = } and {tmax = }")
+        times = times[cond]
+        path_files = [
+            path
+            for path, is_used in zip(set_of_phys_files.path_files, cond)
+            if is_used
+        ]
+
+        path_cache = os.path.join(set_of_phys_files.path_dir, "time_averages.h5")
+        description = f"{equation}, t={times[0]:.6g}-{times[-1]:.6g}"
+        # the equation can contain "/" (separator of the HDF5 groups)
+        name_group = "average_" + sha1(description.encode()).hexdigest()[:16]
+
+        means = {}
+        variances = {}
+        signatures = None
+        if use_cache and mpi.rank == 0:
+            signatures = _get_signatures_files(path_files)
+        if use_cache and mpi.rank == 0 and os.path.exists(path_cache):
+            with h5py.File(path_cache, "r") as file:
+                if name_group in file:
+                    group = file[name_group]
+                    if _is_cache_valid(group, times, signatures):
+                        for key in keys:
+                            if "mean_" + key in group:
+                                means[key] = group["mean_" + key][...]
+                                variances[key] = group["var_" + key][...]
+        if mpi.nb_proc > 1:
+            means, variances = mpi.comm.bcast((means, variances))
+
+        keys_to_compute = [key for key in keys if key not in means]
+        if not keys_to_compute:
+            return means, variances, times
+
+        index = _get_index_from_equation(equation, self.oper)
+        if mpi.nb_proc > 1:
+            stats_loc = _compute_time_stats_files(
+                path_files[mpi.rank :: mpi.nb_proc], keys_to_compute, index
+            )
+            stats = mpi.comm.allgather(stats_loc)
+        elif nb_workers is not None and nb_workers > 1:
+            nb_workers = min(nb_workers, len(path_files))
+            with ProcessPoolExecutor(nb_workers) as executor:
+                stats = list(
+                    executor.map(
+                        _compute_time_stats_files,
+                        [path_files[i::nb_workers] for i in range(nb_workers)],
+                        [keys_to_compute] * nb_workers,
+                        [index] * nb_workers,
+                    )
+                )
+        else:
+            stats = [
+                _compute_time_stats_files(path_files, keys_to_compute, index)
+            ]
+
+        nb_files, means_computed, sums_sq_dev = _combine_time_stats(stats)
+        for key in keys_to_compute:
+            means[key] = means_computed[key]
+            variances[key] = sums_sq_dev[key] / nb_files
+
+        if use_cache and mpi.rank == 0:
+            try:
+                with h5py.File(path_cache, "a") as file:
+                    if name_group in file and not _is_cache_valid(
+                        file[name_group], times, signatures
+                    ):
+                        del file[name_group]
+                    group = file.require_group(name_group)
+                    if "times" not in group:
+                        group.attrs["description"] = description
+                        group.create_dataset("times", data=times)
+                        group.create_dataset("signatures", data=signatures)
+                    for key in keys_to_compute:
+                        for name, arr in (
+                            ("mean_" + key, means[key]),
+                            ("var_" + key, variances[key]),
+                        ):
+                            if name in group:
+                                del group[name]
+                            group.create_dataset(name, data=arr)
+            except OSError:
+                warn(f"Cannot write the cache file {path_cache}")
+
+        return means, variances, times
+
 
 def time_from_path(path):
     """Regular expression search to extract time from filename."""
@@ -385,41 +680,164 @@ class SetOfPhysFieldFiles:
         with h5py.File(self.path_files[idx_time], "r") as file:
             time = file["state_phys"].attrs["time"]
             dset = file["state_phys"][key]
+            oper = None if self.output is None else self.output.sim.oper
+            return dset[_get_index_from_equation(equation, oper, dset.ndim)], time
 
-            if equation is None:
-                return dset[...], time
-
-            if equation.startswith("iz="):
-                iz = eval(equation[len("iz=") :])
-                return dset[iz, ...], time
+    def get_closest_time_file(self, time):
+        """Find the index and value of the closest actual time of the field."""
+        idx = np.abs(self.times - time).argmin()
+        return idx, self.times[idx]
 
-            elif equation.startswith("z="):
-                z = eval(equation[len("z=") :])
-                iz = abs(self.output.sim.oper.get_grid1d_seq("z") - z).argmin()
-                return dset[iz, ...], time
+    def update_index(self, nb_workers=None):
+        """Update the index of the files (times, shapes, dtypes and offsets)
 
-            elif equation.startswith("iy="):
-                iy = eval(equation[len("iy=") :])
-                return dset[:, iy, :], time
+        The index is cached in the file ``state_phys_index.json`` of the
+        directory of the run. Only the new or modified files are opened.
 
-            elif equation.startswith("y="):
-                y = eval(equation[len("y=") :])
-                iy = abs(self.output.sim.oper.get_grid1d_seq("y") - y).argmin()
-                return dset[:, iy, :], time
+        Returns
+        -------
 
-            elif equation.startswith("ix="):
-                ix = eval(equation[len("ix=") :])
-                return dset[..., ix], time
+        infos_files : dict
 
-            elif equation.startswith("x="):
-                x = eval(equation[len("x=") :])
-                ix = abs(self.output.sim.oper.get_grid1d_seq("x") - x).argmin()
-                return dset[..., ix], time
+          ``{name_file: infos}`` for the state_phys files of the directory.
 
+        """
+        self.update_times()
+        path_index = os.path.join(self.path_dir, "state_phys_index.json")
+        try:
+            with open(path_index) as file:
+                infos_files_old = json.load(file)
+        except (OSError, ValueError):
+            infos_files_old = {}
+
+        infos_files = {}
+        paths_to_read = []
+        for path_file in self.path_files:
+            name_file = os.path.basename(path_file)
+            infos = infos_files_old.get(name_file)
+            stat = os.stat(path_file)
+            if (
+                infos is None
+                or infos["size"] != stat.st_size
+                or infos["mtime"] != stat.st_mtime
+            ):
+                paths_to_read.append(path_file)
             else:
-                raise NotImplementedError
+                infos_files[name_file] = infos
+
+        if not paths_to_read and len(infos_files) == len(infos_files_old):
+            return infos_files
+
+        with ThreadPoolExecutor(nb_workers) as executor:
+            for path_file, infos in zip(
+                paths_to_read,
+                executor.map(_read_infos_phys_file, paths_to_read),
+            ):
+                infos_files[os.path.basename(path_file)] = infos
+
+        infos_files = dict(sorted(infos_files.items()))
+        path_tmp = path_index + f".tmp{os.getpid()}"
+        try:
+            with open(path_tmp, "w") as file:
+                json.dump(infos_files, file)
+            os.replace(path_tmp, path_index)
+        except OSError:
+            warn(f"Cannot write the index file {path_index}")
+        return infos_files
+
+    def get_timeseries(
+        self, keys, region=None, tmin=None, tmax=None, nb_workers=None
+    ):
+        """Get the time series of fields in a region (points, lines, planes,
+        subboxes)
 
-    def get_closest_time_file(self, time):
-        """Find the index and value of the closest actual time of the field."""
-        idx = np.abs(self.times - time).argmin()
-        return idx, self.times[idx]
+        Only the region is read from each file, once for all the keys. The
+        metadata of the files are taken from a small index cached in the
+        directory of the run (see :func:`update_index`) and the files are read
+        by a pool of threads.
+
+        Parameters
+        ----------
+
+        keys : str or sequence of str
+
+          Keys of the fields (saved in the files).
+
+        region : tuple or str, optional
+
+          Index in the global arrays (for example ``(iz, iy, ix)`` for a point
+          or ``(iz, slice(None), ix)`` for a line) or equation of a
+          cross-section (for example "iy=0" or "z=1."). Equations in physical
+          units need an object created with an output (which provides the
+          grid). By default, the whole fields.
+
+        tmin : number, optional
+
+        tmax : number, optional
+
+        nb_workers : int, optional
+
+          Number of threads (by default chosen by
+          :class:`concurrent.futures.ThreadPoolExecutor`).
+
+        Returns
+        -------
+
+        times : np.ndarray
+
+        series : dict
+
+          Arrays of shape ``(times.size,) + shape_region``.
+
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        keys = list(keys)
+
+        infos_files = self.update_index(nb_workers)
+        if not infos_files:
+            raise FileNotFoundError(
+                "No state_phys files were detected in directory: "
+                f"{self.path_dir}"
+            )
+        items = sorted(infos_files.items(), key=lambda item: item[1]["time"])
+        times = np.array([infos["time"] for _, infos in items])
+        if tmin is None:
+            tmin = times.min()
+        if tmax is None:
+            tmax = times.max()
+        cond = (times >= tmin) & (times <= tmax)
+        if not cond.any():
+            raise ValueError(f"No state_phys files for {tmin = } and {tmax = }")
+        times = times[cond]
+        items = [item for item, is_used in zip(items, cond) if is_used]
+
+        keys_missing = set(keys).difference(items[0][1]["datasets"])
+        if keys_missing:
+            raise ValueError(f"Fields {keys_missing} not saved in the files")
+
+        if isinstance(region, str):
+            oper = None if self.output is None else self.output.sim.oper
+            ndim = len(items[0][1]["datasets"][keys[0]][0])
+            index = _get_index_from_equation(region, oper, ndim)
+        elif region is None:
+            index = Ellipsis
+        else:
+            index = region
+
+        def read(item):
+            name_file, infos = item
+            path_file = os.path.join(self.path_dir, name_file)
+            return _read_region_phys_file(path_file, infos, keys, index)
+
+        if nb_workers == 1:
+            fields_files = list(map(read, items))
+        else:
+            with ThreadPoolExecutor(nb_workers) as executor:
+                fields_files = list(executor.map(read, items))
+
+        series = {
+            key: np.array([fields[key] for fields in fields_files])
+            for key in keys
+        }
+        return times, series
@@ -19,14 +19,16 @@ import os
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
 
 from fluiddyn.util import mpi
 from .movies import MoviesBase2D
 from ..params import Parameters
 
 from .phys_fields import PhysFieldsBase
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+ticker = lazy_import("matplotlib.ticker")
 
 
 class MoviesBasePhysFields2D(MoviesBase2D):
@@ -127,7 +129,7 @@ class MoviesBasePhysFields2D(MoviesBase2D):
             ax2.set_ylabel("E", labelpad=0.1)
 
             # Format of the ticks in ylabel
-            ax2.yaxis.set_major_formatter(FormatStrFormatter("%.4f"))
+            ax2.yaxis.set_major_formatter(ticker.FormatStrFormatter("%.4f"))
 
             ax2.set_xlim(0, self._ani_spatial_means_t.max())
             # Correct visualization inset_animation 10% of the difference
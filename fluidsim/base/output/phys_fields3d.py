@@ -16,11 +16,13 @@ Provides:
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 
 from .phys_fields2d import MoviesBasePhysFields2D, PhysFieldsBase2D
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 def _get_xylabels_from_equation(equation):
@@ -367,35 +369,14 @@ class PhysFieldsBase3D(PhysFieldsBase2D):
             )
             raise ValueError(error_message)
 
-        # get times for average
-        times_avg = times[(times >= tmin) & (times <= tmax)]
-
-        # initialize
-        time = times_avg[0]
-        field_onetime, time = self.get_field_to_plot(
-            key=key_field, time=time, equation=equation
-        )
-        field_avg = np.zeros_like(field_onetime)
-        vecx_avg = np.zeros_like(field_onetime)
-        vecy_avg = np.zeros_like(field_onetime)
-        # time average
-        for time in times_avg:
-            field_onetime, time = self.get_field_to_plot(
-                key=key_field, time=time, equation=equation
-            )
-            field_avg += field_onetime
-            if QUIVER:
-                field_onetime, time = self.get_field_to_plot(
-                    key=vecx, time=time, equation=equation
-                )
-                vecx_avg += field_onetime
-                field_onetime, time = self.get_field_to_plot(
-                    key=vecy, time=time, equation=equation
-                )
-                vecy_avg += field_onetime
-        field_avg /= times_avg.size
-        vecx_avg /= times_avg.size
-        vecy_avg /= times_avg.size
+        keys = [key_field]
+        if QUIVER:
+            keys.extend([vecx, vecy])
+        means, _, _ = self.compute_time_average(keys, tmin, tmax, equation)
+        field_avg = means[key_field]
+        if QUIVER:
+            vecx_avg = means[vecx]
+            vecy_avg = means[vecy]
 
         # plot
         if mpi.rank == 0:
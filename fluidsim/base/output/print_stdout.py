@@ -12,16 +12,31 @@ Provides:
 """
 
 from time import time
+import atexit
 import os
+import signal
 import sys
+import threading
 from datetime import timedelta
+from textwrap import dedent
+from warnings import warn
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi, print_memory_usage
 
 from fluidsim.util import times_start_last_from_path
+from fluidsim.util.util import dtype_records_stdout
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+
+# signals whose default action (termination) is kept after synchronization
+_signums_terminating = {
+    getattr(signal, name)
+    for name in ("SIGTERM", "SIGHUP", "SIGXCPU")
+    if hasattr(signal, name)
+}
 
 
 class PrintStdOutBase:
@@ -34,6 +49,42 @@ class PrintStdOutBase:
     @staticmethod
     def _complete_params_with_default(params):
         params.output.periods_print._set_attrib("print_stdout", 1.0)
+        p_print_stdout = params.output._set_child(
+            "print_stdout",
+            attribs={
+                "period_sync": 0.0,
+                "signals_sync": "",
+                "save_records": False,
+            },
+        )
+        p_print_stdout._set_doc(
+            dedent(
+                """
+                    period_sync : float (0.0)
+
+                      Minimum clock time (in s) between two synchronizations of
+                      the file stdout.txt (write of the buffered text, flush
+                      and fsync). With 0, the file is synchronized at each
+                      print. The file is always synchronized at the end of the
+                      simulation.
+
+                    signals_sync : str ("")
+
+                      Names of signals (for example "SIGUSR1 SIGTERM") for
+                      which the files are synchronized before the previous
+                      handler is called (the termination is kept for SIGTERM,
+                      SIGHUP and SIGXCPU). SIGUSR2 cannot be used since it is
+                      handled by the time stepping to stop the simulation (the
+                      files are then synchronized at the end of the simulation).
+
+                    save_records : bool (False)
+
+                      If True, structured records of the printed time steps
+                      (see :data:`fluidsim.util.util.dtype_records_stdout`)
+                      are saved in the binary file stdout_records.bin.
+        """
+            )
+        )
 
     def __init__(self, output):
         sim = output.sim
@@ -53,6 +104,26 @@ class PrintStdOutBase:
         self.period_print = params.output.periods_print.print_stdout
 
         self.path_file = self.output.path_run + "/stdout.txt"
+        self.path_file_records = self.output.path_run + "/stdout_records.bin"
+
+        try:
+            p_print_stdout = params.output.print_stdout
+        except AttributeError:
+            # parameters of old simulations
+            self.period_sync = 0.0
+            signals_sync = ""
+            self.save_records = False
+        else:
+            self.period_sync = p_print_stdout.period_sync
+            signals_sync = p_print_stdout.signals_sync
+            self.save_records = p_print_stdout.save_records
+
+        self._buffer = []
+        self._buffer_records = []
+        self._time_last_sync = time()
+        self._duration_left = None
+        self._previous_signal_handlers = {}
+        self._is_syncing = False
 
         if mpi.rank == 0 and self.output._has_to_save:
             if not os.path.exists(self.path_file):
@@ -60,6 +131,39 @@ class PrintStdOutBase:
             else:
                 self.file = open(self.path_file, "r+")
                 self.file.seek(0, 2)  # go to the end of the file
+            if self.save_records:
+                self.file_records = open(self.path_file_records, "ab")
+            if signals_sync:
+                self._init_signals_sync(signals_sync.split())
+            if self.period_sync > 0:
+                # not to lose the buffered text if the simulation crashes
+                atexit.register(self.sync)
+
+    def _init_signals_sync(self, names_signals):
+        if threading.current_thread() is not threading.main_thread():
+            # signal handlers can only be set in the main thread
+            return
+        for name in names_signals:
+            if name == "SIGUSR2":
+                warn(
+                    "SIGUSR2 is used by the time stepping to stop the "
+                    "simulation and cannot be used in signals_sync"
+                )
+                continue
+            signum = getattr(signal, name)
+            self._previous_signal_handlers[signum] = signal.signal(
+                signum, self._handle_signal
+            )
+
+    def _handle_signal(self, signum, frame):
+        self.sync()
+        previous = self._previous_signal_handlers.get(signum)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL and signum in _signums_terminating:
+            # the default action (termination)
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
 
     def complete_init_with_state(self):
 
@@ -79,9 +183,53 @@ class PrintStdOutBase:
             print(to_print, end=end)
             sys.stdout.flush()
             if self.output._has_to_save:
-                self.file.write(to_print + end)
-                self.file.flush()
-                os.fsync(self.file.fileno())
+                self._buffer.append(to_print + end)
+                if (
+                    self.period_sync == 0
+                    or time() - self._time_last_sync >= self.period_sync
+                ):
+                    self.sync()
+
+    def sync(self):
+        """Write the buffered text and records, flush and fsync the files"""
+        if mpi.rank != 0 or not self.output._has_to_save:
+            return
+        if self._is_syncing or self.file.closed:
+            # called from a signal handler during a synchronization or after
+            # the end of the simulation
+            return
+        self._is_syncing = True
+        try:
+            self._sync()
+        finally:
+            self._is_syncing = False
+
+    def _sync(self):
+        self._time_last_sync = time()
+        files = [self.file]
+        if self._buffer:
+            self.file.write("".join(self._buffer))
+            self._buffer.clear()
+        if self.save_records:
+            files.append(self.file_records)
+            if self._buffer_records:
+                self.file_records.write(
+                    np.array(self._buffer_records, dtype_records_stdout).tobytes()
+                )
+                self._buffer_records.clear()
+        for file in files:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _add_record(self):
+        ts = self.sim.time_stepping
+        if self._duration_left is None:
+            remaining_duration = np.nan
+        else:
+            remaining_duration = self._duration_left.total_seconds()
+        self._buffer_records.append(
+            (ts.it, ts.t, ts.deltat, time(), remaining_duration)
+        )
 
     def _online_print(self):
         """Print simple info on the current state of the simulation"""
@@ -93,7 +241,12 @@ class PrintStdOutBase:
             self.t_last_print_info = tsim
 
     def _print_info(self):
-        self.print_stdout(self._make_str_info())
+        self._duration_left = None
+        to_print = self._make_str_info()
+        if mpi.rank == 0 and self.save_records and self.output._has_to_save:
+            # added before printing to be synchronized with the text
+            self._add_record()
+        self.print_stdout(to_print)
         print_memory_usage("MEMORY_USAGE")
 
     def _make_str_info(self):
@@ -104,6 +257,10 @@ class PrintStdOutBase:
 
     def _evaluate_duration_left(self):
         """Computes the remaining time."""
+        self._duration_left = self._compute_duration_left()
+        return self._duration_left
+
+    def _compute_duration_left(self):
         t_clock = time()
         try:
             delta_clock_time = t_clock - self.t_clock_last
@@ -136,10 +293,16 @@ class PrintStdOutBase:
         return timedelta(seconds=remaining_clock_time)
 
     def close(self):
-        try:
-            self.file.close()
-        except AttributeError:
-            pass
+        self.sync()
+        atexit.unregister(self.sync)
+        for signum, previous in self._previous_signal_handlers.items():
+            signal.signal(signum, previous)
+        self._previous_signal_handlers.clear()
+        for name in ("file", "file_records"):
+            try:
+                getattr(self, name).close()
+            except AttributeError:
+                pass
 
     def _load_times(self):
         """Load time data from the log file"""
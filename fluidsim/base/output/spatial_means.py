@@ -22,11 +22,13 @@ import numpy as np
 import json
 from typing import Dict
 
-import pandas as pd
-import xarray as xr
 from fluiddyn.util import mpi
 
 from .base import SpecificOutput
+from fluidsim.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
+xr = lazy_import("xarray")
 
 
 def inner_prod(a_fft, b_fft):
@@ -55,7 +57,11 @@ class SpatialMeansBase(SpecificOutput):
     def __init__(self, output):
         params = output.sim.params
 
-        self.sum_wavenumbers = output.sum_wavenumbers
+        try:
+            self.sum_wavenumbers = output.sum_wavenumbers
+        except AttributeError:
+            # outputs without pseudo-spectral operators (e.g. Dedalus)
+            pass
         try:
             self.vecfft_from_rotfft = output.oper.vecfft_from_rotfft
         except AttributeError:
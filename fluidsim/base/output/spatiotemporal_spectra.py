@@ -25,9 +25,7 @@ from logging import warn
 from math import pi
 
 import numpy as np
-from scipy import signal
 import h5py
-from rich.progress import Progress
 from fluidsim.util import ensure_radians
 
 from fluiddyn.util import mpi
@@ -35,6 +33,9 @@ from fluidsim.util import open_patient
 from fluidsim.base.output.base import SpecificOutput
 
 from transonic import boost, Array, Type
+from fluidsim.util.lazy import lazy_import
+
+signal = lazy_import("scipy.signal")
 
 Uf32f64 = Type(np.float32, np.float64)
 A = Array[Uf32f64, "1d"]
@@ -460,6 +461,7 @@ class SpatioTemporalSpectra3D(SpecificOutput):
 
     def load_time_series(self, keys=None, tmin=0, tmax=None, dtype=None):
         """load time series from files"""
+        from rich.progress import Progress
 
         if mpi.nb_proc > 1:
             raise RuntimeError(
@@ -15,14 +15,14 @@ Provides:
 
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from logging import warn
 
 from math import pi
 import numpy as np
-from scipy import signal
 import h5py
-from rich.progress import Progress, track
 
 from fluiddyn.util import mpi
 from fluidsim.base.output.base import SpecificOutput
@@ -30,6 +30,87 @@ from fluidsim.base.output.spatiotemporal_spectra import (
     filter_tmins_paths,
     get_arange_minmax,
 )
+from fluidsim.util.lazy import lazy_import
+
+signal = lazy_import("scipy.signal")
+
+
+def _get_infos_probes_files(path_dir, nb_dim):
+    """Coordinates of the probes, global indices of the probes and times of
+    the rank files (only small datasets are read)"""
+    paths = sorted(path_dir.glob("rank*.h5"))
+    rank_first = paths[0].name[:9]
+
+    with h5py.File(paths[0], "r") as file:
+        coords_seq = [file[f"probes_{letter}_seq"][:] for letter in "xyz"]
+    coords_seq = coords_seq[:nb_dim]
+
+    infos_files = []
+    times = []
+    for path in paths:
+        with h5py.File(path, "r") as file:
+            times_file = file["times"][:]
+            indices = []
+            for letter, coords in zip("xyz", coords_seq):
+                coord_min = coords.min()
+                delta = coords[1] - coord_min if coords.size > 1 else 1.0
+                coords_loc = file[f"probes_{letter}_loc"][:]
+                indices.append(
+                    np.rint((coords_loc - coord_min) / delta).astype(int)
+                )
+        # indices as for the arrays (z, y, x)
+        infos_files.append((path, times_file, tuple(indices[::-1])))
+        if path.name.startswith(rank_first):
+            times.append(times_file)
+
+    return coords_seq, infos_files, np.concatenate(times)
+
+
+def _save_chunk_as_phys_fields(task):
+    """Rearrange the probes data for a chunk of times and save the fields"""
+    infos_files, times_chunk, paths_save, keys, coords_seq, info_simul = task
+
+    shape = tuple(coords.size for coords in coords_seq[::-1])
+    nb_times = len(times_chunk)
+    # NaN for the points without probe
+    arrays = {key: np.full((nb_times,) + shape, np.nan) for key in keys}
+
+    for path_file, times_file, indices_probes in infos_files:
+        if (
+            times_file.size == 0
+            or times_file[-1] < times_chunk[0]
+            or times_file[0] > times_chunk[-1]
+        ):
+            continue
+        its_file = np.flatnonzero(np.isin(times_file, times_chunk))
+        if its_file.size == 0:
+            continue
+        its_chunk = np.searchsorted(times_chunk, times_file[its_file])
+        start, stop = its_file[0], its_file[-1] + 1
+        index = (its_chunk[:, np.newaxis],) + tuple(
+            indices[np.newaxis, :] for indices in indices_probes
+        )
+        with h5py.File(path_file, "r") as file:
+            for key in keys:
+                # one contiguous read for all the times of the chunk
+                block = file[f"probes_{key}_loc"][:, start:stop]
+                arrays[key][index] = block[:, its_file - start].transpose()
+
+    coords = np.meshgrid(*coords_seq[::-1], indexing="ij")
+    for it, path_save in enumerate(paths_save):
+        path_tmp = path_save.with_name(path_save.name + ".tmp")
+        with h5py.File(path_tmp, "w") as file:
+            create_ds = file.create_dataset
+            # probes coordinates
+            for letter, coords_letter in zip("zyx"[-len(coords) :], coords):
+                create_ds(letter, data=coords_letter)
+            # physical fields
+            for key in keys:
+                create_ds(key, data=arrays[key][it])
+            # sim info
+            info_simul._save_as_hdf5(hdf5_parent=file)
+        # atomic: an existing file is complete
+        os.replace(path_tmp, path_save)
 
 
 class TemporalSpectra3D(SpecificOutput):
@@ -393,6 +474,8 @@ class TemporalSpectra3D(SpecificOutput):
         self, keys=None, region=None, tmin=0, tmax=None, dtype=None
     ):
         """load time series from files"""
+        from rich.progress import Progress
+
         if keys is None:
             keys = self.keys_fields
         if region is None:
@@ -696,104 +779,88 @@ class TemporalSpectra3D(SpecificOutput):
 
             ax.legend()
 
-    def save_data_as_phys_fields(self, delta_index_times=1):
-        """load temporal data and save as phys_fields array"""
-
-        # path to saving directory
-        path_dir_save = self.path_dir / "phys_fields"
-        path_dir_save.mkdir(exist_ok=True)
-
-        # get ranks
-        paths = sorted(self.path_dir.glob("rank*.h5"))
-        ranks = sorted({int(p.name[4:9]) for p in paths})
+    def save_data_as_phys_fields(
+        self, delta_index_times=1, nb_workers=None, max_mem=500e6
+    ):
+        """Load temporal data and save them as phys_fields arrays (one file per time)
 
-        # get times and probes positions from the files of first rank
-        print("save probe data as 3D arrays")
+        Each rank file is read only once, in contiguous blocks of times: the
+        times are processed by chunks whose arrays take at most ``max_mem``
+        bytes. The chunks are distributed over the MPI processes or, for a
+        sequential run, over ``nb_workers`` processes. The files are written
+        atomically and the existing files are not recomputed, so that an
+        interrupted conversion can be resumed by calling this method again.
 
-        paths_1st_rank = [
-            p for p in paths if p.name.startswith(f"rank{ranks[0]:05}")
-        ]
+        """
+        from rich.progress import track
 
-        with h5py.File(paths_1st_rank[0], "r") as file:
-            probes_x_seq = file["probes_x_seq"][:]
-            probes_y_seq = file["probes_y_seq"][:]
-            probes_z_seq = file["probes_z_seq"][:]
+        # path to saving directory
+        path_dir_save = self.path_dir / "phys_fields"
+        if mpi.rank == 0:
+            path_dir_save.mkdir(exist_ok=True)
 
-        times = []
-        for path in paths_1st_rank:
-            with h5py.File(path, "r") as file:
-                times.append(file["times"][:])
-        times = np.concatenate(times)[::delta_index_times]
+        if mpi.rank == 0:
+            print("save probe data as arrays")
+            infos = _get_infos_probes_files(self.path_dir, self.nb_dim)
+        else:
+            infos = None
+        if mpi.nb_proc > 1:
+            infos = mpi.comm.bcast(infos)
+        coords_seq, infos_files, times = infos
+        times = times[::delta_index_times]
 
-        print(f"tmin={times.min():8.6g}, tmax={times.max():8.6g}")
+        if mpi.rank == 0:
+            print(f"tmin={times.min():8.6g}, tmax={times.max():8.6g}")
 
         # time string width
         # digits for integer part : int(log10(t)) + 1
         # add 2 zeros, coma and 3 decimals : + 6
         width = int(np.log10(times.max())) + 7
+        paths_save = [
+            path_dir_save / f"probes_fields_t{time:0{width}.3f}.h5"
+            for time in times
+        ]
 
-        # probes positions
-        xmin = probes_x_seq.min()
-        deltax = probes_x_seq[1] - xmin
-        ymin = probes_y_seq.min()
-        deltay = probes_y_seq[1] - ymin
-        zmin = probes_z_seq.min()
-        deltaz = probes_z_seq[1] - zmin
-        probes_Z, probes_Y, probes_X = np.meshgrid(
-            probes_z_seq, probes_y_seq, probes_x_seq, indexing="ij"
-        )
-
-        # loop on times
-        for time in track(times, description="Rearranging..."):
-            # initialize arrays
-            dict_arrays = {k: np.empty_like(probes_X) for k in self.keys_fields}
-
-            # loop on ranks
-            for rank in ranks:
-                for path_file in paths:
-                    if not path_file.name.startswith(f"rank{rank:05}"):
-                        continue
-                    with h5py.File(path_file, "r") as file:
-                        # check if the file contains the time we're looking for
-                        tmin_file, tmax_file = file["times"][[0, -1]]
-                        if (time < tmin_file) or (time > tmax_file):
-                            continue
-
-                        # time index
-                        it = np.where(file["times"][:] == time)[0]
-
-                        # get global probes indices
-                        coord_loc = file["probes_x_loc"][:]
-                        ix = np.rint((coord_loc - xmin) / deltax).astype("int")
-                        coord_loc = file["probes_y_loc"][:]
-                        iy = np.rint((coord_loc - ymin) / deltay).astype("int")
-                        coord_loc = file["probes_z_loc"][:]
-                        iz = np.rint((coord_loc - zmin) / deltaz).astype("int")
-
-                        # load data at time t for all keys_fields
-                        for key in self.keys_fields:
-                            dict_arrays[key][iz, iy, ix] = file[
-                                f"probes_{key}_loc"
-                            ][:, it].transpose()
-
-                        # stop opening files when we've reached the right one
-                        break
-
-            # save fields into a new file
-            path_file_save = (
-                path_dir_save / f"probes_fields_t{time:0{width}.3f}.h5"
+        # only the files not yet saved (resume)
+        indices_times = [
+            index for index, path in enumerate(paths_save) if not path.exists()
+        ]
+        if mpi.nb_proc > 1:
+            indices_times = mpi.comm.bcast(indices_times)
+
+        shape = tuple(coords.size for coords in coords_seq[::-1])
+        size_1_time = len(self.keys_fields) * np.prod(shape) * 8
+        nb_times_chunk = max(1, int(max_mem // size_1_time))
+        tasks = [
+            (
+                infos_files,
+                times[indices_chunk],
+                [paths_save[index] for index in indices_chunk],
+                self.keys_fields,
+                coords_seq,
+                self.sim.info,
+            )
+            for indices_chunk in (
+                indices_times[start : start + nb_times_chunk]
+                for start in range(0, len(indices_times), nb_times_chunk)
             )
-            with h5py.File(path_file_save, "w") as file:
-                create_ds = file.create_dataset
-                # probes coordinates
-                create_ds("x", data=probes_X)
-                create_ds("y", data=probes_Y)
-                create_ds("z", data=probes_Z)
-                # physical fields
-                for k, v in dict_arrays.items():
-                    create_ds(k, data=v)
-                # sim info
-                self.sim.info._save_as_hdf5(hdf5_parent=file)
+        ]
+
+        if mpi.nb_proc > 1:
+            for task in tasks[mpi.rank :: mpi.nb_proc]:
+                _save_chunk_as_phys_fields(task)
+            mpi.comm.barrier()
+        elif nb_workers is not None and nb_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(min(nb_workers, len(tasks))) as executor:
+                for _ in track(
+                    executor.map(_save_chunk_as_phys_fields, tasks),
+                    total=len(tasks),
+                    description="Rearranging...",
+                ):
+                    pass
+        else:
+            for task in track(tasks, description="Rearranging..."):
+                _save_chunk_as_phys_fields(task)
 
     def _get_path_saved_spectra(self, region, tmin, tmax, dtype):
         base = (
@@ -847,10 +914,6 @@ class TemporalSpectra2D(TemporalSpectra3D):
     def _get_data_probe_from_field(self, field):
         return field[self.probes_iy_loc, self.probes_ix_loc]
 
-    def save_data_as_phys_fields(self, delta_index_times=1):
-        """load temporal data and save as phys_fields array"""
-        raise NotImplementedError
-
     def _get_default_region(self):
         p_oper = self.sim.params.oper
         return (0, p_oper.Lx, 0, p_oper.Ly)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from fluidsim.base.output.increments import (
+    compute_histograms_increments_dim1,
+    compute_minmax_increments_dim1,
+    compute_sums_products_increments_dim1,
+)
+
+
+def test_pdfs_increments_dim1():
+    var = np.random.default_rng(0).standard_normal((8, 24))
+    rxs = np.array([1, 3, 12, 23], dtype=np.int32)
+    nbins = 10
+
+    mins, maxs = compute_minmax_increments_dim1(var, rxs)
+    hists = np.zeros((rxs.size, nbins), dtype=np.int64)
+    compute_histograms_increments_dim1(var, rxs, mins, maxs, hists)
+
+    for irx, rx in enumerate(rxs):
+        inc = np.roll(var, -rx, axis=1) - var
+        assert mins[irx] == inc.min()
+        assert maxs[irx] == inc.max()
+        hist, _ = np.histogram(inc, bins=nbins, range=(mins[irx], maxs[irx]))
+        assert np.abs(hists[irx] - hist).sum() <= 2
+        assert hists[irx].sum() == inc.size
+
+
+def test_sums_products_increments_dim1():
+    variables = np.random.default_rng(1).standard_normal((3, 6, 10))
+    indices = np.array([[0, 0, 2], [1, 2, 0]], dtype=np.int32)
+    rxs = np.array([1, 4, 9], dtype=np.int32)
+
+    sums = compute_sums_products_increments_dim1(variables, indices, rxs)
+
+    assert sums.shape == (2, rxs.size)
+    for irx, rx in enumerate(rxs):
+        incs = np.roll(variables, -rx, axis=2) - variables
+        assert np.isclose(sums[0, irx], np.sum(incs[0] ** 2 * incs[2]))
+        assert np.isclose(sums[1, irx], np.sum(incs[1] * incs[2] * incs[0]))
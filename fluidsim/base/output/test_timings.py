@@ -0,0 +1,132 @@
+import unittest
+from time import sleep
+
+import numpy as np
+
+import fluiddyn.util.mpi as mpi
+
+from fluidsim.util.testing import TestSimul, classproperty, skip_if_no_fluidfft
+
+from fluidsim.base.output.timings import PhaseTimers
+
+
+def test_phase_timers():
+    timers = PhaseTimers()
+
+    class Obj:
+        def method(self, duration):
+            "Sleep"
+            sleep(duration)
+            return 2 * duration
+
+    obj = Obj()
+    timers.wrap_method("sleep", obj, "method")
+    # no second timer for an already timed method
+    timers.wrap_method("sleep again", obj, "method")
+    timers.wrap_method("missing", obj, "missing_method")
+    assert timers.names == ["sleep"]
+    assert obj.method.__doc__ == "Sleep"
+
+    assert obj.method(0.01) == 0.02
+    obj.method(0.02)
+    times, nb_calls = timers.get_times_nb_calls()
+    assert nb_calls.tolist() == [2]
+    assert times[0] >= 0.03
+
+    # 2 timers with the same name accumulate in the same phase
+    func = timers.wrap("sleep", sleep)
+    func(0.01)
+    times_min, times_mean, times_max, nb_calls = timers.reduce()
+    assert nb_calls.tolist() == [3]
+    assert times_min[0] >= 0.04
+    assert times_min[0] <= times_mean[0] <= times_max[0]
+
+
+@skip_if_no_fluidfft
+class TestTimings(TestSimul):
+    @classproperty
+    def Simul(cls):
+        from fluidsim.solvers.ns2d.solver import Simul
+
+        return Simul
+
+    @classmethod
+    def init_params(cls):
+        params = cls.params = cls.Simul.create_default_params()
+        params.short_name_type_run = "test_timings"
+        params.oper.nx = params.oper.ny = 16
+        params.nu_2 = 1.0
+        params.init_fields.type = "noise"
+        params.time_stepping.t_end = 0.5
+
+        periods = params.output.periods_save
+        periods.timings = 0.2
+        periods.spatial_means = 0.1
+
+    def test_timings(self):
+        sim = self.sim
+        sim.time_stepping.start()
+
+        timings = sim.output.timings
+        names = timings.timers.names
+        for name in (
+            "one_time_step_computation",
+            "tendencies_nonlin",
+            "fft",
+            "ifft",
+            "cfl",
+            "output.spatial_means",
+        ):
+            assert name in names
+
+        results = timings.compute()
+        assert np.all(results["times_min"] <= results["times_mean"])
+        assert np.all(results["times_mean"] <= results["times_max"])
+        assert np.all(results["times_min"] > 0)
+        assert results["it"] == sim.time_stepping.it
+        nb_calls = dict(zip(names, results["nb_calls"]))
+        nb_steps = sim.time_stepping.it
+        assert nb_calls["one_time_step_computation"] == nb_steps
+        # 4 evaluations of the tendencies per time step with RK4
+        assert nb_calls["tendencies_nonlin"] >= 4 * nb_steps
+        assert nb_calls["fft"] >= nb_calls["tendencies_nonlin"]
+        # the specific outputs are called at each time step
+        assert nb_calls["output.spatial_means"] >= nb_steps
+        # inclusive timers
+        index_step = names.index("one_time_step_computation")
+        index_fft = names.index("fft")
+        assert results["times_max"][index_step] > 0
+        assert results["times_min"][index_fft] < results["times_max"][index_step]
+
+        if mpi.rank != 0:
+            return
+
+        data = timings.load()
+        assert data["names"] == names
+        its = data["it"]
+        assert data["times_mean"].shape == (len(its), len(names))
+        # t_end = 0.5 and period 0.2
+        assert len(its) >= 2
+        assert np.all(np.diff(its) > 0)
+        # cumulative times
+        assert np.all(np.diff(data["times_mean"], axis=0) >= 0)
+        assert np.all(np.diff(data["nb_calls"], axis=0) >= 0)
+        assert data["nb_calls"][-1][index_step] == its[-1]
+
+        with open(sim.output.path_run + "/stdout.txt") as file:
+            text = file.read()
+        summary = text[text.index("Timings (cumulative clock times") :]
+        lines = summary.splitlines()
+        assert lines[1].split() == ["phase", "min", "mean", "max", "nb", "calls"]
+        words = dict(
+            (line.split()[0], line.split()[1:])
+            for line in lines[2 : 2 + len(names)]
+        )
+        assert list(words) == names
+        assert words["one_time_step_computation"][-1] == str(nb_steps)
+
+        timings.plot()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,8 +24,12 @@ class TimeSignalsK(SpecificOutput):
     """Handles the saving of time signals in spectral space.
 
     This class uses the particular functions defined by some solvers
-    :func:`linear_eigenmode_from_values_1k` and
+    :func:`linear_eigenmodes_from_values` and
     :func`omega_from_wavenumber`.
+
+    Each process owns the values of some of the selected wavenumbers. They
+    are extracted with fancy indexing and gathered on rank 0 with one
+    ``Gatherv`` per save.
     """
 
     _tag = "time_signals_fft"
@@ -130,35 +134,31 @@ class TimeSignalsK(SpecificOutput):
             self.ik0_array_ik[ik] = ik0
             self.ik1_array_ik[ik] = ik1
 
-        self.kx_array_ik = np.empty([self.nb_k_tot])
-        self.ky_array_ik = np.empty([self.nb_k_tot])
-
-        for ik in range(self.nb_k_tot):
-            ik0_ik = self.ik0_array_ik[ik]
-            ik1_ik = self.ik1_array_ik[ik]
-
-            if mpi.nb_proc > 1:
-                rank_ik = self.rank_array_ik[ik]
-            else:
-                rank_ik = 0
-
-            if mpi.rank == rank_ik:
-                kx_1k = sim.oper.KX[ik0_ik, ik1_ik]
-                ky_1k = sim.oper.KY[ik0_ik, ik1_ik]
-
-            if rank_ik != 0:
-                if mpi.rank == rank_ik:
-                    data = np.array([kx_1k, ky_1k])
-                    mpi.comm.Send([data, mpi.MPI.DOUBLE], dest=0, tag=ik)
-                elif mpi.rank == 0:
-                    data = np.empty([2], np.float64)
-                    mpi.comm.Recv([data, mpi.MPI.DOUBLE], source=rank_ik, tag=ik)
-                    kx_1k = data[0]
-                    ky_1k = data[1]
-
-            if mpi.rank == 0:
-                self.kx_array_ik[ik] = kx_1k
-                self.ky_array_ik[ik] = ky_1k
+        # indices of the wavenumbers in this process
+        if mpi.nb_proc > 1:
+            self._iks_loc = np.flatnonzero(self.rank_array_ik == mpi.rank)
+            # values are gathered on rank 0 ordered by rank
+            self._nb_k_per_rank = np.bincount(
+                self.rank_array_ik, minlength=mpi.nb_proc
+            )
+            self._iks_gathered = np.argsort(self.rank_array_ik, kind="stable")
+        else:
+            self._iks_loc = np.arange(self.nb_k_tot)
+        self._ik0s_loc = self.ik0_array_ik[self._iks_loc]
+        self._ik1s_loc = self.ik1_array_ik[self._iks_loc]
+
+        kxs_kys = self._gather_values_ik(
+            np.stack(
+                (
+                    sim.oper.KX[self._ik0s_loc, self._ik1s_loc],
+                    sim.oper.KY[self._ik0s_loc, self._ik1s_loc],
+                ),
+                axis=1,
+            )
+        )
+        if mpi.rank == 0:
+            self.kx_array_ik = kxs_kys[:, 0].copy()
+            self.ky_array_ik = kxs_kys[:, 1].copy()
 
         if mpi.rank == 0:
             self.kh_array_ik = np.sqrt(
@@ -214,57 +214,57 @@ class TimeSignalsK(SpecificOutput):
                 )
                 self.nb_saved_times += 1
 
-    def compute(self):
-        """compute the values at one time."""
+    def _gather_values_ik(self, values_loc):
+        """Gather on rank 0 the values of all the selected wavenumbers
 
-        get_var = self.sim.state.get_var
-        ux_fft = get_var("ux_fft")
-        uy_fft = get_var("uy_fft")
-        eta_fft = get_var("eta_fft")
+        ``values_loc`` has the shape ``(nb_k_loc, nb_values)`` (values for the
+        wavenumbers of this process). The values are sent to rank 0 in one
+        ``Gatherv`` and returned (only on rank 0) with the shape
+        ``(nb_k_tot, nb_values)``.
 
+        """
+        if mpi.nb_proc == 1:
+            return values_loc
+        nb_values = values_loc.shape[1]
         if mpi.rank == 0:
-            q_array_ik = np.empty([self.nb_k_tot], dtype=np.complex128)
-            d_array_ik = np.empty([self.nb_k_tot], dtype=np.complex128)
-            a_array_ik = np.empty([self.nb_k_tot], dtype=np.complex128)
-
-        for ik in range(self.nb_k_tot):
-            ik0_ik = self.ik0_array_ik[ik]
-            ik1_ik = self.ik1_array_ik[ik]
-
-            if mpi.rank == 0:
-                kx_ik = self.kx_array_ik[ik]
-                ky_ik = self.ky_array_ik[ik]
+            values_gathered = np.empty(
+                [self.nb_k_tot, nb_values], dtype=values_loc.dtype
+            )
+            recvbuf = [values_gathered, self._nb_k_per_rank * nb_values]
+        else:
+            recvbuf = None
+        mpi.comm.Gatherv(np.ascontiguousarray(values_loc), recvbuf, root=0)
+        if mpi.rank == 0:
+            values = np.empty_like(values_gathered)
+            values[self._iks_gathered] = values_gathered
+            return values
 
-            if mpi.nb_proc > 1:
-                rank_ik = self.rank_array_ik[ik]
-            else:
-                rank_ik = 0
-
-            if mpi.rank == rank_ik:
-                ux_1k = ux_fft[ik0_ik, ik1_ik]
-                uy_1k = uy_fft[ik0_ik, ik1_ik]
-                eta_1k = eta_fft[ik0_ik, ik1_ik]
-
-            if rank_ik != 0:
-                if mpi.rank == rank_ik:
-                    data = np.array([ux_1k, uy_1k, eta_1k])
-                    mpi.comm.Send([data, mpi.MPI.COMPLEX], dest=0, tag=ik)
-                elif mpi.rank == 0:
-                    data = np.empty([3], np.complex128)
-                    mpi.comm.Recv([data, mpi.MPI.COMPLEX], source=rank_ik, tag=ik)
-                    ux_1k = data[0]
-                    uy_1k = data[1]
-                    eta_1k = data[2]
+    def compute(self):
+        """compute the values at one time."""
 
-            if mpi.rank == 0:
-                q_1k, d_1k, a_1k = self.output.linear_eigenmode_from_values_1k(
-                    ux_1k, uy_1k, eta_1k, kx_ik, ky_ik
-                )
-                q_array_ik[ik] = q_1k
-                d_array_ik[ik] = d_1k
-                a_array_ik[ik] = a_1k
+        get_var = self.sim.state.get_var
+        values = self._gather_values_ik(
+            np.stack(
+                [
+                    get_var(key)[self._ik0s_loc, self._ik1s_loc]
+                    for key in ("ux_fft", "uy_fft", "eta_fft")
+                ],
+                axis=1,
+            )
+        )
 
         if mpi.rank == 0:
+            (
+                q_array_ik,
+                d_array_ik,
+                a_array_ik,
+            ) = self.output.linear_eigenmodes_from_values(
+                values[:, 0],
+                values[:, 1],
+                values[:, 2],
+                self.kx_array_ik,
+                self.ky_array_ik,
+            )
             dict_results = {
                 "q_array_ik": q_array_ik,
                 "d_array_ik": d_array_ik,
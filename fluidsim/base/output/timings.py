@@ -0,0 +1,289 @@
+"""Timings of the main phases of the time stepping
+===================================================
+
+Provides:
+
+.. autoclass:: PhaseTimers
+   :members:
+   :private-members:
+   :noindex:
+   :undoc-members:
+
+.. autoclass:: Timings
+   :members:
+   :private-members:
+   :noindex:
+   :undoc-members:
+
+The timers are always active (the overhead is of the order of 1 µs per call of
+a timed function). The cumulative clock times are aggregated over the processes
+(min, mean and max) and
+
+- saved in the file ``timings.h5`` if ``params.output.periods_save.timings``
+  is larger than 0,
+
+- summarized in ``stdout.txt`` at the end of the simulation.
+
+The timers are inclusive, i.e. the time spent in the FFTs is also counted in
+``tendencies_nonlin``.
+
+"""
+
+from time import perf_counter
+
+import os
+
+import numpy as np
+import h5py
+
+from fluiddyn.util import mpi
+
+from .base import SpecificOutput
+
+
+class PhaseTimers:
+    """Accumulate the clock time spent in named phases
+
+    The names of the phases have to be registered in the same order by all
+    processes.
+
+    """
+
+    def __init__(self):
+        self.names = []
+        self._times = []
+        self._nb_calls = []
+
+    def _get_index(self, name):
+        try:
+            return self.names.index(name)
+        except ValueError:
+            self.names.append(name)
+            self._times.append(0.0)
+            self._nb_calls.append(0)
+            return len(self.names) - 1
+
+    def wrap(self, name, func):
+        """Return a function calling ``func`` and timing the call"""
+        index = self._get_index(name)
+        times = self._times
+        nb_calls = self._nb_calls
+
+        def timed(*args, **kwargs):
+            time_start = perf_counter()
+            result = func(*args, **kwargs)
+            times[index] += perf_counter() - time_start
+            nb_calls[index] += 1
+            return result
+
+        timed._is_timed = True
+        timed.__doc__ = func.__doc__
+        return timed
+
+    def wrap_method(self, name, obj, name_method):
+        """Replace a method by a timed version (instance attribute)"""
+        method = getattr(obj, name_method, None)
+        if method is None or getattr(method, "_is_timed", False):
+            return
+        setattr(obj, name_method, self.wrap(name, method))
+
+    def get_times_nb_calls(self):
+        """Return the local cumulative times and numbers of calls"""
+        return np.array(self._times), np.array(self._nb_calls, dtype=np.int64)
+
+    def reduce(self):
+        """Compute statistics over the processes (collective)
+
+        Returns
+        -------
+
+        times_min, times_mean, times_max : np.ndarray
+
+        nb_calls : np.ndarray
+          Maximum over the processes of the number of calls.
+
+        """
+        times, nb_calls = self.get_times_nb_calls()
+        if mpi.nb_proc == 1:
+            return times, times.copy(), times.copy(), nb_calls
+
+        times_min = np.empty_like(times)
+        times_sum = np.empty_like(times)
+        times_max = np.empty_like(times)
+        nb_calls_max = np.empty_like(nb_calls)
+        comm = mpi.comm
+        comm.Allreduce(times, times_min, op=mpi.MPI.MIN)
+        comm.Allreduce(times, times_sum, op=mpi.MPI.SUM)
+        comm.Allreduce(times, times_max, op=mpi.MPI.MAX)
+        comm.Allreduce(nb_calls, nb_calls_max, op=mpi.MPI.MAX)
+        return times_min, times_sum / mpi.nb_proc, times_max, nb_calls_max
+
+
+class Timings(SpecificOutput):
+    """Timings of the main phases of the time stepping (``sim.output.timings``)
+
+    The phases timed are (when they exist) ``one_time_step_computation``,
+    ``tendencies_nonlin``, ``fft``, ``ifft``, ``dealiasing``, ``projection``,
+    ``forcing``, ``turb_model``, ``cfl`` and the saving of each specific output
+    (``output.<tag>``).
+
+    """
+
+    _tag = "timings"
+    _name_file = _tag + ".h5"
+
+    @staticmethod
+    def _complete_params_with_default(params):
+        params.output.periods_save._set_attrib("timings", 0)
+
+    def __init__(self, output):
+        self.timers = PhaseTimers()
+        self._instrument_simul(output.sim)
+
+        super().__init__(
+            output,
+            period_save=output.sim.params.output.periods_save.timings,
+        )
+
+    def _instrument_simul(self, sim):
+        timers = self.timers
+
+        time_stepping = sim.time_stepping
+        timers.wrap_method(
+            "one_time_step_computation",
+            time_stepping,
+            "one_time_step_computation",
+        )
+        timers.wrap_method("tendencies_nonlin", sim, "tendencies_nonlin")
+
+        oper = sim.oper
+        for name_method in ("fft", "fft2", "fft_as_arg"):
+            timers.wrap_method("fft", oper, name_method)
+        for name_method in (
+            "ifft",
+            "ifft2",
+            "ifft_as_arg",
+            "ifft_as_arg_destroy",
+        ):
+            timers.wrap_method("ifft", oper, name_method)
+        timers.wrap_method("dealiasing", oper, "dealiasing")
+        timers.wrap_method("projection", sim, "project_state_spect")
+
+        if getattr(sim, "is_forcing_enabled", False):
+            timers.wrap_method("forcing", sim.forcing, "compute")
+        if getattr(sim, "is_turb_model_enabled", False):
+            timers.wrap_method("turb_model", sim.turb_model, "get_forcing")
+
+        if hasattr(time_stepping, "_compute_freq_CFL_loc"):
+            timers.wrap_method("cfl", time_stepping, "_compute_freq_CFL_loc")
+        else:
+            timers.wrap_method("cfl", time_stepping, "compute_time_increment_CLF")
+
+    def _instrument_outputs(self):
+        """Time the saving of the specific outputs
+
+        Called when all the specific outputs have been created.
+
+        """
+        periods_save = self.params.output.periods_save
+        for key in periods_save._get_key_attribs():
+            if not periods_save[key]:
+                continue
+            try:
+                spec_output = self.output.__dict__[key]
+            except KeyError:
+                continue
+            if spec_output is self:
+                continue
+            self.timers.wrap_method("output." + key, spec_output, "_online_save")
+
+    def _init_files(self, arrays_1st_time=None):
+        # the outputs are not yet instrumented so the names are not all known
+        self.t_last_save = self.sim.time_stepping.t
+
+    def _online_save(self):
+        """Save the values at one time."""
+        tsim = self.sim.time_stepping.t
+        if tsim - self.t_last_save >= self.period_save:
+            self.t_last_save = tsim
+            dict_results = self.compute()
+            if mpi.rank == 0:
+                if not os.path.exists(self.path_file):
+                    names = np.array(self.timers.names, dtype="S")
+                    self._create_file_from_dict_arrays(
+                        self.path_file, dict_results, {"names": names}
+                    )
+                else:
+                    # note: for a restart in the same directory, the timers
+                    # start again from 0
+                    self._add_dict_arrays_to_file(self.path_file, dict_results)
+
+    def compute(self):
+        """Aggregate the cumulative times over the processes (collective)"""
+        times_min, times_mean, times_max, nb_calls = self.timers.reduce()
+        return {
+            "times_min": times_min,
+            "times_mean": times_mean,
+            "times_max": times_max,
+            "nb_calls": nb_calls,
+            "it": self.sim.time_stepping.it,
+        }
+
+    def make_summary(self):
+        """Make a string summarizing the timings (collective)"""
+        results = self.compute()
+        names = self.timers.names
+        if not names:
+            return ""
+        width = max(len(name) for name in names) + 2
+        lines = [
+            "Timings (cumulative clock times in s over the processes)",
+            f"{'phase':{width}s}{'min':>12s}{'mean':>12s}{'max':>12s}"
+            f"{'nb calls':>12s}",
+        ]
+        for index, name in enumerate(names):
+            lines.append(
+                f"{name:{width}s}"
+                f"{results['times_min'][index]:12.4g}"
+                f"{results['times_mean'][index]:12.4g}"
+                f"{results['times_max'][index]:12.4g}"
+                f"{results['nb_calls'][index]:12d}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def load(self):
+        """Load the data saved in the file ``timings.h5``"""
+        with h5py.File(self.path_file, "r") as file:
+            data = {
+                key: dataset[...]
+                for key, dataset in file.items()
+                if isinstance(dataset, h5py.Dataset)
+            }
+        data["names"] = [name.decode() for name in data["names"]]
+        return data
+
+    def plot(self, kind="mean"):
+        """Plot the evolution of the clock time per time step of each phase
+
+        Parameters
+        ----------
+
+        kind : str
+          "min", "mean" or "max"
+
+        """
+        data = self.load()
+        its = data["it"]
+        times = data["times_" + kind]
+        delta_its = np.diff(its)
+        delta_its[delta_its == 0] = 1
+        times_per_step = np.diff(times, axis=0) / delta_its[:, np.newaxis]
+
+        fig, ax = self.output.figure_axe()
+        for index, name in enumerate(data["names"]):
+            ax.plot(its[1:], times_per_step[:, index], label=name)
+        ax.set_xlabel("it")
+        ax.set_ylabel(f"clock time per time step ({kind} over processes, s)")
+        ax.set_yscale("log")
+        ax.legend(fontsize=6)
+        fig.tight_layout()
@@ -16,3 +16,11 @@ class Output(OutputBasePseudoSpectral):
             "fluidsim.base.sphericalharmo.phys_fields"
         )
         classes.PhysFields.class_name = "PhysFieldsSphericalHarmo"
+
+        classes._set_child(
+            "ConservationDiagnostics",
+            attribs={
+                "module_name": "fluidsim.base.output.conservation_diagnostics",
+                "class_name": "ConservationDiagnostics",
+            },
+        )
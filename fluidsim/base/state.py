@@ -3,6 +3,10 @@
 
 Provides:
 
+.. autoclass:: VarsComputed
+   :members:
+   :private-members:
+
 .. autoclass:: StateBase
    :members:
    :private-members:
@@ -13,11 +17,124 @@ Provides:
 
 """
 
+import inspect
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
 import numpy as np
 
 from fluidsim.base.setofvariables import SetOfVariables
 
 
+class VarsComputed(MutableMapping):
+    """Cache of the computed variables (``state.vars_computed``)
+
+    Mapping ``key -> array`` with a memory budget (``max_mem`` in bytes, no
+    limit if None). When the arrays stored use more memory than the budget,
+    the least recently used arrays are evicted.
+
+    The arrays stored with :meth:`store_buffer` can be given to the method
+    ``compute`` of the state (argument ``out``) to be overwritten in place
+    at a later time step (see :meth:`pop_buffer`).
+
+    """
+
+    def __init__(self, max_mem=None):
+        self.max_mem = max_mem
+        self._arrays = OrderedDict()
+        # keys of the arrays which can be overwritten
+        self._keys_buffers = set()
+        self.nbytes = 0
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_evictions = 0
+
+    def __getitem__(self, key):
+        value = self._arrays[key]
+        self._arrays.move_to_end(key)
+        self.nb_hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        old = self._arrays.get(key)
+        if old is value:
+            self._arrays.move_to_end(key)
+            return
+        if old is not None:
+            self.nbytes -= getattr(old, "nbytes", 0)
+        self._keys_buffers.discard(key)
+        self._arrays[key] = value
+        self._arrays.move_to_end(key)
+        self.nbytes += getattr(value, "nbytes", 0)
+        self.nb_misses += 1
+
+        if self.max_mem is None:
+            return
+        while self.nbytes > self.max_mem and len(self._arrays) > 1:
+            key_evicted, evicted = self._arrays.popitem(last=False)
+            self._keys_buffers.discard(key_evicted)
+            self.nbytes -= getattr(evicted, "nbytes", 0)
+            self.nb_evictions += 1
+
+    def __delitem__(self, key):
+        value = self._arrays.pop(key)
+        self._keys_buffers.discard(key)
+        self.nbytes -= getattr(value, "nbytes", 0)
+
+    def __contains__(self, key):
+        return key in self._arrays
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def clear(self):
+        self._arrays.clear()
+        self._keys_buffers.clear()
+        self.nbytes = 0
+
+    def store_buffer(self, key, array):
+        """Store an array which can be overwritten at a later time step"""
+        self[key] = array
+        self._keys_buffers.add(key)
+
+    def pop_buffer(self, key):
+        """Remove and return the array of a variable if it can be overwritten
+
+        Returns None if there is no array for this key or if the array has not
+        been stored with :meth:`store_buffer`.
+
+        """
+        if key not in self._keys_buffers:
+            return None
+        array = self._arrays[key]
+        del self[key]
+        return array
+
+    def get_stats(self):
+        """Return a dictionary with statistics on the cache"""
+        return dict(
+            nb_vars=len(self._arrays),
+            nbytes=self.nbytes,
+            max_mem=self.max_mem,
+            nb_hits=self.nb_hits,
+            nb_misses=self.nb_misses,
+            nb_evictions=self.nb_evictions,
+        )
+
+    def make_summary(self):
+        """Make a string summarizing the statistics of the cache"""
+        stats = self.get_stats()
+        return (
+            "Computed variables (state.vars_computed): "
+            f"{stats['nb_hits']} hits, {stats['nb_misses']} misses, "
+            f"{stats['nb_evictions']} evictions, "
+            f"{stats['nb_vars']} arrays ({stats['nbytes'] / 1e6:.3g} MB)"
+        )
+
+
 class StateBase:
     """Contains the state variables and handles the access to fields.
 
@@ -44,6 +161,35 @@ class StateBase:
             }
         )
 
+    @staticmethod
+    def _complete_params_with_default(params):
+        """This static method is used to complete the *params* container."""
+        params._set_child(
+            "state",
+            attribs={
+                "max_mem_vars_computed": None,
+                "reuse_arrays_vars_computed": False,
+            },
+        )
+        params.state._set_doc(
+            """
+max_mem_vars_computed: float or None (default None)
+
+    Memory budget (in MB, per process) for the arrays of the computed variables
+    stored in ``sim.state.vars_computed``. The least recently used arrays are
+    evicted when the budget is exceeded. No limit if None.
+
+reuse_arrays_vars_computed: bool (default False)
+
+    If True, the arrays of the computed variables are overwritten in place
+    when the variables are computed again at a later time step (for the
+    states supporting it), which avoids allocations. The arrays returned by
+    ``get_var`` for computed variables must then not be kept (or have to be
+    copied) between time steps.
+
+"""
+        )
+
     def __init__(self, sim, oper=None):
         self.sim = sim
         self.params = sim.params
@@ -66,8 +212,22 @@ class StateBase:
             dtype=np.float64,
             info="state_phys",
         )
-        self.vars_computed = {}
+        try:
+            max_mem = self.params.state.max_mem_vars_computed
+        except AttributeError:
+            # parameters of old simulations
+            max_mem = None
+        if max_mem is not None:
+            max_mem = int(max_mem * 1e6)
+        self.vars_computed = VarsComputed(max_mem)
         self.it_computed = {}
+        try:
+            reuse_arrays = self.params.state.reuse_arrays_vars_computed
+        except AttributeError:
+            reuse_arrays = False
+        self._reuse_arrays_computed = (
+            reuse_arrays and "out" in inspect.signature(self.compute).parameters
+        )
 
         self.is_initialized = False
 
@@ -79,6 +239,49 @@ class StateBase:
         """Clear the stored computed variables."""
         self.vars_computed.clear()
 
+    def _get_var_computed(self, key):
+        """Get a computed variable (from the cache or computed)
+
+        If ``params.state.reuse_arrays_vars_computed`` is True and the method
+        :func:`compute` accepts the argument ``out``, the array computed for
+        this variable at a previous time step is overwritten (only if it does
+        not share memory with the state arrays).
+
+        """
+        it = self.sim.time_stepping.it
+        if key in self.vars_computed and it == self.it_computed[key]:
+            return self.vars_computed[key]
+
+        if not self._reuse_arrays_computed:
+            value = self.compute(key)
+            self.vars_computed[key] = value
+            self.it_computed[key] = it
+            return value
+
+        buffer = self.vars_computed.pop_buffer(key)
+        if buffer is None:
+            value = self.compute(key)
+        else:
+            value = self.compute(key, out=buffer)
+        if value is buffer or self._can_be_overwritten(value):
+            self.vars_computed.store_buffer(key, value)
+        else:
+            self.vars_computed[key] = value
+        self.it_computed[key] = it
+        return value
+
+    def _can_be_overwritten(self, array):
+        """Check that an array does not share memory with the state arrays"""
+        if not isinstance(array, np.ndarray):
+            return False
+        arrays_state = [self.state_phys]
+        if hasattr(self, "state_spect"):
+            arrays_state.append(self.state_spect)
+        return not any(
+            np.may_share_memory(array, array_state)
+            for array_state in arrays_state
+        )
+
     def has_vars(self, *keys):
         """Checks if all of the keys are present in the union of
         ``keys_state_phys`` and ``keys_computable``.
@@ -136,15 +339,7 @@ class StateBase:
             return self.state_phys.get_var(key)
 
         else:
-            it = self.sim.time_stepping.it
-            if key in self.vars_computed and it == self.it_computed[key]:
-                return self.vars_computed[key]
-
-            else:
-                value = self.compute(key)
-                self.vars_computed[key] = value
-                self.it_computed[key] = it
-                return value
+            return self._get_var_computed(key)
 
     def __call__(self, key):
         raise DeprecationWarning(
@@ -294,15 +489,7 @@ class StatePseudoSpectral(StateBase):
             return self.state_phys.get_var(key)
 
         else:
-            it = self.sim.time_stepping.it
-            if key in self.vars_computed and it == self.it_computed[key]:
-                return self.vars_computed[key]
-
-            else:
-                value = self.compute(key)
-                self.vars_computed[key] = value
-                self.it_computed[key] = it
-                return value
+            return self._get_var_computed(key)
 
     def __setitem__(self, key, value):
         """General setter function to set the value of a variable
@@ -3,9 +3,6 @@ import unittest
 import fluiddyn as fld
 from fluiddyn.util import mpi
 
-# to get fld.show
-import fluiddyn.output
-
 from fluidsim.base.solvers.base import SimulBase as Simul
 
 from fluidsim.util.testing import TestSimul
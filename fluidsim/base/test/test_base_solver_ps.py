@@ -7,9 +7,6 @@ import numpy as np
 import fluiddyn as fld
 import fluiddyn.util.mpi as mpi
 
-# to get fld.show
-import fluiddyn.output
-
 from fluidsim import (
     modif_resolution_from_dir,
     load_params_simul,
@@ -0,0 +1,63 @@
+import numpy as np
+
+from fluidsim.base.state import VarsComputed
+
+
+def test_vars_computed_lru():
+    cache = VarsComputed(max_mem=3 * 80)
+    for key in "abc":
+        cache[key] = np.zeros(10)
+    assert cache.nbytes == 240
+
+    # "a" becomes the most recently used
+    cache["a"]
+    cache["d"] = np.zeros(10)
+    assert list(cache) == ["c", "a", "d"]
+    assert cache.nbytes == 240
+
+    # an array larger than the budget is kept alone
+    cache["e"] = np.zeros(40)
+    assert list(cache) == ["e"]
+
+    stats = cache.get_stats()
+    assert stats["nb_hits"] == 1
+    assert stats["nb_misses"] == 5
+    assert stats["nb_evictions"] == 4
+    assert "hits" in cache.make_summary()
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_vars_computed_pop_buffer():
+    cache = VarsComputed(max_mem=2 * 32)
+    assert cache.pop_buffer("a") is None
+
+    # only the arrays stored with store_buffer can be overwritten
+    cache["a"] = np.ones(4)
+    assert cache.pop_buffer("a") is None
+    assert "a" in cache
+
+    buffer = np.ones(4)
+    cache.store_buffer("a", buffer)
+    assert cache.pop_buffer("a") is buffer
+    assert "a" not in cache
+    assert cache.nbytes == 0
+
+    # an array replacing a buffer
+    cache.store_buffer("a", buffer)
+    cache["a"] = np.ones(4)
+    assert cache.pop_buffer("a") is None
+
+    # evicted buffer
+    cache.store_buffer("b", buffer)
+    cache["c"] = np.ones(4)
+    cache["d"] = np.ones(4)
+    assert "b" not in cache
+    cache["b"] = np.ones(4)
+    assert cache.pop_buffer("b") is None
+
+    cache.store_buffer("e", buffer)
+    cache.clear()
+    cache["e"] = buffer
+    assert cache.pop_buffer("e") is None
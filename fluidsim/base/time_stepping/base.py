@@ -11,21 +11,144 @@ Provides:
    :members:
    :private-members:
 
+.. autoclass:: ControlChannel
+   :members:
+   :private-members:
+
 """
 
 import signal
 from warnings import warn
-from math import pi
+from math import pi, inf
 from datetime import datetime, timedelta
 from time import time
 
+import numpy as np
+
+from transonic import boost, Array, Transonic
 from fluiddyn.util import mpi
 
+from ... import _is_testing
+
+ts = Transonic()
+
+A1 = Array[np.float64, "1d", "C"]
+
 
 def max_abs(arr):
     return max(abs(arr.min()), abs(arr.max()))
 
 
+@boost
+def compute_freq_CFL_1comp(vx: A1, inv_dx: float):
+    """Compute max(|vx|) / dx in one pass"""
+    max_vx = 0.0
+    for i in range(vx.size):
+        value = abs(vx[i])
+        if value > max_vx:
+            max_vx = value
+    return max_vx * inv_dx
+
+
+@boost
+def compute_freq_CFL_2comp(vx: A1, vy: A1, inv_dx: float, inv_dy: float):
+    """Compute max(|vx|) / dx + max(|vy|) / dy in one pass"""
+    max_vx = 0.0
+    max_vy = 0.0
+    for i in range(vx.size):
+        value = abs(vx[i])
+        if value > max_vx:
+            max_vx = value
+        value = abs(vy[i])
+        if value > max_vy:
+            max_vy = value
+    return max_vx * inv_dx + max_vy * inv_dy
+
+
+@boost
+def compute_freq_CFL_3comp(
+    vx: A1, vy: A1, vz: A1, inv_dx: float, inv_dy: float, inv_dz: float
+):
+    """Compute max(|vx|) / dx + max(|vy|) / dy + max(|vz|) / dz in one pass"""
+    max_vx = 0.0
+    max_vy = 0.0
+    max_vz = 0.0
+    for i in range(vx.size):
+        value = abs(vx[i])
+        if value > max_vx:
+            max_vx = value
+        value = abs(vy[i])
+        if value > max_vy:
+            max_vy = value
+        value = abs(vz[i])
+        if value > max_vz:
+            max_vz = value
+    return max_vx * inv_dx + max_vy * inv_dy + max_vz * inv_dz
+
+
+def compute_freq_CFL_1comp_numpy(vx: A1, inv_dx: float):
+    return max_abs(vx) * inv_dx
+
+
+def compute_freq_CFL_2comp_numpy(vx: A1, vy: A1, inv_dx: float, inv_dy: float):
+    return max_abs(vx) * inv_dx + max_abs(vy) * inv_dy
+
+
+def compute_freq_CFL_3comp_numpy(
+    vx: A1, vy: A1, vz: A1, inv_dx: float, inv_dy: float, inv_dz: float
+):
+    return max_abs(vx) * inv_dx + max_abs(vy) * inv_dy + max_abs(vz) * inv_dz
+
+
+if not ts.is_transpiling and not ts.is_compiled and not _is_testing:
+    # for example if Pythran is not available
+    compute_freq_CFL_1comp = compute_freq_CFL_1comp_numpy
+    compute_freq_CFL_2comp = compute_freq_CFL_2comp_numpy
+    compute_freq_CFL_3comp = compute_freq_CFL_3comp_numpy
+
+
+class ControlChannel:
+    """Gather the small global reductions needed at each time step
+
+    The stop-signal flag, the wall-clock time, the CFL frequency and a flag
+    indicating that a NaN has been detected are packed in one array and
+    reduced (``MPI.MAX``) with one blocking ``Allreduce``, which replaces
+    several collective communications per time step.
+
+    """
+
+    def __init__(self):
+        self._sendbuf = np.zeros(4)
+        self._recvbuf = np.zeros(4)
+
+    def reduce(self, stop_signal, time_now, freq_CFL, has_nan=False):
+        """Reduce the control values over the processes
+
+        Returns
+        -------
+
+        stop_signal : int
+
+        time_now : float
+
+        freq_CFL : float or None
+
+        has_nan : bool
+
+        """
+        if freq_CFL is None or freq_CFL != freq_CFL:
+            freq_CFL = -1.0
+        self._sendbuf[:] = float(stop_signal), time_now, freq_CFL, float(has_nan)
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(self._sendbuf, self._recvbuf, op=mpi.MPI.MAX)
+        else:
+            self._recvbuf[:] = self._sendbuf
+        stop_signal, time_now, freq_CFL, has_nan = self._recvbuf
+        if freq_CFL < 0:
+            freq_CFL = None
+        return int(stop_signal), time_now, freq_CFL, bool(has_nan)
+
+
 class TimeSteppingBase0:
     """Universal time stepping class used for all solvers."""
 
@@ -102,6 +225,8 @@ max_elapsed: number or str (default None)
 
         self._stop_signal_received = False
         self._has_to_stop = False
+        # set to True when a NaN is detected (if it can be handled)
+        self._has_nan = False
 
         def handler_signals(signal_number, stack):
             print(f"signal {signal_number} received (rank {mpi.rank}).")
@@ -141,6 +266,8 @@ max_elapsed: number or str (default None)
         else:
             self.max_elapsed = None
 
+        self._control_channel = ControlChannel()
+
     def start(self):
         """Loop to run the function :func:`one_time_step`.
 
@@ -198,43 +325,82 @@ max_elapsed: number or str (default None)
 
         if params_stepping.USE_T_END:
             print_stdout(f"    compute until t = {params_stepping.t_end:10.6g}")
-            while self.t < params_stepping.t_end and not self._has_to_stop:
-                self.one_time_step()
+
+            def has_to_continue():
+                return self.t < params_stepping.t_end and not self._has_to_stop
+
         else:
             print_stdout(f"    compute until it = {params_stepping.it_end:8d}")
-            while self.it < params_stepping.it_end and not self._has_to_stop:
+
+            def has_to_continue():
+                return self.it < params_stepping.it_end and not self._has_to_stop
+
+        while True:
+            while has_to_continue():
                 self.one_time_step()
+            # a NaN produced by the last time step has not yet been handled
+            if not self._is_nan_detected():
+                break
+            self._rollback()
+
+    def _compute_freq_CFL_loc(self):
+        """Compute the CFL frequency for this process (None if not used)"""
+        return None
+
+    def _compute_time_increment_CLF_from_freq(self, freq_CFL):
+        """Compute the time increment from the global CFL frequency"""
+        raise NotImplementedError
+
+    def _reduce_control_values(self):
+        """Global reduction of the control values"""
+        if self.params.time_stepping.USE_CFL:
+            freq_CFL = self._compute_freq_CFL_loc()
+        else:
+            freq_CFL = None
+        return self._control_channel.reduce(
+            self._stop_signal_received, time(), freq_CFL, self._has_nan
+        )
+
+    def _is_nan_detected(self):
+        """Check if a NaN has been detected by one of the processes"""
+        has_nan = self._has_nan
+        if mpi.nb_proc > 1:
+            has_nan = mpi.comm.allreduce(has_nan, op=mpi.MPI.LOR)
+        return has_nan
+
+    def _rollback(self):
+        """Handle a NaN detected by one of the processes"""
+        raise ValueError(f"nan at it = {self.it}, t = {self.t:.4f}")
+
+    def _save_snapshot_if_needed(self):
+        """Called when the state is known to be valid for all processes"""
 
     def one_time_step(self):
         """Main time stepping function."""
-        if self.params.time_stepping.USE_CFL:
-            self.compute_time_increment_CLF()
+        stop_signal, time_now, freq_CFL, has_nan = self._reduce_control_values()
+
+        if has_nan:
+            # the time increment is recomputed during the rollback
+            self._rollback()
+        else:
+            self._save_snapshot_if_needed()
+            if self.params.time_stepping.USE_CFL:
+                if freq_CFL is None:
+                    self.compute_time_increment_CLF()
+                else:
+                    self._compute_time_increment_CLF_from_freq(freq_CFL)
         if self.sim.is_forcing_enabled:
             self.sim.forcing.compute()
-        if self.max_elapsed is not None:
-            if mpi.rank == 0:
-                now = time()
-            else:
-                now = None
-            if mpi.nb_proc > 1:
-                now = mpi.comm.bcast(now, root=0)
-            if now > self._time_should_stop:
-                self.sim.output.print_stdout(
-                    "Maximum elapsed time reached. Should stop soon."
-                )
-                self._has_to_stop = True
-
-        if mpi.nb_proc > 1:
-            # 1 bcast per timestep, but at least it's robust
-            stop_signal_received = mpi.comm.bcast(
-                self._stop_signal_received, root=0
+        if self.max_elapsed is not None and time_now > self._time_should_stop:
+            self.sim.output.print_stdout(
+                "Maximum elapsed time reached. Should stop soon."
             )
-        else:
-            stop_signal_received = self._stop_signal_received
-        if stop_signal_received:
-            stop_signal_received = signal.Signals(stop_signal_received).name
+            self._has_to_stop = True
+
+        if stop_signal:
+            stop_signal = signal.Signals(stop_signal).name
             self.sim.output.print_stdout(
-                f"Stop signal ({stop_signal_received}) received so _has_to_stop set to True"
+                f"Stop signal ({stop_signal}) received so _has_to_stop set to True"
             )
             self._has_to_stop = True
 
@@ -276,22 +442,20 @@ class TimeSteppingBase(TimeSteppingBase0):
         has_uz = has_vars("uz") or has_vars("vz")
         has_eta = has_vars("eta")
 
+        self._deltat_wave = inf
+
         if has_ux and has_uy and has_uz:
-            self.compute_time_increment_CLF = (
-                self._compute_time_increment_CLF_uxuyuz
-            )
+            self._compute_freq_CFL_loc = self._compute_freq_CFL_loc_uxuyuz
         elif has_ux and has_uy and has_eta:
-            self.compute_time_increment_CLF = (
-                self._compute_time_increment_CLF_uxuyeta
-            )
+            self._compute_freq_CFL_loc = self._compute_freq_CFL_loc_uxuy
+            if params_ts.USE_CFL:
+                self._deltat_wave = self._compute_deltat_wave_eta()
         elif has_ux and has_uy:
-            self.compute_time_increment_CLF = (
-                self._compute_time_increment_CLF_uxuy
-            )
+            self._compute_freq_CFL_loc = self._compute_freq_CFL_loc_uxuy
         elif has_ux:
-            self.compute_time_increment_CLF = self._compute_time_increment_CLF_ux
+            self._compute_freq_CFL_loc = self._compute_freq_CFL_loc_ux
         elif hasattr(self.params, "U"):
-            self.compute_time_increment_CLF = self._compute_time_increment_CLF_U
+            self._compute_freq_CFL_loc = self._compute_freq_CFL_loc_U
         elif params_ts.USE_CFL:
             raise ValueError("params_ts.USE_CFL but no velocity.")
 
@@ -319,61 +483,79 @@ class TimeSteppingBase(TimeSteppingBase0):
         else:
             return self.it >= self.params.time_stepping.it_end
 
-    def _compute_time_increment_CLF_uxuyuz(self):
+    def compute_time_increment_CLF(self):
         """Compute the time increment deltat with a CLF condition."""
-        get_var = self.sim.state.get_var
-        ux = get_var("vx")
-        uy = get_var("vy")
-        uz = get_var("vz")
-
-        if ux.size > 0:
-            max_ux = max_abs(ux)
-            max_uy = max_abs(uy)
-            max_uz = max_abs(uz)
-            tmp = (
-                max_ux / self.sim.oper.deltax
-                + max_uy / self.sim.oper.deltay
-                + max_uz / self.sim.oper.deltaz
-            )
-        else:
-            tmp = 0.0
-
-        self._compute_time_increment_CLF_from_tmp(tmp)
-
-    def _compute_time_increment_CLF_from_tmp(self, tmp):
-
+        freq_CFL = self._compute_freq_CFL_loc()
         if mpi.nb_proc > 1:
-            tmp = mpi.comm.allreduce(tmp, op=mpi.MPI.MAX)
+            freq_CFL = mpi.comm.allreduce(freq_CFL, op=mpi.MPI.MAX)
+        self._compute_time_increment_CLF_from_freq(freq_CFL)
 
-        if tmp > 0:
-            deltat_CFL = self.CFL / tmp
+    def _compute_time_increment_CLF_from_freq(self, freq_CFL):
+        """Compute the time increment from the global CFL frequency."""
+        if freq_CFL > 0:
+            deltat_CFL = self.CFL / freq_CFL
         else:
             deltat_CFL = self.deltat_max
 
-        maybe_new_dt = min(deltat_CFL, self.deltat_max)
+        maybe_new_dt = min(deltat_CFL, self._deltat_wave, self.deltat_max)
         normalize_diff = abs(self.deltat - maybe_new_dt) / maybe_new_dt
 
         if normalize_diff > 0.02:
             self.deltat = maybe_new_dt
 
-    def _compute_time_increment_CLF_uxuy(self):
-        """Compute the time increment deltat with a CLF condition."""
+    def _reduce_deltat_limits(self, coef):
+        """Multiply the CFL coefficient and the upper bounds of the time
+        increment by coef (used after a rollback)"""
+        self.CFL *= coef
+        self.deltat_max *= coef
+        if self._deltat_wave != inf:
+            self._deltat_wave = self._compute_deltat_wave_eta()
+
+    def _compute_freq_CFL_loc_uxuyuz(self):
+        """Compute the local CFL frequency (velocity with 3 components)."""
+        get_var = self.sim.state.get_var
+        ux = get_var("vx")
+        if ux.size == 0:
+            return 0.0
+        uy = get_var("vy")
+        uz = get_var("vz")
+        oper = self.sim.oper
+        return compute_freq_CFL_3comp(
+            ux.reshape(-1),
+            uy.reshape(-1),
+            uz.reshape(-1),
+            1.0 / oper.deltax,
+            1.0 / oper.deltay,
+            1.0 / oper.deltaz,
+        )
 
+    def _compute_freq_CFL_loc_uxuy(self):
+        """Compute the local CFL frequency (velocity with 2 components)."""
         ux = self.sim.state.get_var("ux")
+        if ux.size == 0:
+            return 0.0
         uy = self.sim.state.get_var("uy")
+        oper = self.sim.oper
+        return compute_freq_CFL_2comp(
+            ux.reshape(-1),
+            uy.reshape(-1),
+            1.0 / oper.deltax,
+            1.0 / oper.deltay,
+        )
 
-        max_ux = max_abs(ux)
-        max_uy = max_abs(uy)
-        tmp = max_ux / self.sim.oper.deltax + max_uy / self.sim.oper.deltay
-
-        self._compute_time_increment_CLF_from_tmp(tmp)
-
-    def _compute_time_increment_CLF_uxuyeta(self):
-        """Compute the time increment deltat with a CLF condition."""
-
+    def _compute_freq_CFL_loc_ux(self):
+        """Compute the local CFL frequency (velocity with 1 component)."""
         ux = self.sim.state.get_var("ux")
-        uy = self.sim.state.get_var("uy")
+        if ux.size == 0:
+            return 0.0
+        return compute_freq_CFL_1comp(ux.reshape(-1), 1.0 / self.sim.oper.deltax)
+
+    def _compute_freq_CFL_loc_U(self):
+        """Compute the CFL frequency from the velocity scale params.U."""
+        return self.params.U / self.sim.oper.deltax
 
+    def _compute_deltat_wave_eta(self):
+        """Compute the time increment associated with the fastest wave."""
         params = self.sim.params
         try:
             f = params.f
@@ -393,39 +575,7 @@ class TimeSteppingBase(TimeSteppingBase0):
 
             cph = (f**2 / k_min**2 + params.c2) ** 0.5
 
-        max_ux = max_abs(ux)
-        max_uy = max_abs(uy)
-        tmp = max_ux / self.sim.oper.deltax + max_uy / self.sim.oper.deltay
-
-        if mpi.nb_proc > 1:
-            tmp = mpi.comm.allreduce(tmp, op=mpi.MPI.MAX)
-
-        if tmp > 0:
-            deltat_CFL = self.CFL / tmp
-        else:
-            deltat_CFL = self.deltat_max
-
-        deltat_wave = (
-            self.CFL * min(self.sim.oper.deltax, self.sim.oper.deltay) / cph
-        )
-        maybe_new_dt = min(deltat_CFL, deltat_wave, self.deltat_max)
-        normalize_diff = abs(self.deltat - maybe_new_dt) / maybe_new_dt
-
-        if normalize_diff > 0.02:
-            self.deltat = maybe_new_dt
-
-    def _compute_time_increment_CLF_ux(self):
-        """Compute the time increment deltat with a CLF condition."""
-        ux = self.sim.state.get_var("ux")
-        max_ux = max_abs(ux)
-        tmp = max_ux / self.sim.oper.deltax
-        self._compute_time_increment_CLF_from_tmp(tmp)
-
-    def _compute_time_increment_CLF_U(self):
-        """Compute the time increment deltat with a CLF condition."""
-        max_ux = self.params.U
-        tmp = max_ux / self.sim.oper.deltax
-        self._compute_time_increment_CLF_from_tmp(tmp)
+        return self.CFL * min(self.sim.oper.deltax, self.sim.oper.deltay) / cph
 
     def _compute_dispersion_relation(self):
         """Compute time increment from a dispersion relation."""
@@ -12,12 +12,13 @@ Provides:
 from copy import deepcopy
 
 import numpy as np
-import scipy.sparse as sparse
-from scipy.sparse.linalg import spsolve
 
 from fluidsim.base.setofvariables import SetOfVariables
 
 from .base import TimeSteppingBase
+from fluidsim.util.lazy import lazy_import
+
+sparse = lazy_import("scipy.sparse")
 
 
 class TimeSteppingFiniteDiffCrankNicolson(TimeSteppingBase):
@@ -130,7 +131,7 @@ class TimeSteppingFiniteDiffCrankNicolson(TimeSteppingBase):
     def invert_to_get_solution(self, A, b):
         """Solve the linear system :math:`Ax = b`."""
         state_phys = self.sim.state.state_phys
-        arr = spsolve(A, b).reshape(state_phys.shape)
+        arr = sparse.linalg.spsolve(A, b).reshape(state_phys.shape)
         return SetOfVariables(
             input_array=arr, keys=state_phys.keys, info=state_phys.info
         )
@@ -7,6 +7,9 @@ Provides:
    :members:
    :private-members:
 
+.. autoclass:: SnapshotRing
+   :members:
+
 .. todo::
 
   It would be interesting to also implement the Adams-Bashforth (leapfrog)
@@ -27,6 +30,8 @@ import numpy as np
 
 from transonic import Transonic, Type, NDim, Array, boost, Union
 
+from fluiddyn.util import mpi
+
 from .base import TimeSteppingBase
 
 ts = Transonic()
@@ -151,6 +156,51 @@ class ExactLinearCoefs:
         return self.exact, self.exact2
 
 
+class SnapshotRing:
+    """Ring of the last spectral states (stored in preallocated buffers)"""
+
+    def __init__(self, state_spect, nb_snapshots):
+        self.nb_snapshots = nb_snapshots
+        self.buffers = np.empty(
+            (nb_snapshots,) + state_spect.shape, dtype=state_spect.dtype
+        )
+        self.times = np.empty(nb_snapshots)
+        self.its = np.empty(nb_snapshots, dtype=np.int64)
+        self.deltats = np.empty(nb_snapshots)
+        self.nb_saved = 0
+        self._index_last = -1
+
+    @property
+    def it_last(self):
+        """Time index of the last snapshot (None if there is no snapshot)"""
+        if self.nb_saved == 0:
+            return None
+        return int(self.its[self._index_last])
+
+    def save(self, state_spect, t, it, deltat):
+        """Copy a state in the buffer of the oldest snapshot"""
+        index = (self._index_last + 1) % self.nb_snapshots
+        np.copyto(self.buffers[index], state_spect)
+        self.times[index] = t
+        self.its[index] = it
+        self.deltats[index] = deltat
+        self._index_last = index
+        self.nb_saved = min(self.nb_saved + 1, self.nb_snapshots)
+
+    def restore_last(self, state_spect):
+        """Copy the last snapshot in state_spect and return (t, it, deltat)"""
+        index = self._index_last
+        np.copyto(state_spect, self.buffers[index])
+        return self.times[index], int(self.its[index]), self.deltats[index]
+
+    def drop_last(self):
+        """Forget the last snapshot"""
+        if self.nb_saved == 0:
+            return
+        self._index_last = (self._index_last - 1) % self.nb_snapshots
+        self.nb_saved -= 1
+
+
 class TimeSteppingPseudoSpectral(TimeSteppingBase):
     """Time stepping class for pseudo-spectral solvers."""
 
@@ -165,6 +215,47 @@ class TimeSteppingPseudoSpectral(TimeSteppingBase):
             attribs=dict(nb_pairs=1, nb_steps_compute_new_pair=None),
         )
 
+        params.time_stepping._set_child(
+            "rollback",
+            attribs=dict(
+                nb_snapshots=0,
+                nb_steps_snapshots=100,
+                coef_reduce_deltat=0.5,
+                max_nb_rollbacks=10,
+                stride_check_nan=11,
+            ),
+        )
+        params.time_stepping.rollback._set_doc(
+            """
+Automatic rollback when a NaN is detected (disabled by default).
+
+nb_snapshots: int (default 0)
+
+    Number of spectral states kept in memory (each snapshot uses the memory of
+    ``state_spect``). If 0, the simulation stops when a NaN is detected.
+
+nb_steps_snapshots: int (default 100)
+
+    Number of time steps between two snapshots.
+
+coef_reduce_deltat: float (default 0.5)
+
+    After a rollback, the CFL coefficient and the upper bounds of the time
+    increment (``deltat_max`` and the limits given by the waves) or
+    ``deltat`` (if USE_CFL is False) are multiplied by this coefficient.
+
+max_nb_rollbacks: int (default 10)
+
+    Maximum number of rollbacks during a simulation.
+
+stride_check_nan: int (default 11)
+
+    Only one mode out of ``stride_check_nan`` is checked (a NaN in physical
+    space contaminates all the modes).
+
+"""
+        )
+
     def __init__(self, sim):
         super().__init__(sim)
         self.init_from_params()
@@ -174,6 +265,111 @@ class TimeSteppingPseudoSpectral(TimeSteppingBase):
         self._init_compute_time_step()
         self._init_exact_linear_coef()
         self._init_time_scheme()
+        self._init_rollback()
+
+    def _init_rollback(self):
+        try:
+            params_rollback = self.params.time_stepping.rollback
+        except AttributeError:
+            # parameters of old simulations
+            params_rollback = None
+
+        self.rollback_events = []
+        self._it_last_rollback = None
+        if params_rollback is None or not params_rollback.nb_snapshots:
+            self._snapshot_ring = None
+            return
+
+        self._params_rollback = params_rollback
+        self._snapshot_ring = SnapshotRing(
+            self.sim.state.state_spect, params_rollback.nb_snapshots
+        )
+
+    def _check_nan(self):
+        """Check that there is no NaN in the state
+
+        Raise a ValueError if the rollback mechanism is not enabled.
+
+        """
+        state_spect = self.sim.state.state_spect
+        if self._snapshot_ring is None:
+            # np.isnan(np.sum seems to be really fast
+            if np.isnan(np.sum(state_spect[0])):
+                raise ValueError(f"nan at it = {self.it}, t = {self.t:.4f}")
+            return
+        stride = max(1, self._params_rollback.stride_check_nan)
+        values = state_spect.reshape(-1)[::stride]
+        self._has_nan = bool(np.isnan(np.sum(values)))
+
+    def _save_snapshot_if_needed(self):
+        ring = self._snapshot_ring
+        if (
+            ring is None
+            or self.it % self._params_rollback.nb_steps_snapshots
+            or ring.it_last == self.it
+        ):
+            return
+        ring.save(self.sim.state.state_spect, self.t, self.it, self.deltat)
+
+    def _rollback(self):
+        """Restore the last valid snapshot and reduce the time step"""
+        ring = self._snapshot_ring
+        if ring is None:
+            super()._rollback()
+
+        params_rollback = self._params_rollback
+        if len(self.rollback_events) >= params_rollback.max_nb_rollbacks:
+            raise ValueError(
+                f"nan at it = {self.it}, t = {self.t:.4f} "
+                f"(maximum number of rollbacks reached)"
+            )
+
+        if ring.it_last == self._it_last_rollback:
+            # NaN again before a new snapshot: go further back
+            ring.drop_last()
+        if ring.nb_saved == 0:
+            raise ValueError(
+                f"nan at it = {self.it}, t = {self.t:.4f} (no snapshot)"
+            )
+
+        it_nan = self.it
+        t_nan = self.t
+        state = self.sim.state
+        self.t, self.it, deltat = ring.restore_last(state.state_spect)
+        state.statephys_from_statespect()
+        state.clear_computed()
+        self._has_nan = False
+        self._it_last_rollback = self.it
+
+        coef = params_rollback.coef_reduce_deltat
+        if self.params.time_stepping.USE_CFL:
+            self._reduce_deltat_limits(coef)
+            self.compute_time_increment_CLF()
+        else:
+            self.deltat = min(self.deltat, deltat) * coef
+            self.exact_linear_coefs.compute(self.deltat)
+
+        event = dict(
+            it_nan=it_nan,
+            t_nan=t_nan,
+            it=self.it,
+            t=self.t,
+            deltat=self.deltat,
+            deltat_max=self.deltat_max,
+        )
+        if self.params.time_stepping.USE_CFL:
+            event["CFL"] = self.CFL
+        self.rollback_events.append(event)
+
+        self.sim.output.print_stdout(
+            f"NaN detected at it = {it_nan}, t = {t_nan:.4f}: rollback to "
+            f"it = {self.it}, t = {self.t:.4f} (new deltat = {self.deltat:.4g}"
+            + (
+                f", CFL = {self.CFL:.3g})"
+                if self.params.time_stepping.USE_CFL
+                else ")"
+            )
+        )
 
     def _init_freq_lin(self):
         f_d, f_d_hypo = self.sim.compute_freq_diss()
@@ -238,9 +434,7 @@ class TimeSteppingPseudoSpectral(TimeSteppingBase):
         self._time_step_RK()
         self.sim.oper.dealiasing(self.sim.state.state_spect)
         self.sim.state.statephys_from_statespect()
-        # np.isnan(np.sum seems to be really fast
-        if np.isnan(np.sum(self.sim.state.state_spect[0])):
-            raise ValueError(f"nan at it = {self.it}, t = {self.t:.4f}")
+        self._check_nan()
 
     def _time_step_Euler(self):
         r"""Forward Euler method.
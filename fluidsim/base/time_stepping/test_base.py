@@ -0,0 +1,47 @@
+import numpy as np
+
+from fluidsim.base.time_stepping.base import (
+    ControlChannel,
+    compute_freq_CFL_1comp,
+    compute_freq_CFL_2comp,
+    compute_freq_CFL_3comp,
+    compute_freq_CFL_3comp_numpy,
+    max_abs,
+)
+
+
+def test_compute_freq_CFL():
+    rng = np.random.default_rng(0)
+    vx, vy, vz = rng.standard_normal((3, 100))
+    vy[10] = -20.0
+    coefs = (1.0, 2.0, 0.5)
+
+    freq_x = max_abs(vx) * coefs[0]
+    freq_y = max_abs(vy) * coefs[1]
+    freq_z = max_abs(vz) * coefs[2]
+
+    assert np.isclose(compute_freq_CFL_1comp(vx, coefs[0]), freq_x)
+    assert np.isclose(compute_freq_CFL_2comp(vx, vy, *coefs[:2]), freq_x + freq_y)
+    result = compute_freq_CFL_3comp(vx, vy, vz, *coefs)
+    assert np.isclose(result, freq_x + freq_y + freq_z)
+    assert np.isclose(result, compute_freq_CFL_3comp_numpy(vx, vy, vz, *coefs))
+
+
+def test_control_channel():
+    channel = ControlChannel()
+
+    stop_signal, time_now, freq_CFL, has_nan = channel.reduce(False, 10.0, None)
+    assert stop_signal == 0
+    assert time_now == 10.0
+    assert freq_CFL is None
+    assert not has_nan
+
+    stop_signal, time_now, freq_CFL, has_nan = channel.reduce(15, 11.0, 2.5)
+    assert stop_signal == 15
+    assert freq_CFL == 2.5
+
+    stop_signal, time_now, freq_CFL, has_nan = channel.reduce(
+        False, 12.0, float("nan"), has_nan=True
+    )
+    assert freq_CFL is None
+    assert has_nan
@@ -11,8 +11,6 @@ from pathlib import Path
 import numbers
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 from fluidfft.fft3d.operators import vector_product
@@ -20,6 +18,10 @@ from fluidfft.fft3d.operators import vector_product
 from fluidsim.base.output.base import SpecificOutput
 
 from . import SimulExtender
+from fluidsim.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SpatialMeansRegions(SimulExtender, SpecificOutput):
@@ -151,6 +153,10 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
                 (xmin, xmax, ixmin, ixmax, ixmin_loc, ixmax_surf_loc, ixstop_loc)
             )
 
+        self.xmins_xmaxs_regions = [
+            info_region[:2] for info_region in self.info_regions
+        ]
+
         super().__init__(
             output, period_save=params.output.periods_save.spatial_means_regions
         )
@@ -158,41 +164,52 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
         if self.period_save == 0:
             return
 
-        self.masks = []
-        self.nb_points = []
-
-        self.nb_points_xmin = []
-        self.nb_points_xmax = []
+        # The regions are slabs along x so that the reductions over the regions
+        # can be done in two steps: sum over z and y (one pass over a field)
+        # and then product with an indicator matrix (nb_regions, nx_loc).
+        nz_loc, ny_loc, nx_loc = oper.shapeX_loc
+        self.indicator_regions = np.zeros((self.nb_regions, nx_loc))
+
+        # local indices of the x surfaces xmin and xmax of the regions in this
+        # process and matrix to go from the sums over these surfaces to the
+        # sums for each region (xmin and xmax, shape (2*nb_regions, nb_surf))
+        self.ixs_surfaces_loc = sorted(
+            set(
+                ix_loc
+                for info_region in self.info_regions
+                for ix_loc in info_region[4:6]
+                if ix_loc is not None
+            )
+        )
+        self.indicator_surfaces = np.zeros(
+            (2 * self.nb_regions, len(self.ixs_surfaces_loc))
+        )
 
-        for info_region in self.info_regions:
+        for iregion, info_region in enumerate(self.info_regions):
             (ixmin_loc, ixmax_surf_loc, ixstop_loc) = info_region[4:]
-            mask_loc = np.zeros(shape=oper.shapeX_loc, dtype=np.int8)
-            mask_loc[:, :, ixmin_loc:ixstop_loc] = 1
-            self.masks.append(mask_loc)
-
-            nb_points = mask_loc.sum()
-            if mpi.nb_proc > 1:
-                nb_points = mpi.comm.allreduce(nb_points, op=mpi.MPI.SUM)
-            self.nb_points.append(nb_points)
-
-            def compute_nb_points_surface(ixsurface_loc):
+            self.indicator_regions[iregion, ixmin_loc:ixstop_loc] = 1.0
+            for index, ixsurface_loc in enumerate((ixmin_loc, ixmax_surf_loc)):
                 if ixsurface_loc is not None:
-                    nz_loc = oper.shapeX_loc[0]
-                    ny_loc = oper.shapeX_loc[1]
-                    nb_points_xsurface_loc = ny_loc * nz_loc
-                else:
-                    nb_points_xsurface_loc = np.int8(0)
-                if mpi.nb_proc > 1:
-                    nb_points_xsurface = mpi.comm.allreduce(
-                        nb_points_xsurface_loc, op=mpi.MPI.SUM
-                    )
-                else:
-                    nb_points_xsurface = nb_points_xsurface_loc
-
-                return nb_points_xsurface
+                    self.indicator_surfaces[
+                        2 * iregion + index,
+                        self.ixs_surfaces_loc.index(ixsurface_loc),
+                    ] = 1.0
+
+        nb_points = np.concatenate(
+            (
+                nz_loc * ny_loc * self.indicator_regions.sum(axis=1),
+                nz_loc * ny_loc * self.indicator_surfaces.sum(axis=1),
+            )
+        )
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, nb_points, op=mpi.MPI.SUM)
 
-            self.nb_points_xmin.append(compute_nb_points_surface(ixmin_loc))
-            self.nb_points_xmax.append(compute_nb_points_surface(ixmax_surf_loc))
+        self.nb_points = nb_points[: self.nb_regions]
+        nb_points_surfaces = nb_points[self.nb_regions :].reshape(
+            self.nb_regions, 2
+        )
+        self.nb_points_xmin = nb_points_surfaces[:, 0]
+        self.nb_points_xmax = nb_points_surfaces[:, 1]
 
         self._save_one_time()
 
@@ -262,41 +279,60 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
         if self._has_to_online_save():
             self._save_one_time()
 
-    def _compute_means_regions(self, field):
-        results = []
-        for nb_points, mask in zip(self.nb_points, self.masks):
-            result = (mask * field).sum()
-            if mpi.nb_proc > 1:
-                result = mpi.comm.allreduce(result, op=mpi.MPI.SUM)
-            results.append(result / nb_points)
-        return np.array(results)
-
-    def _compute_fluxes_regions(self, field, vx):
-        """Compute for each region the fluxes over xmin and xmax surface"""
-        fluxes = []
-        for index_region, info_region in enumerate(self.info_regions):
-            xmin, xmax = info_region[:2]
-            length_region = xmax - xmin
-            ixmin_loc, ixmax_surf_loc = info_region[4:-1]
-
-            def compute_flux(nb_points_surfaces, ixsurface_loc):
-                nb_points_surface = nb_points_surfaces[index_region]
-                if ixsurface_loc is not None:
-                    field_xsurface = field[:, :, ixsurface_loc]
-                    vx_xsurface = vx[:, :, ixsurface_loc]
-                    sum_xsurface = (vx_xsurface * field_xsurface).sum()
-                else:
-                    sum_xsurface = 0.0
-                if mpi.nb_proc > 1:
-                    sum_xsurface = mpi.comm.allreduce(
-                        sum_xsurface, op=mpi.MPI.SUM
-                    )
-                return sum_xsurface / nb_points_surface / length_region
-
-            flux_xmin = compute_flux(self.nb_points_xmin, ixmin_loc)
-            flux_xmax = -compute_flux(self.nb_points_xmax, ixmax_surf_loc)
-            fluxes.append((flux_xmin, flux_xmax))
-        return np.array(fluxes)
+    def _sum_regions_loc(self, field):
+        """Local sums of a field over the regions (no MPI reduction)"""
+        return self.indicator_regions @ field.sum(axis=(0, 1))
+
+    def _sum_surfaces_loc(self, field, vx):
+        """Local sums of vx * field over the surfaces xmin and xmax
+
+        Returns an array of shape (2*nb_regions,) (no MPI reduction).
+
+        """
+        if not self.ixs_surfaces_loc:
+            return np.zeros(2 * self.nb_regions)
+        ixs = self.ixs_surfaces_loc
+        sums_surfaces = (vx[:, :, ixs] * field[:, :, ixs]).sum(axis=(0, 1))
+        return self.indicator_surfaces @ sums_surfaces
+
+    def _compute_means_fluxes_regions(self, sums_regions, sums_surfaces):
+        """Reduce over the processes and normalize the local sums
+
+        All quantities are reduced with only one call to ``Allreduce``.
+
+        Parameters
+        ----------
+
+        sums_regions : list of arrays (nb_regions,)
+
+        sums_surfaces : list of arrays (2*nb_regions,)
+
+        Returns
+        -------
+
+        means : np.ndarray (len(sums_regions), nb_regions)
+
+        fluxes : np.ndarray (len(sums_surfaces), nb_regions, 2)
+
+          Fluxes through the surfaces xmin and xmax.
+
+        """
+        nb_quantities = len(sums_regions)
+        sums = np.concatenate(sums_regions + sums_surfaces)
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, sums, op=mpi.MPI.SUM)
+
+        nb_values_means = nb_quantities * self.nb_regions
+        means = sums[:nb_values_means].reshape(nb_quantities, self.nb_regions)
+        means /= self.nb_points
+
+        fluxes = sums[nb_values_means:].reshape(-1, self.nb_regions, 2)
+        lengths = np.array(
+            [xmax - xmin for xmin, xmax in self.xmins_xmaxs_regions]
+        )
+        fluxes[:, :, 0] /= self.nb_points_xmin * lengths
+        fluxes[:, :, 1] /= -self.nb_points_xmax * lengths
+        return means, fluxes
 
     def _save_one_time(self):
         tsim = self.sim.time_stepping.t
@@ -315,20 +351,21 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
         vy = get_var("vy")
         vz = get_var("vz")
 
-        N2b2 = 0.5 / self.sim.params.N**2 * b * b
-        EAs = self._compute_means_regions(N2b2)
+        N2 = self.sim.params.N**2
+        N2b2 = 0.5 / N2 * b * b
+        sums_regions = [self._sum_regions_loc(N2b2)]
 
         vh2 = 0.5 * (vx * vx + vy * vy)
         vz2 = 0.5 * vz * vz
-        v2_over_2 = vh2 + vz2
 
-        EKhs = self._compute_means_regions(vh2)
-        EKzs = self._compute_means_regions(vz2)
-        del vh2, vz2
+        sums_regions.append(self._sum_regions_loc(vh2))
+        sums_regions.append(self._sum_regions_loc(vz2))
 
-        EKs = EKhs + EKzs
+        v2_over_2 = vh2
+        v2_over_2 += vz2
+        del vh2, vz2
 
-        conv_K2A = -self._compute_means_regions(b * vz)
+        sums_regions.append(-self._sum_regions_loc(b * vz))
 
         get_var = state.state_spect.get_var
         b_fft = get_var("b_fft")
@@ -341,15 +378,12 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
         f_d_vx = ifft(f_d * vx_fft)
         f_d_vy = ifft(f_d * vy_fft)
         f_d_vz = ifft(f_d * vz_fft)
-        epsKs = self._compute_means_regions(
-            vx * f_d_vx + vy * f_d_vy + vz * f_d_vz
+        sums_regions.append(
+            self._sum_regions_loc(vx * f_d_vx + vy * f_d_vy + vz * f_d_vz)
         )
         del f_d_vx, f_d_vy, f_d_vz
 
-        epsAs = [
-            epsA / self.sim.params.N**2
-            for epsA in self._compute_means_regions(b * ifft(f_d * b_fft))
-        ]
+        sums_regions.append(self._sum_regions_loc(b * ifft(f_d * b_fft)) / N2)
 
         if self.sim.params.forcing.enable:
             deltat = self.sim.time_stepping.deltat
@@ -363,12 +397,14 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
             fx = ifft(fx_fft)
             fy = ifft(fy_fft)
 
-            PKs = self._compute_means_regions(
-                vx * fx + vy * fy + (abs(fx) ** 2 + abs(fy) ** 2) * deltat / 2
+            sums_regions.append(
+                self._sum_regions_loc(
+                    vx * fx + vy * fy + (abs(fx) ** 2 + abs(fy) ** 2) * deltat / 2
+                )
             )
 
         else:
-            PKs = np.zeros(3)
+            sums_regions.append(np.zeros(self.nb_regions))
 
         # Compute spatial fluxes
         # Need to compute the pressure P = v^2/2 + p
@@ -416,19 +452,37 @@ class SpatialMeansRegions(SimulExtender, SpecificOutput):
         P_nl = ifft(P_nl_fft)
         del P_nl_fft
 
+        P_dz_b = -ifft(1j * oper.Kz * b_fft / oper.K2_not0)
+
+        sums_surfaces = [
+            self._sum_surfaces_loc(P_nl, vx),
+            self._sum_surfaces_loc(v2_over_2, vx),
+        ]
+
         if self.sim.params.forcing.enable:
             fz_fft = forcing_fft.get_var("vz_fft")
             P_forcing = -ifft(
                 oper.divfft_from_vecfft(fx_fft, fy_fft, fz_fft) / oper.K2_not0
             )
+            sums_surfaces.append(self._sum_surfaces_loc(P_forcing, vx))
+        else:
+            sums_surfaces.append(np.zeros(2 * self.nb_regions))
 
-        P_dz_b = -ifft(1j * oper.Kz * b_fft / oper.K2_not0)
+        sums_surfaces.append(self._sum_surfaces_loc(P_dz_b, vx))
+        sums_surfaces.append(self._sum_surfaces_loc(N2b2, vx))
 
-        fluxes_P_nl = self._compute_fluxes_regions(P_nl, vx)
-        fluxes_v2 = self._compute_fluxes_regions(v2_over_2, vx)
-        fluxes_P_forcing = self._compute_fluxes_regions(P_forcing, vx)
-        fluxes_P_dz_b = self._compute_fluxes_regions(P_dz_b, vx)
-        fluxes_A = self._compute_fluxes_regions(N2b2, vx)
+        means, fluxes = self._compute_means_fluxes_regions(
+            sums_regions, sums_surfaces
+        )
+        EAs, EKhs, EKzs, conv_K2A, epsKs, epsAs, PKs = means
+        EKs = EKhs + EKzs
+        (
+            fluxes_P_nl,
+            fluxes_v2,
+            fluxes_P_forcing,
+            fluxes_P_dz_b,
+            fluxes_A,
+        ) = fluxes
 
         if mpi.rank > 0:
             return
@@ -1,8 +1,12 @@
-"""Operators finite differences (:mod:`fluidsim.operators.op_finitediff2d`)
+"""Operators finite differences (:mod:`fluidsim.operators.op_finitediff1d`)
 ===========================================================================
 
 Provides:
 
+.. autofunction:: stencil_px_1d
+
+.. autofunction:: stencil_pxx_1d
+
 .. autoclass:: OperatorFiniteDiff1DPeriodic
    :members:
    :private-members:
@@ -11,6 +15,8 @@ Provides:
 
 import numpy as np
 
+from transonic import boost, Array
+
 try:
     import scipy.sparse as sparse
 except ImportError:
@@ -18,8 +24,35 @@ except ImportError:
 
 from .base import OperatorsBase1D
 
+A1 = Array[np.float64, "1d"]
+
+
+@boost
+def stencil_px_1d(a: A1, out: A1, coef: float):
+    """Centered first derivative (periodic), ``coef = 1 / (2 dx)``"""
+    out[1:-1] = coef * (a[2:] - a[:-2])
+    out[0] = coef * (a[1] - a[-1])
+    out[-1] = coef * (a[0] - a[-2])
+    return out
+
+
+@boost
+def stencil_pxx_1d(a: A1, out: A1, coef: float):
+    """Centered second derivative (periodic), ``coef = 1 / dx**2``"""
+    out[1:-1] = coef * (a[2:] - 2 * a[1:-1] + a[:-2])
+    out[0] = coef * (a[1] - 2 * a[0] + a[-1])
+    out[-1] = coef * (a[0] - 2 * a[-1] + a[-2])
+    return out
+
 
 class OperatorFiniteDiff1DPeriodic(OperatorsBase1D):
+    """Finite difference operator 1D (periodic, uniform grid)
+
+    The derivatives are computed with stencil kernels. The sparse matrices
+    (``sparse_px`` and ``sparse_pxx``) are kept for the implicit solves.
+
+    """
+
     def __init__(self, params=None):
         super().__init__(params)
         nx = self.nx
@@ -39,11 +72,18 @@ class OperatorFiniteDiff1DPeriodic(OperatorsBase1D):
 
         self.sparse_pxx = self.sparse_pxx / dx**2
 
-    def px(self, a):
-        return self.sparse_px.dot(a.flat)
+    def _get_out(self, a, out):
+        if out is None:
+            out = np.empty_like(a, dtype=np.float64)
+        return out
+
+    def px(self, a, out=None):
+        """Compute the first derivative along x"""
+        return stencil_px_1d(a, self._get_out(a, out), 0.5 / self.deltax)
 
-    def pxx(self, a):
-        return self.sparse_pxx.dot(a.flat)
+    def pxx(self, a, out=None):
+        """Compute the second derivative along x"""
+        return stencil_pxx_1d(a, self._get_out(a, out), 1 / self.deltax**2)
 
     def identity(self):
         return sparse.identity(self.size)
@@ -3,6 +3,14 @@
 
 Provides:
 
+.. autofunction:: stencil_px_2d
+
+.. autofunction:: stencil_pxx_2d
+
+.. autofunction:: stencil_py_2d
+
+.. autofunction:: stencil_pyy_2d
+
 .. autoclass:: OperatorFiniteDiff2DPeriodic
    :members:
    :private-members:
@@ -11,8 +19,53 @@ Provides:
 
 import numpy as np
 
+from transonic import boost, Array
+
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    pass
+
 from .op_finitediff1d import OperatorFiniteDiff1DPeriodic
 
+A2 = Array[np.float64, "2d"]
+
+
+@boost
+def stencil_px_2d(a: A2, out: A2, coef: float):
+    """Centered first derivative along x (axis 1, periodic)"""
+    out[:, 1:-1] = coef * (a[:, 2:] - a[:, :-2])
+    out[:, 0] = coef * (a[:, 1] - a[:, -1])
+    out[:, -1] = coef * (a[:, 0] - a[:, -2])
+    return out
+
+
+@boost
+def stencil_pxx_2d(a: A2, out: A2, coef: float):
+    """Centered second derivative along x (axis 1, periodic)"""
+    out[:, 1:-1] = coef * (a[:, 2:] - 2 * a[:, 1:-1] + a[:, :-2])
+    out[:, 0] = coef * (a[:, 1] - 2 * a[:, 0] + a[:, -1])
+    out[:, -1] = coef * (a[:, 0] - 2 * a[:, -1] + a[:, -2])
+    return out
+
+
+@boost
+def stencil_py_2d(a: A2, out: A2, coef: float):
+    """Centered first derivative along y (axis 0, periodic)"""
+    out[1:-1] = coef * (a[2:] - a[:-2])
+    out[0] = coef * (a[1] - a[-1])
+    out[-1] = coef * (a[0] - a[-2])
+    return out
+
+
+@boost
+def stencil_pyy_2d(a: A2, out: A2, coef: float):
+    """Centered second derivative along y (axis 0, periodic)"""
+    out[1:-1] = coef * (a[2:] - 2 * a[1:-1] + a[:-2])
+    out[0] = coef * (a[1] - 2 * a[0] + a[-1])
+    out[-1] = coef * (a[0] - 2 * a[-1] + a[-2])
+    return out
+
 
 class OperatorFiniteDiff2DPeriodic(OperatorFiniteDiff1DPeriodic):
     @staticmethod
@@ -43,95 +96,107 @@ class OperatorFiniteDiff2DPeriodic(OperatorFiniteDiff1DPeriodic):
         self.ly = self.Ly = Ly
         self.deltax = Lx / nx
         self.deltay = Ly / ny
-        dx = self.deltax
-        dy = self.deltay
 
         self.xs = np.linspace(0, Lx, nx)
         self.ys = np.linspace(0, Ly, ny)
 
-        def func_i1_mat(i0_mat, iv):
-            i1 = i0_mat % nx
-            i0 = i0_mat // nx
-            if iv == 0:
-                i1_mat = i0 * nx + (i1 + 1) % nx
-            elif iv == 1:
-                i1_mat = i0 * nx + (i1 - 1) % nx
-            else:
-                raise ValueError("Shouldn" "t be here...")
-
-            return i1_mat
-
-        values = np.array([1, -1]) / (2 * dx)
-        self.sparse_px = self._create_sparse(values, func_i1_mat)
-
-        def func_i1_mat(i0_mat, iv):
-            i1 = i0_mat % nx
-            i0 = i0_mat // nx
-            if iv == 0:
-                i1_mat = i0_mat
-            elif iv == 1:
-                i1_mat = i0 * nx + (i1 + 1) % nx
-            elif iv == 2:
-                i1_mat = i0 * nx + (i1 - 1) % nx
-            else:
-                raise ValueError("Shouldn" "t be here...")
-
-            return i1_mat
-
-        values = np.array([-2, 1, 1]) / dx**2
-        self.sparse_pxx = self._create_sparse(values, func_i1_mat)
-
-        def func_i1_mat(i0_mat, iv):
-            i1 = i0_mat % nx
-            i0 = i0_mat // nx
-            if iv == 0:
-                i1_mat = ((i0 + 1) * nx) % size + i1
-            elif iv == 1:
-                i1_mat = ((i0 - 1) * nx) % size + i1
-            else:
-                raise ValueError("Shouldn" "t be here...")
-
-            return i1_mat
-
-        values = np.array([1, -1]) / (2 * dy)
-        self.sparse_py = self._create_sparse(values, func_i1_mat)
-
-        def func_i1_mat(i0_mat, iv):
-            i1 = i0_mat % nx
-            i0 = i0_mat // nx
-            if iv == 0:
-                i1_mat = i0_mat
-            elif iv == 1:
-                i1_mat = ((i0 + 1) * nx) % size + i1
-            elif iv == 2:
-                i1_mat = ((i0 - 1) * nx) % size + i1
-            else:
-                raise ValueError("Shouldn" "t be here...")
-
-            return i1_mat
-
-        values = np.array([-2, 1, 1]) / dx**2
-        self.sparse_pyy = self._create_sparse(values, func_i1_mat)
-
-    def _create_sparse(self, values, func_i1_mat):
+        # sparse matrices (needed for implicit solves), created when needed
+        self._sparse_matrices = {}
+
+    def _get_sparse(self, name):
+        try:
+            return self._sparse_matrices[name]
+        except KeyError:
+            pass
+        dx = self.deltax
+        dy = self.deltay
+        if name == "px":
+            matrix = self._create_sparse(
+                np.array([1, -1]) / (2 * dx), [(0, 1), (0, -1)]
+            )
+        elif name == "pxx":
+            matrix = self._create_sparse(
+                np.array([-2, 1, 1]) / dx**2, [(0, 0), (0, 1), (0, -1)]
+            )
+        elif name == "py":
+            matrix = self._create_sparse(
+                np.array([1, -1]) / (2 * dy), [(1, 0), (-1, 0)]
+            )
+        elif name == "pyy":
+            matrix = self._create_sparse(
+                np.array([-2, 1, 1]) / dy**2, [(0, 0), (1, 0), (-1, 0)]
+            )
+        else:
+            raise ValueError(f"Unknown sparse matrix {name}")
+        self._sparse_matrices[name] = matrix
+        return matrix
+
+    @property
+    def sparse_px(self):
+        return self._get_sparse("px")
+
+    @property
+    def sparse_pxx(self):
+        return self._get_sparse("pxx")
+
+    @property
+    def sparse_py(self):
+        return self._get_sparse("py")
+
+    @property
+    def sparse_pyy(self):
+        return self._get_sparse("pyy")
+
+    def _create_sparse(self, values, shifts):
+        """Create the sparse matrix of a stencil
+
+        ``shifts`` is a list of ``(shift_iy, shift_ix)``: the row of the matrix
+        for the point ``(iy, ix)`` contains ``values[iv]`` in the column of the
+        point ``(iy + shift_iy, ix + shift_ix)`` (periodic).
+
+        """
+        nx = self.nx
+        ny = self.ny
         size = self.size
         nb_values = len(values)
-        data = np.empty(size * nb_values)
-        i0s = np.empty(size * nb_values)
-        i1s = np.empty(size * nb_values)
-
-        for i0_mat in range(size):
-            for iv, v in enumerate(values):
-                data[nb_values * i0_mat + iv] = v
-                i0s[nb_values * i0_mat + iv] = i0_mat
-                i1s[nb_values * i0_mat + iv] = func_i1_mat(i0_mat, iv)
-        return sparse.coo_matrix((data, (i0s, i1s)), shape=(size, size))
-
-    def py(self, a):
-        return self.sparse_py.dot(a.flat)
-
-    def pyy(self, a):
-        return self.sparse_pyy.dot(a.flat)
+
+        iys = np.arange(ny)
+        ixs = np.arange(nx)
+        i1s = np.empty((ny, nx, nb_values), dtype=np.int64)
+        for iv, (shift_iy, shift_ix) in enumerate(shifts):
+            i1s[:, :, iv] = ((iys + shift_iy) % ny)[:, np.newaxis] * nx + (
+                (ixs + shift_ix) % nx
+            )
+
+        # CSR format built directly: nb_values entries per row
+        data = np.tile(np.asarray(values, dtype=np.float64), size)
+        indptr = np.arange(0, nb_values * size + 1, nb_values)
+        matrix = sparse.csr_matrix(
+            (data, i1s.ravel(), indptr), shape=(size, size)
+        )
+        matrix.sort_indices()
+        return matrix
+
+    def _get_out(self, a, out):
+        if out is None:
+            out = np.empty(self.shape, dtype=np.float64)
+        return out
+
+    def px(self, a, out=None):
+        """Compute the first derivative along x"""
+        return stencil_px_2d(a, self._get_out(a, out), 0.5 / self.deltax)
+
+    def pxx(self, a, out=None):
+        """Compute the second derivative along x"""
+        return stencil_pxx_2d(a, self._get_out(a, out), 1 / self.deltax**2)
+
+    def py(self, a, out=None):
+        """Compute the first derivative along y"""
+        return stencil_py_2d(a, self._get_out(a, out), 0.5 / self.deltay)
+
+    def pyy(self, a, out=None):
+        """Compute the second derivative along y"""
+        return stencil_pyy_2d(a, self._get_out(a, out), 1 / self.deltay**2)
 
     def produce_str_describing_oper(self):
         """Produce a string describing the operator."""
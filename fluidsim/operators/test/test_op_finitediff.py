@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from fluidsim.base.params import Parameters
+
+try:
+    import scipy.sparse
+
+    scipy_installed = True
+except ImportError:
+    scipy_installed = False
+
+
+def create_params(nx, ny=None):
+    params = Parameters(tag="params", attribs={"ONLY_COARSE_OPER": False})
+    attribs = {"nx": nx, "Lx": 2 * np.pi}
+    if ny is not None:
+        attribs.update({"ny": ny, "Ly": 3.0})
+    params._set_child("oper", attribs=attribs)
+    return params
+
+
+@unittest.skipIf(not scipy_installed, "No module named scipy.sparse")
+class TestOperFiniteDiff(unittest.TestCase):
+    def test_1d(self):
+        from fluidsim.operators.op_finitediff1d import (
+            OperatorFiniteDiff1DPeriodic,
+        )
+
+        oper = OperatorFiniteDiff1DPeriodic(create_params(nx=32))
+        a = np.sin(oper.x) + 0.1 * np.random.rand(oper.nx)
+
+        for name in ("px", "pxx"):
+            result = getattr(oper, name)(a)
+            expected = getattr(oper, "sparse_" + name).dot(a)
+            assert np.allclose(result, expected)
+            out = np.empty_like(a)
+            assert getattr(oper, name)(a, out=out) is out
+            assert np.allclose(out, expected)
+
+        assert np.allclose(oper.px(np.sin(oper.x)), np.cos(oper.x), atol=1e-2)
+
+    def test_2d(self):
+        from fluidsim.operators.op_finitediff2d import (
+            OperatorFiniteDiff2DPeriodic,
+        )
+
+        nx, ny = 12, 10
+        oper = OperatorFiniteDiff2DPeriodic(create_params(nx, ny))
+        a = np.random.rand(ny, nx)
+
+        for name in ("px", "pxx", "py", "pyy"):
+            result = getattr(oper, name)(a)
+            expected = getattr(oper, "sparse_" + name).dot(a.ravel())
+            assert np.allclose(result.ravel(), expected)
+            out = np.empty_like(a)
+            assert getattr(oper, name)(a, out=out) is out
+
+        # stencil of the matrices (first row, point (iy, ix) = (0, 0))
+        row = oper.sparse_py.getrow(0).toarray().reshape(ny, nx)
+        dy = oper.deltay
+        assert np.isclose(row[1, 0], 1 / (2 * dy))
+        assert np.isclose(row[-1, 0], -1 / (2 * dy))
+        assert np.count_nonzero(row) == 2
+        row = oper.sparse_pxx.getrow(nx + 1).toarray().reshape(ny, nx)
+        assert np.allclose(row[1, :3] * oper.deltax**2, [1, -2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,12 +8,13 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 from fluidsim.base.output.print_stdout import PrintStdOutBase
 
 from fluiddyn.util import mpi
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class PrintStdOutLorenz(PrintStdOutBase):
@@ -179,6 +180,9 @@ class PrintStdOutLorenz(PrintStdOutBase):
         fig = plt.figure()
         size_axe = [0.12, 0.12, 0.8, 0.8]
 
+        # registers the projection "3d"
+        from mpl_toolkits.mplot3d import Axes3D
+
         ax = fig.add_axes(size_axe, projection="3d")
 
         ax.set_xlabel("$X$")
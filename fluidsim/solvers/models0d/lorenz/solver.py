@@ -132,7 +132,7 @@ class Simul(SimulBase):
         if self.params.forcing.enable:
             # TODO: Not implemented, but would be nice to study small perturbations
             # cf: Vallis 2nd edition 11.4
-            tendencies += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies)
 
         return tendencies
 
@@ -124,7 +124,7 @@ class Simul(SimulBase):
         tendencies.set_var("Y", -p.C * Y + p.D * X * Y)
 
         if self.params.forcing.enable:
-            tendencies += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies)
 
         return tendencies
 
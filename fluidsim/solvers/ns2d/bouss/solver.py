@@ -163,7 +163,7 @@ class Simul(SimulNS2D):
         #     self.oper.sum_wavenumbers(abs(T_b))))
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         # CHECK ENERGY CONSERVATION
         # Nrot_fft = tendencies_fft.get_var('rot_fft')
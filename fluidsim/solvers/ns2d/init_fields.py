@@ -20,6 +20,7 @@ import numpy as np
 from fluiddyn.util import mpi
 
 from fluidsim.base.init_fields import InitFieldsBase, SpecificInitFields
+from fluidsim.util.philox import compute_noise_fft
 
 
 class InitFieldsNoise(SpecificInitFields):
@@ -66,44 +67,27 @@ length: float (default 0.)
         def H_smooth(x, delta):
             return (1.0 + np.tanh(2 * np.pi * x / delta)) / 2.0
 
-        # to compute always the same field... (for 1 resolution...)
-        np.random.seed(42 + mpi.rank)
-
-        ux_fft = (
-            np.random.random(oper.shapeK)
-            + 1j * np.random.random(oper.shapeK)
-            - 0.5
-            - 0.5j
-        )
-        uy_fft = (
-            np.random.random(oper.shapeK)
-            + 1j * np.random.random(oper.shapeK)
-            - 0.5
-            - 0.5j
-        )
-
-        if mpi.rank == 0:
-            ux_fft[0, 0] = 0.0
-            uy_fft[0, 0] = 0.0
+        # same field for any number of processes (counter-based generator)
+        ux_fft = compute_noise_fft(oper, stream=0)
+        uy_fft = compute_noise_fft(oper, stream=1)
 
         oper.projection_perp(ux_fft, uy_fft)
         oper.dealiasing(ux_fft, uy_fft)
 
         k0 = 2 * np.pi / lambda0
         delta_k0 = 1.0 * k0
-        ux_fft = ux_fft * H_smooth(k0 - oper.K, delta_k0)
-        uy_fft = uy_fft * H_smooth(k0 - oper.K, delta_k0)
+        filter_fft = H_smooth(k0 - oper.K, delta_k0)
+        ux_fft *= filter_fft
+        uy_fft *= filter_fft
 
         ux = oper.ifft2(ux_fft)
         uy = oper.ifft2(uy_fft)
         velo_max = np.sqrt(ux**2 + uy**2).max()
         if mpi.nb_proc > 1:
             velo_max = oper.comm.allreduce(velo_max, op=mpi.MPI.MAX)
-        ux = params.init_fields.noise.velo_max * ux / velo_max
-        uy = params.init_fields.noise.velo_max * uy / velo_max
-
-        ux_fft = oper.fft2(ux)
-        uy_fft = oper.fft2(uy)
+        coef = params.init_fields.noise.velo_max / velo_max
+        ux_fft *= coef
+        uy_fft *= coef
 
         rot_fft = oper.rotfft_from_vecfft(ux_fft, uy_fft)
         return rot_fft, ux_fft, uy_fft
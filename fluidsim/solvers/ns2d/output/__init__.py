@@ -98,6 +98,14 @@ class Output(OutputBasePseudoSpectral):
             },
         )
 
+        classes._set_child(
+            "ConservationDiagnostics",
+            attribs={
+                "module_name": "fluidsim.base.output.conservation_diagnostics",
+                "class_name": "ConservationDiagnostics",
+            },
+        )
+
     @staticmethod
     def _complete_params_with_default(params, info_solver):
         """Complete the `params` container (static method)."""
@@ -9,12 +9,14 @@
 
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 from fluiddyn.util import mpi
 
 from fluidsim.base.output.spatial_means import SpatialMeansBase
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SpatialMeansNS2D(SpatialMeansBase):
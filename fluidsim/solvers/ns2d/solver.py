@@ -189,7 +189,7 @@ class Simul(SimulBasePseudoSpectral):
         #                self.oper.sum_wavenumbers(abs(T_rot))))
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         return tendencies_fft
 
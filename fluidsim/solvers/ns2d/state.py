@@ -46,18 +46,25 @@ class StateNS2D(StatePseudoSpectral):
         self.field_tmp2 = np.empty_like(self.state_phys[0])
         self.field_tmp3 = np.empty_like(self.state_phys[0])
 
-    def compute(self, key, SAVE_IN_DICT=True, RAISE_ERROR=True):
-        """Compute and return a variable"""
+    def compute(self, key, SAVE_IN_DICT=True, RAISE_ERROR=True, out=None):
+        """Compute and return a variable
+
+        For the variables computed with a FFT, the result is written in ``out``
+        if it is given.
+
+        """
         it = self.sim.time_stepping.it
         if key in self.vars_computed and it == self.it_computed[key]:
             return self.vars_computed[key]
 
-        if key == "ux_fft":
+        if key in ("ux_fft", "uy_fft"):
             # not efficient!
-            result = self.oper.fft2(self.state_phys.get_var("ux"))
-        elif key == "uy_fft":
-            # not efficient!
-            result = self.oper.fft2(self.state_phys.get_var("uy"))
+            var = self.state_phys.get_var(key[:-4])
+            if out is None:
+                result = self.oper.fft2(var)
+            else:
+                self.oper.fft_as_arg(var, out)
+                result = out
         elif key == "rot_fft":
             ux_fft = self.compute("ux_fft")
             uy_fft = self.compute("uy_fft")
@@ -68,7 +75,11 @@ class StateNS2D(StatePseudoSpectral):
             result = self.oper.divfft_from_vecfft(ux_fft, uy_fft)
         elif key == "div":
             div_fft = self.compute("div_fft")
-            result = self.oper.ifft2(div_fft)
+            if out is None:
+                result = self.oper.ifft2(div_fft)
+            else:
+                self.oper.ifft_as_arg(div_fft, out)
+                result = out
         elif key == "q":
             rot = self.get_var("rot")
             result = rot
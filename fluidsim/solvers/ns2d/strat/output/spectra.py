@@ -1,6 +1,16 @@
 """Spectra output (:mod:`fluidsim.solvers.ns2d.strat.output.spectra`)
 =====================================================================
 
+The energy densities and their spectra (1D and 2D) are computed in one pass
+over the Fourier modes by the kernel :func:`compute_spectra_energies`, which
+accumulates the spectra in a preallocated buffer (reduced with one
+``Allreduce`` with MPI). The indices and weights of the modes are computed
+once by :func:`compute_indices_modes_spectra`.
+
+.. autofunction:: compute_indices_modes_spectra
+
+.. autofunction:: compute_spectra_energies
+
 .. autoclass:: SpectraNS2DStrat
    :members:
    :private-members:
@@ -11,61 +21,226 @@ import h5py
 
 import numpy as np
 
+from transonic import boost, Array, Transonic
+from fluiddyn.util import mpi
+
+from fluidsim import _is_testing
 from fluidsim.base.output.spectra import Spectra
 
+ts = Transonic()
+
+Ac = Array[np.complex128, "2d"]
+Af = Array[np.float64, "2d"]
+Ai = Array[np.int64, "2d"]
+
+
+def compute_indices_modes_spectra(oper):
+    """Compute the indices and weights of the local modes for the spectra
+
+    The weights (1 or 2) take into account that only the modes with
+    :math:`k_x \\geq 0` are stored. The 1D spectra as a function of
+    :math:`k_y` are folded (indices ``ikys``), the spectra as a function of
+    :math:`k_y` and :math:`k_x` are not (indices ``ikys_seq``). For the 2D
+    spectra, the energy of a mode is shared between the shells ``ikhs`` and
+    ``ikhs + 1`` (coefficients ``coefs_share``), as in
+    ``oper.compute_2dspectrum``.
+
+    """
+    ikxs = np.round(oper.KX / oper.deltakx).astype(np.int64)
+    ikys_seq = np.round(oper.KY / oper.deltaky).astype(np.int64) % oper.ny_seq
+    ikys = np.minimum(ikys_seq, oper.ny_seq - ikys_seq)
+
+    weights = np.full(oper.shapeK_loc, 2.0)
+    weights[ikxs == 0] = 1.0
+    if oper.nx_seq % 2 == 0:
+        weights[ikxs == oper.nx_seq // 2] = 1.0
+
+    nkh = oper.nkhE
+    ikhs = (oper.K / oper.deltak).astype(np.int64)
+    ikhs_clipped = np.minimum(ikhs, nkh - 1)
+    coefs_share = (oper.K - oper.khE[ikhs_clipped]) / oper.deltak
+    coefs_share[ikhs >= nkh - 1] = 0.0
+
+    return {
+        "weights": weights,
+        "ikxs": ikxs,
+        "ikys": ikys,
+        "ikys_seq": ikys_seq,
+        "ikhs": ikhs_clipped,
+        "coefs_share": coefs_share,
+    }
+
+
+@boost
+def compute_spectra_energies(
+    ux_fft: Ac,
+    uy_fft: Ac,
+    b_fft: Ac,
+    coef_b: float,
+    weights: Af,
+    ikxs: Ai,
+    ikys: Ai,
+    ikhs: Ai,
+    coefs_share: Af,
+    spectra_kx: Af,
+    spectra_ky: Af,
+    spectra_kh: Af,
+):
+    """Accumulate the spectra of the energies of ux, uy and b in one pass
+
+    The spectra (first index: 0 for ux, 1 for uy and 2 for b) are not divided
+    by the wavenumber steps. ``coef_b`` is :math:`1/N^2`.
+
+    """
+    n0, n1 = weights.shape
+    nkh = spectra_kh.shape[1]
+    for i0 in range(n0):
+        for i1 in range(n1):
+            weight = 0.5 * weights[i0, i1]
+            ux = ux_fft[i0, i1]
+            uy = uy_fft[i0, i1]
+            b = b_fft[i0, i1]
+            energy_ux = weight * (ux.real**2 + ux.imag**2)
+            energy_uy = weight * (uy.real**2 + uy.imag**2)
+            energy_b = weight * coef_b * (b.real**2 + b.imag**2)
+
+            ikx = ikxs[i0, i1]
+            spectra_kx[0, ikx] += energy_ux
+            spectra_kx[1, ikx] += energy_uy
+            spectra_kx[2, ikx] += energy_b
+
+            iky = ikys[i0, i1]
+            spectra_ky[0, iky] += energy_ux
+            spectra_ky[1, iky] += energy_uy
+            spectra_ky[2, iky] += energy_b
+
+            ikh = ikhs[i0, i1]
+            coef_share = coefs_share[i0, i1]
+            spectra_kh[0, ikh] += (1 - coef_share) * energy_ux
+            spectra_kh[1, ikh] += (1 - coef_share) * energy_uy
+            spectra_kh[2, ikh] += (1 - coef_share) * energy_b
+            if ikh < nkh - 1:
+                spectra_kh[0, ikh + 1] += coef_share * energy_ux
+                spectra_kh[1, ikh + 1] += coef_share * energy_uy
+                spectra_kh[2, ikh + 1] += coef_share * energy_b
+
+
+def compute_spectra_energies_numpy(
+    ux_fft: Ac,
+    uy_fft: Ac,
+    b_fft: Ac,
+    coef_b: float,
+    weights: Af,
+    ikxs: Ai,
+    ikys: Ai,
+    ikhs: Ai,
+    coefs_share: Af,
+    spectra_kx: Af,
+    spectra_ky: Af,
+    spectra_kh: Af,
+):
+    energies = (0.5 * weights) * np.array(
+        [abs(ux_fft) ** 2, abs(uy_fft) ** 2, coef_b * abs(b_fft) ** 2]
+    )
+    nkx = spectra_kx.shape[1]
+    nky = spectra_ky.shape[1]
+    nkh = spectra_kh.shape[1]
+    ikxs = ikxs.ravel()
+    ikys = ikys.ravel()
+    ikhs = ikhs.ravel()
+    coefs_share = coefs_share.ravel()
+    for ivar, energy in enumerate(energies):
+        energy = energy.ravel()
+        spectra_kx[ivar] += np.bincount(ikxs, energy, nkx)
+        spectra_ky[ivar] += np.bincount(ikys, energy, nky)
+        spectra_kh[ivar] += np.bincount(ikhs, (1 - coefs_share) * energy, nkh)
+        # coefs_share == 0 for ikhs == nkh - 1
+        spectra_kh[ivar, 1:] += np.bincount(ikhs, coefs_share * energy, nkh)[:-1]
+
+
+if not ts.is_transpiling and not ts.is_compiled and not _is_testing:
+    # for example if Pythran is not available
+    compute_spectra_energies = compute_spectra_energies_numpy
+
 
 class SpectraNS2DStrat(Spectra):
     """Save and plot spectra."""
 
-    def compute(self):
-        """compute the values at one time."""
-        # energy_fft = self.output.compute_energy_fft()
-        energyK_fft, energyA_fft = self.output.compute_energies_fft()
-        energy_fft = energyK_fft + energyA_fft
-        energyK_ux_fft, energyK_uy_fft = self.output.compute_energies2_fft()
-        energyK, energyA, energyK_ux = self.output.compute_energies()
-
-        # Compute the kinetic energy spectra 1D for the two velocity components
-        # and two directions
-        spectrum1Dkx_EK_ux, spectrum1Dky_EK_ux = self.spectra1D_from_fft(
-            energyK_ux_fft
+    def _init_buffers(self):
+        oper = self.oper
+        self._indices_modes = compute_indices_modes_spectra(oper)
+        sizes = [oper.nkxE, oper.nkyE, oper.nkhE]
+        # one buffer for all spectra (one Allreduce)
+        self._buffer = np.empty(3 * sum(sizes))
+        self._spectra_kx, self._spectra_ky, self._spectra_kh = (
+            buffer.reshape(3, size)
+            for buffer, size in zip(
+                np.split(self._buffer, 3 * np.cumsum(sizes)[:-1]), sizes
+            )
         )
-        spectrum1Dkx_EK_uy, spectrum1Dky_EK_uy = self.spectra1D_from_fft(
-            energyK_uy_fft
+
+    def compute(self):
+        """compute the values at one time.
+
+        Note that the returned spectra of ux, uy and b are views on buffers
+        overwritten at each call.
+
+        """
+        if not hasattr(self, "_buffer"):
+            self._init_buffers()
+
+        rot_fft = self.sim.state.state_spect.get_var("rot_fft")
+        b_fft = self.sim.state.state_spect.get_var("b_fft")
+        ux_fft, uy_fft = self.oper.vecfft_from_rotfft(rot_fft)
+        N = self.sim.params.N
+        coef_b = 0.0 if N == 0 else 1.0 / N**2
+
+        indices = self._indices_modes
+        self._buffer.fill(0.0)
+        compute_spectra_energies(
+            ux_fft,
+            uy_fft,
+            b_fft,
+            coef_b,
+            indices["weights"],
+            indices["ikxs"],
+            indices["ikys"],
+            indices["ikhs"],
+            indices["coefs_share"],
+            self._spectra_kx,
+            self._spectra_ky,
+            self._spectra_kh,
         )
-        spectrum1Dkx_EK, spectrum1Dky_EK = self.spectra1D_from_fft(energyK_fft)
-
-        # Compute the potential energy spectra 1D two directions
-        spectrum1Dkx_EA, spectrum1Dky_EA = self.spectra1D_from_fft(energyA_fft)
-
-        # Compute the total energy spectra 1D
-        spectrum1Dkx_E, spectrum1Dky_E = self.spectra1D_from_fft(energy_fft)
-        # Dictionary with the 1D kinetic energy spectra
-        dict_spectra1D = {
-            "spectrum1Dkx_EK_ux": spectrum1Dkx_EK_ux,
-            "spectrum1Dky_EK_ux": spectrum1Dky_EK_ux,
-            "spectrum1Dkx_EK_uy": spectrum1Dkx_EK_uy,
-            "spectrum1Dky_EK_uy": spectrum1Dky_EK_uy,
-            "spectrum1Dkx_EK": spectrum1Dkx_EK,
-            "spectrum1Dky_EK": spectrum1Dky_EK,
-            "spectrum1Dkx_EA": spectrum1Dkx_EA,
-            "spectrum1Dky_EA": spectrum1Dky_EA,
-            "spectrum1Dkx_E": spectrum1Dkx_E,
-            "spectrum1Dky_E": spectrum1Dky_E,
-        }
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, self._buffer, op=mpi.MPI.SUM)
+
+        oper = self.oper
+        self._spectra_kx /= oper.deltakx
+        self._spectra_ky /= oper.deltaky
+        self._spectra_kh /= oper.deltak
+
+        dict_spectra1D = {}
+        for letter, spectra in zip("xy", (self._spectra_kx, self._spectra_ky)):
+            spectrum_ux, spectrum_uy, spectrum_A = spectra
+            spectrum_K = spectrum_ux + spectrum_uy
+            dict_spectra1D.update(
+                {
+                    f"spectrum1Dk{letter}_EK_ux": spectrum_ux,
+                    f"spectrum1Dk{letter}_EK_uy": spectrum_uy,
+                    f"spectrum1Dk{letter}_EK": spectrum_K,
+                    f"spectrum1Dk{letter}_EA": spectrum_A,
+                    f"spectrum1Dk{letter}_E": spectrum_K + spectrum_A,
+                }
+            )
 
-        # compute the kinetic energy spectra 2D
-        spectrum2D_E = self.spectrum2D_from_fft(energy_fft)
-        spectrum2D_EK = self.spectrum2D_from_fft(energyK_fft)
-        spectrum2D_EK_ux = self.spectrum2D_from_fft(energyK_ux_fft)
-        spectrum2D_EK_uy = self.spectrum2D_from_fft(energyK_uy_fft)
-        spectrum2D_EA = self.spectrum2D_from_fft(energyA_fft)
+        spectrum_ux, spectrum_uy, spectrum_A = self._spectra_kh
+        spectrum_K = spectrum_ux + spectrum_uy
         dict_spectra2D = {
-            "spectrum2D_EK_ux": spectrum2D_EK_ux,
-            "spectrum2D_EK_uy": spectrum2D_EK_uy,
-            "spectrum2D_EK": spectrum2D_EK,
-            "spectrum2D_EA": spectrum2D_EA,
-            "spectrum2D_E": spectrum2D_E,
+            "spectrum2D_EK_ux": spectrum_ux,
+            "spectrum2D_EK_uy": spectrum_uy,
+            "spectrum2D_EK": spectrum_K,
+            "spectrum2D_EA": spectrum_A,
+            "spectrum2D_E": spectrum_K + spectrum_A,
         }
 
         return dict_spectra1D, dict_spectra2D
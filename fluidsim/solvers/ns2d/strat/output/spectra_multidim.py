@@ -9,52 +9,174 @@
 
 import h5py
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 
 from math import radians
+
+from transonic import boost, Array, Transonic
+from fluiddyn.util import mpi
+
+from fluidsim import _is_testing
 from fluidsim.base.output.spectra_multidim import SpectraMultiDim
+from fluidsim.util.lazy import lazy_import
+
+from .spectra import compute_indices_modes_spectra
+
+plt = lazy_import("matplotlib.pyplot")
+patches = lazy_import("matplotlib.patches")
+
+ts = Transonic()
+
+Ac = Array[np.complex128, "2d"]
+Af = Array[np.float64, "2d"]
+Ai = Array[np.int64, "2d"]
+A3f = Array[np.float64, "3d"]
+
+
+@boost
+def compute_spectra_kykx_energies(
+    ux_fft: Ac,
+    uy_fft: Ac,
+    b_fft: Ac,
+    N: float,
+    omega: Af,
+    weights: Af,
+    ikxs: Ai,
+    ikys_seq: Ai,
+    spectra: A3f,
+):
+    """Fill the spectra vs ky, kx of EK, EA, ap and am in one pass
+
+    The spectra are not divided by ``deltakx * deltaky``.
+
+    """
+    n0, n1 = weights.shape
+    N2 = N**2
+    coef_b = 0.0
+    if N != 0:
+        coef_b = 1.0 / N2
+    for i0 in range(n0):
+        for i1 in range(n1):
+            weight = weights[i0, i1]
+            ux = ux_fft[i0, i1]
+            uy = uy_fft[i0, i1]
+            b = b_fft[i0, i1]
+            ikx = ikxs[i0, i1]
+            iky = ikys_seq[i0, i1]
+            spectra[0, iky, ikx] = (
+                0.5
+                * weight
+                * (ux.real**2 + ux.imag**2 + uy.real**2 + uy.imag**2)
+            )
+            spectra[1, iky, ikx] = (
+                0.5 * weight * coef_b * (b.real**2 + b.imag**2)
+            )
+            # ap = N**2 * uy + 1j * omega * b and am = N**2 * uy - 1j * omega * b
+            real = N2 * uy.real
+            imag = N2 * uy.imag
+            omega_b_real = -omega[i0, i1] * b.imag
+            omega_b_imag = omega[i0, i1] * b.real
+            spectra[2, iky, ikx] = weight * (
+                (real + omega_b_real) ** 2 + (imag + omega_b_imag) ** 2
+            )
+            spectra[3, iky, ikx] = weight * (
+                (real - omega_b_real) ** 2 + (imag - omega_b_imag) ** 2
+            )
 
 
-class SpectraMultiDimNS2DStrat(SpectraMultiDim):
-    """Save and plot the spectra."""
+def compute_spectra_kykx_energies_numpy(
+    ux_fft: Ac,
+    uy_fft: Ac,
+    b_fft: Ac,
+    N: float,
+    omega: Af,
+    weights: Af,
+    ikxs: Ai,
+    ikys_seq: Ai,
+    spectra: A3f,
+):
+    coef_b = 0.0 if N == 0 else 1.0 / N**2
+    energy_ux = ux_fft.real**2 + ux_fft.imag**2
+    energy_uy = uy_fft.real**2 + uy_fft.imag**2
+    energy_b = b_fft.real**2 + b_fft.imag**2
+    # |N**2 uy +/- 1j omega b|**2 = N**4 |uy|**2 + omega**2 |b|**2 +/- cross
+    squares = N**4 * energy_uy + omega**2 * energy_b
+    cross = (
+        (2 * N**2)
+        * omega
+        * (uy_fft.imag * b_fft.real - uy_fft.real * b_fft.imag)
+    )
+    n0, n1 = weights.shape
+    # KX and KY are meshgrids so that the modes are in the same order in the
+    # spectra (no scatter) if it is true for the first row and column
+    if (
+        spectra.shape[1:] == weights.shape
+        and np.array_equal(ikxs[0], np.arange(n1))
+        and np.array_equal(ikys_seq[:, 0], np.arange(n0))
+    ):
+        np.multiply(0.5 * weights, energy_ux + energy_uy, out=spectra[0])
+        np.multiply((0.5 * coef_b) * weights, energy_b, out=spectra[1])
+        np.multiply(weights, squares + cross, out=spectra[2])
+        np.multiply(weights, squares - cross, out=spectra[3])
+    else:
+        spectra[0, ikys_seq, ikxs] = 0.5 * weights * (energy_ux + energy_uy)
+        spectra[1, ikys_seq, ikxs] = (0.5 * coef_b) * weights * energy_b
+        spectra[2, ikys_seq, ikxs] = weights * (squares + cross)
+        spectra[3, ikys_seq, ikxs] = weights * (squares - cross)
+
+
+if not ts.is_transpiling and not ts.is_compiled and not _is_testing:
+    # for example if Pythran is not available
+    compute_spectra_kykx_energies = compute_spectra_kykx_energies_numpy
 
-    def compute(self):
-        """Computes multidimensional spectra at one time."""
 
-        # Get variables
-        energyK_fft, energyA_fft = self.output.compute_energies_fft()
+class SpectraMultiDimNS2DStrat(SpectraMultiDim):
+    """Save and plot the spectra."""
 
-        ap_fft = self.sim.state.compute("ap_fft")
-        am_fft = self.sim.state.compute("am_fft")
+    def _init_buffers(self):
+        oper = self.oper
+        self._indices_modes = compute_indices_modes_spectra(oper)
+        self._omega = self.sim.compute_dispersion_relation()
+        self._spectra = np.empty((4, oper.ny_seq, oper.nkxE))
 
-        # Computes multidimensional spectra
-        spectrumkykx_EK = self.oper.compute_spectrum_kykx(
-            energyK_fft, folded=False
-        )
-        spectrumkykx_EA = self.oper.compute_spectrum_kykx(
-            energyA_fft, folded=False
-        )
+    def compute(self):
+        """Computes multidimensional spectra at one time.
 
-        energy_ap_fft = abs(ap_fft) ** 2
-        energy_am_fft = abs(am_fft) ** 2
+        Note that the returned spectra are views on a buffer overwritten at
+        each call.
 
-        spectrumkykx_ap = self.oper.compute_spectrum_kykx(
-            energy_ap_fft, folded=False
-        )
-        spectrumkykx_am = self.oper.compute_spectrum_kykx(
-            energy_am_fft, folded=False
+        """
+        if not hasattr(self, "_spectra"):
+            self._init_buffers()
+
+        rot_fft = self.sim.state.state_spect.get_var("rot_fft")
+        b_fft = self.sim.state.state_spect.get_var("b_fft")
+        ux_fft, uy_fft = self.oper.vecfft_from_rotfft(rot_fft)
+
+        indices = self._indices_modes
+        spectra = self._spectra
+        spectra.fill(0.0)
+        compute_spectra_kykx_energies(
+            ux_fft,
+            uy_fft,
+            b_fft,
+            float(self.sim.params.N),
+            self._omega,
+            indices["weights"],
+            indices["ikxs"],
+            indices["ikys_seq"],
+            spectra,
         )
-
-        dict_spectra = {
-            "spectrumkykx_EK": spectrumkykx_EK,
-            "spectrumkykx_EA": spectrumkykx_EA,
-            "spectrumkykx_ap": spectrumkykx_ap,
-            "spectrumkykx_am": spectrumkykx_am,
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, spectra, op=mpi.MPI.SUM)
+        spectra /= self.oper.deltakx * self.oper.deltaky
+
+        return {
+            "spectrumkykx_EK": spectra[0],
+            "spectrumkykx_EA": spectra[1],
+            "spectrumkykx_ap": spectra[2],
+            "spectrumkykx_am": spectra[3],
         }
 
-        return dict_spectra
-
     # def _online_plot_saving(self, dict_spectra):
     #     pass
 
@@ -174,7 +174,7 @@ class Simul(SimulNS2D):
         #     self.oper.sum_wavenumbers(abs(T_b))))
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         # CHECK ENERGY CONSERVATION
         # self.check_energy_conservation(rot_fft, b_fft, f_rot_fft, f_b_fft)
@@ -1,5 +1,6 @@
 import unittest
 
+import h5py
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -63,6 +64,58 @@ class TestSolverNS2DTendency(TestSimulBase):
         assert sim.check_energy_conservation(rot_fft, b_fft, Frot_fft, Fb_fft)
 
 
+class TestSpectra(TestSimulBase):
+    @classmethod
+    def init_params(self):
+        params = super().init_params()
+        params.oper.ny = 24
+        params.N = 2.0
+        params.output.HAS_TO_SAVE = False
+
+    def test_spectra(self):
+        """Compare the fused computations with the spectra of each energy"""
+        sim = self.sim
+        oper = sim.oper
+
+        energyK_fft, energyA_fft = sim.output.compute_energies_fft()
+        energyK_ux_fft, energyK_uy_fft = sim.output.compute_energies2_fft()
+        energies_fft = {
+            "EK_ux": energyK_ux_fft,
+            "EK_uy": energyK_uy_fft,
+            "EK": energyK_fft,
+            "EA": energyA_fft,
+            "E": energyK_fft + energyA_fft,
+        }
+
+        dict_spectra1D, dict_spectra2D = sim.output.spectra.compute()
+        for key, energy_fft in energies_fft.items():
+            spectrum_kx, spectrum_ky = oper.spectra1D_from_fft(energy_fft)
+            assert np.allclose(dict_spectra1D["spectrum1Dkx_" + key], spectrum_kx)
+            assert np.allclose(dict_spectra1D["spectrum1Dky_" + key], spectrum_ky)
+            assert np.allclose(
+                dict_spectra2D["spectrum2D_" + key],
+                oper.spectrum2D_from_fft(energy_fft),
+            )
+
+        if mpi.nb_proc > 1:
+            return
+
+        ap_fft = sim.state.compute("ap_fft")
+        am_fft = sim.state.compute("am_fft")
+        energies_fft = {
+            "EK": energyK_fft,
+            "EA": energyA_fft,
+            "ap": abs(ap_fft) ** 2,
+            "am": abs(am_fft) ** 2,
+        }
+        dict_spectra = sim.output.spectra_multidim.compute()
+        for key, energy_fft in energies_fft.items():
+            assert np.allclose(
+                dict_spectra["spectrumkykx_" + key],
+                oper.compute_spectrum_kykx(energy_fft, folded=False),
+            )
+
+
 class TestForcingLinearMode(TestSimulBase):
     @classmethod
     def init_params(cls):
@@ -259,6 +312,32 @@ class TestForcingOutput(TestSimulBase):
 
         sim2.output.temporal_spectra.plot_spectra()
 
+        # probes data saved as 2D fields (sequential and then resumed with
+        # chunks of one time and 2 processes)
+        temporal_spectra = sim2.output.temporal_spectra
+        temporal_spectra.save_data_as_phys_fields()
+        paths_fields = sorted(
+            (temporal_spectra.path_dir / "phys_fields").glob("probes_fields_*")
+        )
+        assert len(paths_fields) > 2
+        fields = []
+        for path in paths_fields:
+            with h5py.File(path, "r") as file:
+                fields.append(file["ux"][...])
+                assert file["x"].shape == fields[-1].shape
+        assert fields[0].ndim == 2
+        if mpi.rank == 0:
+            for path in paths_fields[1:]:
+                path.unlink()
+        if mpi.nb_proc > 1:
+            mpi.comm.barrier()
+        temporal_spectra.save_data_as_phys_fields(
+            nb_workers=2, max_mem=fields[0].nbytes
+        )
+        for path, field in zip(paths_fields, fields):
+            with h5py.File(path, "r") as file:
+                assert np.array_equal(file["ux"][...], field, equal_nan=True)
+
         spatiotemporal_spectra = sim2.output.spatiotemporal_spectra
         series_kxky = spatiotemporal_spectra.load_time_series()
 
@@ -51,8 +51,8 @@ class TimeSteppingPseudoSpectralStrat(TimeSteppingPseudoSpectral):
         has_b = has_vars("b")
 
         if has_ux and has_uy and has_b:
-            self.compute_time_increment_CLF = (
-                self._compute_time_increment_CFL_uxuyb
+            self._compute_time_increment_CLF_from_freq = (
+                self._compute_time_increment_CFL_from_freq_uxuyb
             )
 
         # Try to compute deltat_dispersion_relation.
@@ -100,6 +100,16 @@ class TimeSteppingPseudoSpectralStrat(TimeSteppingPseudoSpectral):
         if self.params.forcing.enable:
             self.deltat_f = self._compute_time_increment_forcing()
 
+    def _reduce_deltat_limits(self, coef):
+        super()._reduce_deltat_limits(coef)
+        self.coef_deltat_dispersion_relation *= coef
+        self.deltat_dispersion_relation *= coef
+        if self.coef_group:
+            self.deltat_group_vel *= coef
+            self.deltat_phase_vel *= coef
+        if self.params.forcing.enable:
+            self.deltat_f *= coef
+
     def _compute_time_increment_forcing(self):
         """
         Compute time increment of the forcing.
@@ -135,21 +145,13 @@ class TimeSteppingPseudoSpectralStrat(TimeSteppingPseudoSpectral):
 
         return freq_group, freq_phase
 
-    def _compute_time_increment_CFL_uxuyb(self):
+    def _compute_time_increment_CFL_from_freq_uxuyb(self, freq_CFL):
         """
         Compute time increment with the CFL condition solver ns2d.strat.
-        """
-        # Compute deltat_CFL at each time step.
-        ux = self.sim.state.get_var("ux")
-        uy = self.sim.state.get_var("uy")
-
-        max_ux = abs(ux).max()
-        max_uy = abs(uy).max()
-        freq_CFL = max_ux / self.sim.oper.deltax + max_uy / self.sim.oper.deltay
-
-        if mpi.nb_proc > 1:
-            freq_CFL = mpi.comm.allreduce(freq_CFL, op=mpi.MPI.MAX)
 
+        The CFL frequency (computed from the velocity and reduced over the
+        processes) is given as argument.
+        """
         if freq_CFL > 0:
             deltat_CFL = self.CFL / freq_CFL
         else:
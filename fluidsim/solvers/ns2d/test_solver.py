@@ -1,13 +1,22 @@
+import os
+import shutil
+import signal
 import unittest
 from dataclasses import dataclass
+from pathlib import Path
 
 import numpy as np
+import pytest
 import matplotlib.pyplot as plt
 
 import fluidsim as fls
 
 import fluiddyn.util.mpi as mpi
-from fluidsim.util import get_last_estimated_remaining_duration
+from fluidsim.util import (
+    get_last_estimated_remaining_duration,
+    load_records_stdout,
+    times_start_last_from_path,
+)
 from fluidsim.util.testing import TestSimul, classproperty, skip_if_no_fluidfft
 
 
@@ -94,6 +103,24 @@ class TestForcing(TestSimulBase):
         self.sim.time_stepping.start()
         self.sim.state.check_energy_equal_phys_spect()
 
+    def test_sparse_forcing(self):
+        sim = self.sim
+        forcing_maker = sim.forcing.forcing_maker
+        forcing_maker.compute()
+        forcing_fft = sim.forcing.get_forcing()
+        indices = forcing_maker.sparse_indices
+        assert indices.size < forcing_fft.size // 4
+        # the other modes are zero
+        mask = np.ones(forcing_fft.size, dtype=bool)
+        mask[indices] = False
+        assert not forcing_fft.reshape(-1)[mask].any()
+
+        state_spect = sim.state.state_spect
+        expected = state_spect + forcing_fft
+        tendencies = state_spect.copy()
+        assert sim.forcing.add_forcing_to(tendencies) is tendencies
+        assert np.array_equal(tendencies, expected)
+
 
 class TestForcingConstantRateEnergy(TestSimulBase):
     @classmethod
@@ -231,6 +258,13 @@ class TestForcingOutput(TestSimulBase):
         sim.output.spectra_multidim.plot()
 
         sim.output.spect_energy_budg.plot()
+
+        data = sim.output.conservation_diagnostics.load()
+        assert len(data["times"]) > 1
+        assert np.all(data["ratio_rot"] < 1e-12)
+        assert np.all(data["ratio_energy"] < 1e-12)
+        sim.output.conservation_diagnostics.plot()
+
         with self.assertRaises(ValueError):
             sim.state.get_var("test")
 
@@ -295,6 +329,28 @@ class TestForcingOutput(TestSimulBase):
         sim2.output.phys_fields.plot()
         sim2.plot_freq_diss("y")
 
+        # cross-sections of 2D fields
+        set_of_phys_files = sim2.output.phys_fields.set_of_phys_files
+        set_of_phys_files.update_times()
+        field, _ = set_of_phys_files.get_field_to_plot(idx_time=0, key="ux")
+        ny, nx = field.shape
+        field_iy2, _ = set_of_phys_files.get_field_to_plot(
+            idx_time=0, key="ux", equation="iy=2"
+        )
+        assert np.array_equal(field_iy2, field[2])
+        times, series = set_of_phys_files.get_timeseries(
+            ["ux", "uy"], region="iy=2"
+        )
+        assert series["ux"].shape == (times.size, nx)
+        assert np.allclose(series["ux"][0], field[2])
+        y2 = sim2.oper.get_grid1d_seq("y")[2]
+        _, series_y = set_of_phys_files.get_timeseries("ux", region=f"y={y2}")
+        assert np.allclose(series_y["ux"], series["ux"])
+        _, series_x = set_of_phys_files.get_timeseries("ux", region="ix=1")
+        assert np.allclose(series_x["ux"][0], field[:, 1])
+        with pytest.raises(ValueError, match="2D"):
+            set_of_phys_files.get_timeseries("ux", region="iz=0")
+
         # `compute('q')` two times for better coverage...
         sim.state.get_var("q")
         sim.state.get_var("q")
@@ -318,6 +374,172 @@ class TestForcingOutput(TestSimulBase):
         plt.close("all")
 
 
+class TestRollback(TestSimulBase):
+    @classmethod
+    def init_params(cls):
+        params = super().init_params()
+        params.output.HAS_TO_SAVE = False
+        params.time_stepping.USE_T_END = False
+        params.time_stepping.it_end = 7
+        params.time_stepping.rollback.nb_snapshots = 2
+        params.time_stepping.rollback.nb_steps_snapshots = 2
+
+    def test_rollback(self):
+        sim = self.sim
+        time_stepping = sim.time_stepping
+        time_stepping.main_loop()
+        ring = time_stepping._snapshot_ring
+        assert ring.nb_saved == 2 and ring.it_last == 6
+        CFL = time_stepping.CFL
+
+        # blow up during the next time step
+        sim.state.state_spect[0, 1, 1] = np.nan
+        sim.params.time_stepping.it_end = 10
+        time_stepping.main_loop()
+
+        assert time_stepping.it == 10
+        assert len(time_stepping.rollback_events) == 1
+        event = time_stepping.rollback_events[0]
+        assert event["it_nan"] == 8 and event["it"] == 6
+        assert time_stepping.CFL == CFL / 2
+        assert not np.isnan(np.sum(sim.state.state_spect))
+        assert sorted(ring.its) == [6, 8]
+
+        # NaN again before a new snapshot: rollback to an older snapshot
+        compute = time_stepping.one_time_step_computation
+        nb_blowups = [2]
+
+        def one_time_step_computation():
+            compute()
+            if nb_blowups[0]:
+                nb_blowups[0] -= 1
+                # (a NaN in physical space contaminates all modes)
+                sim.state.state_spect.fill(np.nan)
+                time_stepping._check_nan()
+
+        time_stepping.one_time_step_computation = one_time_step_computation
+        sim.params.time_stepping.it_end = 12
+        time_stepping.main_loop()
+        del time_stepping.one_time_step_computation
+
+        assert time_stepping.it == 12
+        # the state at it = 10 is valid and saved before the first blow up
+        assert [event["it"] for event in time_stepping.rollback_events] == [
+            6,
+            10,
+            8,
+        ]
+        assert time_stepping.CFL == CFL / 8
+
+
+class TestRollbackLastTimeStep(TestSimulBase):
+    @classmethod
+    def init_params(cls):
+        params = super().init_params()
+        params.output.HAS_TO_SAVE = False
+        params.time_stepping.USE_T_END = False
+        params.time_stepping.it_end = 4
+        params.time_stepping.rollback.nb_snapshots = 1
+        params.time_stepping.rollback.nb_steps_snapshots = 2
+
+    def test_rollback_last_time_step(self):
+        sim = self.sim
+        time_stepping = sim.time_stepping
+        compute = time_stepping.one_time_step_computation
+
+        def one_time_step_computation():
+            compute()
+            if time_stepping.it == 3 and not time_stepping.rollback_events:
+                # blow up during the last time step
+                sim.state.state_spect.fill(np.nan)
+                time_stepping._check_nan()
+
+        time_stepping.one_time_step_computation = one_time_step_computation
+        time_stepping.main_loop()
+        del time_stepping.one_time_step_computation
+
+        assert time_stepping.it == 4
+        assert len(time_stepping.rollback_events) == 1
+        event = time_stepping.rollback_events[0]
+        assert event["it_nan"] == 4 and event["it"] == 2
+        assert not np.isnan(np.sum(sim.state.state_spect))
+
+        # NaN during the time step which sets _has_to_stop
+        def one_time_step_computation():
+            compute()
+            time_stepping._has_to_stop = True
+            sim.state.state_spect.fill(np.nan)
+            time_stepping._check_nan()
+
+        time_stepping.one_time_step_computation = one_time_step_computation
+        sim.params.time_stepping.it_end = 10
+        time_stepping.main_loop()
+        del time_stepping.one_time_step_computation
+
+        assert len(time_stepping.rollback_events) == 2
+        assert time_stepping.it == 4
+        assert not np.isnan(np.sum(sim.state.state_spect))
+
+
+class TestPrintStdOutBuffered(TestSimulBase):
+    @classmethod
+    def init_params(cls):
+        params = super().init_params()
+        params.time_stepping.t_end = 0.3
+        params.output.periods_print.print_stdout = 0.1
+        params.output.print_stdout.period_sync = 1000.0
+        params.output.print_stdout.signals_sync = "SIGUSR1"
+        params.output.print_stdout.save_records = True
+
+    def test_print_stdout(self):
+        sim = self.sim
+        print_stdout = sim.output.print_stdout
+        if mpi.rank == 0:
+            print_stdout("buffered text")
+            assert "buffered text" not in Path(print_stdout.path_file).read_text()
+            # no reentrant synchronization
+            print_stdout._is_syncing = True
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert "buffered text" not in Path(print_stdout.path_file).read_text()
+            print_stdout._is_syncing = False
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert "buffered text" in Path(print_stdout.path_file).read_text()
+
+        sim.time_stepping.start()
+
+        if mpi.rank > 0:
+            return
+
+        path_run = Path(sim.output.path_run)
+        records = load_records_stdout(path_run)
+        with open(path_run / "stdout.txt") as file:
+            its = [
+                int(line.split()[2]) for line in file if line.startswith("it =")
+            ]
+        assert records["it"].tolist() == its
+        assert records["t"][-1] == sim.time_stepping.t
+
+        # no more synchronization after the end of the simulation
+        assert print_stdout.file.closed
+        assert signal.getsignal(signal.SIGUSR1) is not print_stdout._handle_signal
+        print_stdout._buffer.append("text after close\n")
+        print_stdout.sync()
+        assert "text after close" not in (path_run / "stdout.txt").read_text()
+        with pytest.warns(UserWarning, match="SIGUSR2"):
+            print_stdout._init_signals_sync(["SIGUSR2"])
+        assert signal.SIGUSR2 not in print_stdout._previous_signal_handlers
+
+        # the tailing tools can also use the binary records
+        path_tmp = path_run / "only_records"
+        path_tmp.mkdir()
+        shutil.copy(path_run / "stdout_records.bin", path_tmp)
+        assert times_start_last_from_path(path_tmp) == (
+            records["t"][0],
+            records["t"][-1],
+        )
+        assert get_last_estimated_remaining_duration(path_tmp).startswith("0:")
+
+
 class TestSolverNS2DInitJet(TestSimulBase):
     @classmethod
     def init_params(self):
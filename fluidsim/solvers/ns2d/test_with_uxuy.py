@@ -88,3 +88,25 @@ class TestForcingMilestonePeriodicUniform(TestForcingMilestone):
         milestone.check_plot_forcing(8.0)
         milestone.check_plot_solid(8.0)
         milestone.check_with_animation(number_frames=4, interval=1)
+
+
+class TestForcingMilestoneSolidPhases(TestForcingMilestonePeriodicUniform):
+    @classmethod
+    def init_params(self):
+        super().init_params()
+        self.params.forcing.milestone.nb_phases_solid = 40
+
+    def test_milestone(self):
+        self.sim.time_stepping.start()
+
+        milestone = self.sim.forcing.forcing_maker
+        nb_phases = self.sim.params.forcing.milestone.nb_phases_solid
+        delta_phase = milestone.period / nb_phases
+        for time in (0.0, 3 * delta_phase, milestone.period + delta_phase):
+            solid = milestone.get_solid_full(time).copy()
+            assert np.allclose(solid, milestone._compute_solid_full(time))
+
+        time = 2.5 * delta_phase
+        solid = milestone.get_solid_full(time).copy()
+        solid_exact = milestone._compute_solid_full(time)
+        assert abs(solid - solid_exact).max() < 0.1
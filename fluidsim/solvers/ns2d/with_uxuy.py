@@ -18,8 +18,7 @@ class TimeStepping(TimeSteppingPseudoSpectral):
         uy_fft = state_spect.get_var("uy_fft")
         self.sim.oper.projection_perp(ux_fft, uy_fft)
         self.sim.state.statephys_from_statespect()
-        if np.isnan(np.sum(state_spect[0])):
-            raise ValueError(f"nan at it = {self.it}, t = {self.t:.4f}")
+        self._check_nan()
 
 
 class State(StateBase):
@@ -136,6 +135,6 @@ class Simul(SimulBase):
         tendencies_fft.set_var("uy_fft", Fy_fft)
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         return tendencies_fft
@@ -168,7 +168,7 @@ class Simul(SimulStrat):
         tendencies_fft.set_var("b_fft", fb_fft)
 
         if self.is_forcing_enabled:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         self.project_state_spect(tendencies_fft)
         self.oper.dealiasing(tendencies_fft)
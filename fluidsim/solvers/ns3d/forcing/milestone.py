@@ -99,6 +99,10 @@ class ForcingMilestone3D(ForcingMilestone):
 
         return self.solid
 
+    def _compute_solid_full(self, time):
+        solid, x_coors, y_coors = self.get_solid_field(time)
+        return self._full_from_coarse(solid)
+
     def compute(self, time=None):
 
         sim = self.sim
@@ -106,9 +110,7 @@ class ForcingMilestone3D(ForcingMilestone):
         if time is None:
             time = sim.time_stepping.t
 
-        solid, x_coors, y_coors = self.get_solid_field(time)
-
-        solid = self._full_from_coarse(solid)
+        solid = self.get_solid_full(time)
 
         vx = sim.state.state_phys.get_var("vx")
         fx = self.sigma * solid * (self.get_speed(time) - vx)
@@ -11,7 +11,7 @@ from math import pi
 
 import numpy as np
 import h5netcdf
-from scipy.interpolate import interp1d
+
 
 from transonic import boost, Array
 
@@ -20,6 +20,9 @@ from fluidsim.util.frequency_modulation import FrequencyModulatedSignalMaker
 
 from fluidsim.base.forcing.base import ForcingBasePseudoSpectral
 from fluidsim.base.forcing.specific import SpecificForcingPseudoSpectralSimple
+from fluidsim.util.lazy import lazy_import
+
+interpolate = lazy_import("scipy.interpolate")
 
 
 class ForcingInternalWavesWatuCoriolis(SpecificForcingPseudoSpectralSimple):
@@ -110,7 +113,7 @@ class ForcingInternalWavesWatuCoriolis(SpecificForcingPseudoSpectralSimple):
 
             # interpolation functions
             self.interpolents = [
-                interp1d(times, signals[index])
+                interpolate.interp1d(times, signals[index])
                 for index in range(signals.shape[0])
             ]
 
@@ -17,6 +17,7 @@ import numpy as np
 from fluiddyn.util import mpi
 
 from fluidsim.base.init_fields import InitFieldsBase, SpecificInitFields
+from fluidsim.util.philox import compute_noise_fft
 
 
 class SpecificInitFieldsNS3D(SpecificInitFields):
@@ -120,14 +121,11 @@ length: float (default 0.)
 
         K = np.sqrt(oper.K2)
         velo_max = params.init_fields.noise.velo_max
+        field = oper.create_arrayX()
 
-        for key in self.sim.state.keys_state_spect:
+        for index, key in enumerate(self.sim.state.keys_state_spect):
             if key not in fields:
-                field = np.random.random(oper.shapeX_loc)
-                field_fft = oper.fft(field)
-                if mpi.rank == 0:
-                    field_fft[0, 0, 0] = 0.0
-
+                field_fft = compute_noise_fft(oper, stream=index)
                 field_fft *= H_smooth(k0 - K, delta_k0)
                 oper.ifft_as_arg(field_fft, field)
 
@@ -160,17 +158,10 @@ def compute_solenoidal_noise_fft(oper, length=None, velo_max=1, seed=42):
     def H_smooth(x, delta):
         return (1.0 + np.tanh(2 * np.pi * x / delta)) / 2.0
 
-    # to compute always the same field... (for 1 resolution...)
-    np.random.seed(seed + mpi.rank)
-
-    vv = [np.random.random(oper.shapeX_loc) - 0.5 for i in range(3)]
-
-    vv_fft = []
-    for ii, vi in enumerate(vv):
-        vv_fft.append(oper.fft(vi))
-
-        if mpi.rank == 0:
-            vv_fft[ii][0, 0, 0] = 0.0
+    # same field for any number of processes (counter-based generator)
+    vv_fft = [
+        compute_noise_fft(oper, stream=index, seed=seed) for index in range(3)
+    ]
 
     oper.project_perpk3d(*vv_fft)
     oper.dealiasing(*vv_fft)
@@ -180,8 +171,10 @@ def compute_solenoidal_noise_fft(oper, length=None, velo_max=1, seed=42):
 
     K = np.sqrt(oper.K2)
 
-    vv_fft = [vi_fft * H_smooth(k0 - K, delta_k0) for vi_fft in vv_fft]
-    vv = [oper.ifft(ui_fft) for ui_fft in vv_fft]
+    filter_fft = H_smooth(k0 - K, delta_k0)
+    for vi_fft in vv_fft:
+        vi_fft *= filter_fft
+    vv = [oper.ifft(vi_fft) for vi_fft in vv_fft]
 
     velo_max_result_random = np.sqrt(vv[0] ** 2 + vv[1] ** 2 + vv[2] ** 2).max()
     if mpi.nb_proc > 1:
@@ -189,9 +182,9 @@ def compute_solenoidal_noise_fft(oper, length=None, velo_max=1, seed=42):
             velo_max_result_random, op=mpi.MPI.MAX
         )
 
-    vv = [velo_max * vi / velo_max_result_random for vi in vv]
-
-    vv_fft = [oper.fft(vi) for vi in vv]
+    coef = velo_max / velo_max_result_random
+    for vi_fft in vv_fft:
+        vi_fft *= coef
 
     return tuple(vv_fft)
 
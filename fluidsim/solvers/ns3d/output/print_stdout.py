@@ -1,9 +1,11 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluidsim.base.output.print_stdout import PrintStdOutBase
 
 from fluiddyn.util import mpi
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class PrintStdOutNS3D(PrintStdOutBase):
@@ -10,11 +10,13 @@
 import os
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 
 from fluidsim.base.output.spatial_means import SpatialMeansBase
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SpatialMeansNS3D(SpatialMeansBase):
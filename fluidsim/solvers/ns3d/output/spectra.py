@@ -1,12 +1,15 @@
 from functools import partial
 
 import numpy as np
-import matplotlib as mpl
 import h5py
 
 from fluidsim.util import ensure_radians
 
 from fluidsim.base.output.spectra3d import Spectra
+from fluidsim.util.lazy import lazy_import
+
+mpl = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
 
 
 def _get_averaged_spectrum(key, h5file, imin_plot, imax_plot):
@@ -250,7 +253,7 @@ imin = {imin_plot:8d} ; imax = {imax_plot:8d} ; delta_i = {delta_i_plot}"""
 
         if cmap is None:
             cmap = mpl.rcParams["image.cmap"]
-        cmapper = getattr(mpl.pyplot.cm, cmap)
+        cmapper = getattr(plt.cm, cmap)
         nb_plots = imax_plot - imin_plot + 1
         colors = cmapper(np.linspace(0, 1, nb_plots))
 
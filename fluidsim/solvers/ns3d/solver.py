@@ -242,7 +242,7 @@ projection: str (default None)
         fft_as_arg(fz, fz_fft)
 
         if self.is_forcing_enabled:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         if getattr(self, "is_turb_model_enabled", False):
             tendencies_fft += self.turb_model.get_forcing(
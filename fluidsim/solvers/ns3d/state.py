@@ -52,7 +52,13 @@ class StateNS3D(StatePseudoSpectral):
             np.empty_like(self.state_spect[0]) for n in range(3)
         )
 
-    def compute(self, key, SAVE_IN_DICT=True, RAISE_ERROR=True):
+    def compute(self, key, SAVE_IN_DICT=True, RAISE_ERROR=True, out=None):
+        """Compute and return a variable
+
+        For the variables in physical space, the result is written in ``out``
+        if it is given.
+
+        """
         it = self.sim.time_stepping.it
         if key in self.vars_computed and it == self.it_computed[key]:
             return self.vars_computed[key]
@@ -65,12 +71,12 @@ class StateNS3D(StatePseudoSpectral):
             vx_fft = self.get_var("vx_fft")
             vy_fft = self.get_var("vy_fft")
             rotz_fft = self.oper.rotzfft_from_vxvyfft(vx_fft, vy_fft)
-            result = self.oper.ifft3d(rotz_fft)
+            result = self._ifft_out(rotz_fft, out)
         elif key == "divh":
             vx_fft = self.get_var("vx_fft")
             vy_fft = self.get_var("vy_fft")
             divh_fft = self.oper.divhfft_from_vxvyfft(vx_fft, vy_fft)
-            result = self.oper.ifft3d(divh_fft)
+            result = self._ifft_out(divh_fft, out)
         elif key == "divh_fft":
             vx_fft = self.get_var("vx_fft")
             vy_fft = self.get_var("vy_fft")
@@ -82,7 +88,7 @@ class StateNS3D(StatePseudoSpectral):
             result = self.oper.vpfft_from_vecfft(vx_fft, vy_fft, vz_fft)
         elif key == "vp":
             vp_fft = self.compute("vp_fft")
-            result = self.oper.ifft3d(vp_fft)
+            result = self._ifft_out(vp_fft, out)
         elif key == "vt_fft":
             vx_fft = self.get_var("vx_fft")
             vy_fft = self.get_var("vy_fft")
@@ -90,7 +96,7 @@ class StateNS3D(StatePseudoSpectral):
             result = self.oper.vtfft_from_vecfft(vx_fft, vy_fft, vz_fft)
         elif key == "vt":
             vt_fft = self.compute("vt_fft")
-            result = self.oper.ifft3d(vt_fft)
+            result = self._ifft_out(vt_fft, out)
 
         else:
             to_print = f'Do not know how to compute "{key}".'
@@ -108,6 +114,12 @@ class StateNS3D(StatePseudoSpectral):
 
         return result
 
+    def _ifft_out(self, arr_fft, out=None):
+        if out is None:
+            return self.oper.ifft3d(arr_fft)
+        self.oper.ifft_as_arg(arr_fft, out)
+        return out
+
     def init_from_vxvyfft(self, vx_fft, vy_fft):
         self.state_spect.fill(0.0)
         self.state_spect.set_var("vx_fft", vx_fft)
@@ -24,13 +24,37 @@ from ..solver import InfoSolverNS3D, Simul as SimulNS3D
 
 
 Ac = "complex128[:,:,:]"
+Af = "float64[:,:,:]"
 
 
 @boost
-def compute_fb_fft(div_vb_fft: Ac, N: "float or int", vz_fft: Ac):
-    fb_fft = div_vb_fft
-    fb_fft[:] = -div_vb_fft - N**2 * vz_fft
-    return fb_fft
+def compute_vb_outin(vx: Af, vy: Af, vz: Af, b: Af, vxb: Af, vyb: Af, vzb: Af):
+    """Compute the buoyancy flux in physical space
+
+    ``vzb`` can be the array ``b`` (overwritten).
+
+    """
+    vxb[:] = vx * b
+    vyb[:] = vy * b
+    vzb[:] = vz * b
+
+
+@boost
+def compute_fb_fft_outin(
+    vxb_fft: Ac,
+    vyb_fft: Ac,
+    vzb_fft: Ac,
+    Kx: Af,
+    Ky: Af,
+    Kz: Af,
+    N: "float or int",
+    vz_fft: Ac,
+    fb_fft: Ac,
+):
+    """Compute the buoyancy tendency in spectral space (-div(v b) - N**2 v_z)"""
+    fb_fft[:] = (
+        -1j * (Kx * vxb_fft + Ky * vyb_fft + Kz * vzb_fft) - N**2 * vz_fft
+    )
 
 
 class InfoSolverNS3DStrat(InfoSolverNS3D):
@@ -136,10 +160,23 @@ class Simul(SimulNS3D):
         sim_repr_maker.add_parameters({"N": sim_repr_maker.sim.params.N})
 
     def tendencies_nonlin(self, state_spect=None, old=None):
+        r"""Compute the nonlinear tendencies
+
+        Only preallocated arrays are used (no temporary arrays) and the
+        physical velocity is used both for :math:`\vv \times \bomega` and
+        for the buoyancy flux :math:`\vv b`. Without ``state_spect``, the
+        computation requires 9 FFTs (3 inverse FFTs for the vorticity, 3 FFTs
+        for :math:`\vv \times \bomega` and 3 FFTs for :math:`\vv b`). With
+        ``state_spect``, 4 more inverse FFTs (velocity and buoyancy) are
+        needed.
+
+        """
         oper = self.oper
         ifft_as_arg = oper.ifft_as_arg
         ifft_as_arg_destroy = oper.ifft_as_arg_destroy
         fft_as_arg = oper.fft_as_arg
+        fields_tmp = self.state.fields_tmp
+        fields_spect_tmp = self.state.fields_spect_tmp
 
         if state_spect is None:
             spect_get_var = self.state.state_spect.get_var
@@ -151,16 +188,16 @@ class Simul(SimulNS3D):
         vz_fft = spect_get_var("vz_fft")
         b_fft = spect_get_var("b_fft")
 
-        omegax_fft, omegay_fft, omegaz_fft = oper.rotfft_from_vecfft(
-            vx_fft, vy_fft, vz_fft
+        omegax_fft, omegay_fft, omegaz_fft = fields_spect_tmp
+
+        oper.rotfft_from_vecfft_outin(
+            vx_fft, vy_fft, vz_fft, omegax_fft, omegay_fft, omegaz_fft
         )
 
         if self.params.f is not None:
             self._modif_omegafft_with_f(omegax_fft, omegay_fft, omegaz_fft)
 
-        omegax = self.state.fields_tmp[3]
-        omegay = self.state.fields_tmp[4]
-        omegaz = self.state.fields_tmp[5]
+        omegax, omegay, omegaz = fields_tmp[3:6]
 
         ifft_as_arg_destroy(omegax_fft, omegax)
         ifft_as_arg_destroy(omegay_fft, omegay)
@@ -171,13 +208,12 @@ class Simul(SimulNS3D):
             vy = self.state.state_phys.get_var("vy")
             vz = self.state.state_phys.get_var("vz")
         else:
-            vx = self.state.fields_tmp[0]
-            vy = self.state.fields_tmp[1]
-            vz = self.state.fields_tmp[2]
+            vx, vy, vz = fields_tmp[0:3]
             ifft_as_arg(vx_fft, vx)
             ifft_as_arg(vy_fft, vy)
             ifft_as_arg(vz_fft, vz)
 
+        # the vorticity arrays are overwritten by the vector product
         fx, fy, fz = vector_product(vx, vy, vz, omegax, omegay, omegaz)
 
         if old is None:
@@ -197,19 +233,35 @@ class Simul(SimulNS3D):
 
         fz_fft += b_fft
 
+        # fields_tmp[3:6] (fx, fy, fz) can now be reused
+        vxb, vyb, vzb = fields_tmp[4], fields_tmp[5], fields_tmp[3]
         if state_spect is None:
             b = self.state.state_phys.get_var("b")
         else:
-            b = self.state.fields_tmp[3]
+            b = vzb
             ifft_as_arg(b_fft, b)
 
-        div_vb_fft = oper.div_vb_fft_from_vb(vx, vy, vz, b)
-        fb_fft = compute_fb_fft(div_vb_fft, self.params.N, vz_fft)
-
-        tendencies_fft.set_var("b_fft", fb_fft)
+        compute_vb_outin(vx, vy, vz, b, vxb, vyb, vzb)
+
+        vxb_fft, vyb_fft, vzb_fft = fields_spect_tmp
+        fft_as_arg(vxb, vxb_fft)
+        fft_as_arg(vyb, vyb_fft)
+        fft_as_arg(vzb, vzb_fft)
+
+        compute_fb_fft_outin(
+            vxb_fft,
+            vyb_fft,
+            vzb_fft,
+            oper.Kx,
+            oper.Ky,
+            oper.Kz,
+            self.params.N,
+            vz_fft,
+            tendencies_fft.get_var("b_fft"),
+        )
 
         if self.is_forcing_enabled:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         self.project_state_spect(tendencies_fft)
         self.oper.dealiasing(tendencies_fft)
@@ -58,6 +58,116 @@ class TestTendency(TestSimulBase):
 
         self.assertGreater(1e-15, abs(ratio))
 
+    def test_tendency_buoyancy(self):
+        sim = self.sim
+        oper = sim.oper
+        state = sim.state
+
+        b_fft = state.get_var("b_fft")
+        b_fft[:] = 0.1 * state.get_var("vx_fft")
+        state.statephys_from_statespect()
+
+        tend = sim.tendencies_nonlin().copy()
+        tend_from_spect = sim.tendencies_nonlin(state_spect=state.state_spect)
+        assert np.allclose(tend, tend_from_spect)
+
+        vx, vy, vz, b = (state.get_var(key) for key in ("vx", "vy", "vz", "b"))
+        Fb_fft = -oper.div_vb_fft_from_vb(
+            vx, vy, vz, b
+        ) - sim.params.N**2 * state.get_var("vz_fft")
+        oper.dealiasing(Fb_fft)
+        assert np.allclose(tend.get_var("b_fft"), Fb_fft)
+
+
+class TestSpatialMeansRegions(TestSimulBase):
+    @classproperty
+    def Simul(cls):
+        from .solver import Simul
+        from fluidsim.extend_simul.spatial_means_regions_milestone import (
+            SpatialMeansRegions,
+        )
+
+        return extend_simul_class(Simul, SpatialMeansRegions)
+
+    @classmethod
+    def init_params(self):
+        params = super().init_params()
+        params.init_fields.type = "noise"
+        params.forcing.enable = False
+        params.output.periods_save.spatial_means_regions = 1e-10
+        # overlapping regions (the last one is the whole domain)
+        params.output.spatial_means_regions.xmin = [0.1, 0.2, 0.0]
+        params.output.spatial_means_regions.xmax = [0.5, 0.9, 1.0]
+
+    def test_means_fluxes_regions(self):
+        sim = self.sim
+        sim.time_stepping.start()
+        output = sim.output.spatial_means_regions
+        nb_regions = output.nb_regions
+        assert nb_regions == 3
+
+        # comparison with the former masked computations
+        rng = np.random.default_rng(mpi.rank)
+        shape = sim.oper.shapeX_loc
+        fields = [rng.standard_normal(shape) for _ in range(2)]
+        vx = rng.standard_normal(shape)
+        means, fluxes = output._compute_means_fluxes_regions(
+            [output._sum_regions_loc(field) for field in fields],
+            [output._sum_surfaces_loc(field, vx) for field in fields],
+        )
+        assert means.shape == (2, nb_regions)
+        assert fluxes.shape == (2, nb_regions, 2)
+
+        def allreduce(value):
+            if mpi.nb_proc > 1:
+                value = mpi.comm.allreduce(value, op=mpi.MPI.SUM)
+            return value
+
+        for iregion, info_region in enumerate(output.info_regions):
+            xmin, xmax = info_region[:2]
+            ixmin_loc, ixmax_surf_loc, ixstop_loc = info_region[4:]
+            mask = np.zeros(shape, dtype=np.int8)
+            mask[:, :, ixmin_loc:ixstop_loc] = 1
+            nb_points = allreduce(mask.sum())
+
+            def compute_flux(field, ixsurface_loc):
+                if ixsurface_loc is None:
+                    sum_surface = nb_points_surface = 0.0
+                else:
+                    sum_surface = (
+                        vx[:, :, ixsurface_loc] * field[:, :, ixsurface_loc]
+                    ).sum()
+                    nb_points_surface = shape[0] * shape[1]
+                return (
+                    allreduce(sum_surface)
+                    / allreduce(nb_points_surface)
+                    / (xmax - xmin)
+                )
+
+            for ifield, field in enumerate(fields):
+                mean = allreduce((mask * field).sum()) / nb_points
+                assert np.isclose(means[ifield, iregion], mean)
+                assert np.isclose(
+                    fluxes[ifield, iregion, 0], compute_flux(field, ixmin_loc)
+                )
+                assert np.isclose(
+                    fluxes[ifield, iregion, 1],
+                    -compute_flux(field, ixmax_surf_loc),
+                )
+
+        if mpi.rank > 0:
+            return
+
+        # without forcing
+        for iregion in range(nb_regions):
+            df = output.load(iregion)
+            assert len(df) >= 2
+            assert np.all(np.isfinite(df.drop(columns="time").values))
+            assert np.all(df["PK"] == 0)
+            assert np.all(df["flux_Pforcing_xmin"] == 0)
+            assert np.all(df["flux_Pforcing_xmax"] == 0)
+            assert np.all(df["EK"] > 0)
+
 
 class TestOutput(TestSimulBase):
     @classproperty
@@ -127,6 +237,34 @@ class TestOutput(TestSimulBase):
             sum(sim.output.compute_energies()), sim.output.compute_energy()
         )
 
+        # fused cross correlations versus the operator methods
+        cross_corr = sim.output.cross_corr
+        cross_corr.has_to_save_kzkh = lambda: True
+        try:
+            dict_spectra1d, dict_spectra3d, dict_kzkh = cross_corr.compute()
+        finally:
+            del cross_corr.has_to_save_kzkh
+
+        assert len(dict_kzkh) == 6
+        for key0, key1, key_cc in [
+            ("vx_fft", "vz_fft", "xz"),
+            ("vz_fft", "b_fft", "zb"),
+        ]:
+            cross_corr_tmp = -np.real(
+                sim.state.get_var(key0).conj() * sim.state.get_var(key1)
+            )
+            spectra1d = oper.compute_1dspectra(cross_corr_tmp)
+            spectrum3d = oper.compute_3dspectrum(cross_corr_tmp)
+            spectrum_kzkh = oper.compute_spectrum_kzkh(cross_corr_tmp)
+            if mpi.rank > 0:
+                continue
+            for letter, spectrum in zip("xyz", spectra1d):
+                assert np.allclose(
+                    dict_spectra1d[f"spectra_{key_cc}_k{letter}"], spectrum
+                )
+            assert np.allclose(dict_spectra3d["spectra_" + key_cc], spectrum3d)
+            assert np.allclose(dict_kzkh[key_cc], spectrum_kzkh)
+
         if mpi.nb_proc > 1:
             return
 
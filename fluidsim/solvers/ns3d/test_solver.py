@@ -1,10 +1,12 @@
 import unittest
+import os
 import sys
 from pathlib import Path
 from math import pi
 
 import pytest
 
+import h5py
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -20,6 +22,7 @@ from fluidsim import (
     load_for_restart,
 )
 from fluidsim.base.output import run
+from fluidsim.base.output.phys_fields import SetOfPhysFieldFiles
 
 
 from fluidsim.util.testing import TestSimul, skip_if_no_fluidfft, classproperty
@@ -77,6 +80,7 @@ class TestTendency(TestSimulBase):
         params = super().init_params()
         cls._init_grid(params, nx=20)
         params.output.HAS_TO_SAVE = False
+        params.state.reuse_arrays_vars_computed = True
 
     def test_tendency(self):
 
@@ -97,6 +101,35 @@ class TestTendency(TestSimulBase):
 
         self.assertGreater(1e-15, abs(ratio))
 
+    def test_vars_computed(self):
+        sim = self.sim
+        state = sim.state
+        vars_computed = state.vars_computed
+
+        rotz = state.get_var("rotz")
+        assert state.get_var("rotz") is rotz
+
+        sim.time_stepping.it += 1
+        state.get_var("vx_fft")[:] *= 2
+        # the array is overwritten in place
+        assert state.get_var("rotz") is rotz
+        oper = sim.oper
+        rotz_fft = oper.rotzfft_from_vxvyfft(
+            state.get_var("vx_fft"), state.get_var("vy_fft")
+        )
+        assert np.allclose(rotz, oper.ifft3d(rotz_fft))
+
+        # never for arrays sharing memory with the state
+        vx_fft = state.state_spect.get_var("vx_fft")
+        vars_computed.store_buffer("vx_fft", vx_fft)
+        assert not state._can_be_overwritten(vx_fft)
+        assert state._can_be_overwritten(rotz)
+        vars_computed.clear()
+
+        stats = vars_computed.get_stats()
+        assert stats["nb_hits"] == 1
+        assert stats["nb_misses"] == 3
+
 
 class TestOutput(TestSimulBase):
     @classmethod
@@ -241,6 +274,84 @@ class TestOutput(TestSimulBase):
             )
             sim2.plot_freq_diss("z")
 
+            phys_fields = sim2.output.phys_fields
+            set_of_phys_files = phys_fields.set_of_phys_files
+            fields = np.array(
+                [
+                    set_of_phys_files.get_field_to_plot(
+                        idx_time=idx, key="vx", equation="iy=1"
+                    )[0]
+                    for idx in range(set_of_phys_files.times.size)
+                ]
+            )
+            for nb_workers, use_cache in ((None, True), (2, False), (None, True)):
+                means, variances, times = phys_fields.compute_time_average(
+                    "vx",
+                    equation="iy=1",
+                    nb_workers=nb_workers,
+                    use_cache=use_cache,
+                )
+                assert times.size == fields.shape[0]
+                assert np.allclose(means["vx"], fields.mean(0))
+                assert np.allclose(variances["vx"], fields.var(0))
+            phys_fields.plot_mean(field="vx", equation="iy=1")
+
+            times, series = set_of_phys_files.get_timeseries(
+                ["vx", "vy"], region="iy=1", nb_workers=2
+            )
+            assert np.allclose(times, set_of_phys_files.times, atol=1e-3)
+            assert np.allclose(series["vx"], fields)
+            # a point (with the index cached in the directory of the run)
+            assert (Path(path_run) / "state_phys_index.json").exists()
+            times_point, series = set_of_phys_files.get_timeseries(
+                "vx", region=(1, 1, 2), tmin=times[1], nb_workers=1
+            )
+            assert np.array_equal(times_point, times[1:])
+            assert np.allclose(series["vx"], fields[1:, 1, 2])
+
+            # equation in physical units (the grid is given by the output)
+            y1 = sim2.oper.get_grid1d_seq("y")[1]
+            _, series = set_of_phys_files.get_timeseries("vx", region=f"y={y1}")
+            assert np.allclose(series["vx"], fields)
+            # no grid without output
+            set_of_files_no_output = SetOfPhysFieldFiles(path_run)
+            _, series = set_of_files_no_output.get_timeseries("vx", region="iy=1")
+            assert np.allclose(series["vx"], fields)
+            with pytest.raises(ValueError, match="physical units"):
+                set_of_files_no_output.get_timeseries("vx", region=f"y={y1}")
+
+            # equation containing the separator of the HDF5 groups
+            means, _, _ = phys_fields.compute_time_average(
+                "vx", equation="iy=4//4"
+            )
+            assert np.allclose(means["vx"], fields.mean(0))
+            path_cache = Path(path_run) / "time_averages.h5"
+            with h5py.File(path_cache, "r") as file:
+                assert all(
+                    isinstance(group["times"], h5py.Dataset)
+                    for group in file.values()
+                )
+                descriptions = [
+                    group.attrs["description"] for group in file.values()
+                ]
+            assert any(
+                description.startswith("iy=4//4") for description in descriptions
+            )
+
+            # a rewritten file invalidates the cached averages
+            path_file = set_of_phys_files.path_files[-1]
+            with h5py.File(path_file, "r+") as file:
+                dataset = file["state_phys/vx"]
+                vx = dataset[...]
+                dataset[...] = 2 * vx
+            stat = os.stat(path_file)
+            os.utime(path_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            means, _, _ = phys_fields.compute_time_average("vx", equation="iy=1")
+            fields[-1] *= 2
+            assert np.allclose(means["vx"], fields.mean(0))
+            with h5py.File(path_file, "r+") as file:
+                file["state_phys/vx"][...] = vx
+
         sim3 = fls.load_state_phys_file(path_run, modif_save_params=False)
         sim3.params.time_stepping.t_end += 0.2
         sim3.time_stepping.start()
@@ -262,7 +373,29 @@ class TestOutput(TestSimulBase):
         sys.argv = ["fluidsim-create-xml-description", path_run]
         run()
         sim3.output.temporal_spectra.plot_spectra()
-        sim3.output.temporal_spectra.save_data_as_phys_fields(delta_index_times=2)
+        temporal_spectra = sim3.output.temporal_spectra
+        temporal_spectra.save_data_as_phys_fields()
+        paths_fields = sorted(
+            (temporal_spectra.path_dir / "phys_fields").glob("probes_fields_*")
+        )
+        vxs = []
+        for path in paths_fields:
+            with h5py.File(path, "r") as file:
+                vxs.append(file["vx"][...])
+        # resume an interrupted conversion (chunks of one time, so that
+        # several chunks are processed by 2 processes)
+        assert len(paths_fields) > 2
+        for path in paths_fields[1:]:
+            path.unlink()
+        mtime_first = paths_fields[0].stat().st_mtime
+        temporal_spectra.save_data_as_phys_fields(
+            nb_workers=2, max_mem=vxs[0].nbytes
+        )
+        assert paths_fields[0].stat().st_mtime == mtime_first
+        for path, vx in zip(paths_fields, vxs):
+            with h5py.File(path, "r") as file:
+                assert np.array_equal(file["vx"][...], vx, equal_nan=True)
+                assert "info_simul" in file
         sim3.output.temporal_spectra.save_spectra()
 
         t_end = sim3.params.time_stepping.t_end
@@ -624,5 +757,19 @@ class TestForcingMilestonePeriodicUniform(TestForcingMilestone):
         self.sim.forcing.get_info()
 
 
+class TestForcingMilestoneSolidPhases(TestForcingMilestone):
+    @classmethod
+    def init_params(cls):
+        params = super().init_params()
+        params.forcing.milestone.nb_phases_solid = 8
+
+    def test_milestone(self):
+        super().test_milestone()
+        milestone = self.sim.forcing.forcing_maker
+        time = 3 * self.sim.params.oper.Lx / 8
+        solid = milestone.get_solid_full(time).copy()
+        assert np.allclose(solid, milestone._compute_solid_full(time))
+
+
 if __name__ == "__main__":
     unittest.main()
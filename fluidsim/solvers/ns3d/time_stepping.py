@@ -1,5 +1,3 @@
-import numpy as np
-
 from fluidsim.base.time_stepping.pseudo_spect import TimeSteppingPseudoSpectral
 from fluidsim.operators.operators3d import dealiasing_variable
 
@@ -15,6 +13,4 @@ class TimeSteppingPseudoSpectralNS3D(TimeSteppingPseudoSpectral):
         self.sim.project_state_spect(state_spect)
         self.sim.oper.dealiasing(state_spect)
         self.sim.state.statephys_from_statespect()
-        # np.isnan(np.sum seems to be really fast
-        if np.isnan(np.sum(state_spect[0])):
-            raise ValueError(f"nan at it = {self.it}, t = {self.t:.4f}")
+        self._check_nan()
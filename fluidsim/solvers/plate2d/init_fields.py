@@ -9,6 +9,7 @@ import numpy as np
 
 from fluiddyn.util import mpi
 from fluidsim.base.init_fields import InitFieldsBase, SpecificInitFields
+from fluidsim.util.philox import compute_noise_fft
 
 
 class InitFieldsNoise(SpecificInitFields):
@@ -36,42 +37,26 @@ class InitFieldsNoise(SpecificInitFields):
         def H_smooth(x, delta):
             return (1.0 + np.tanh(2 * np.pi * x / delta)) / 2.0
 
-        # to compute always the same field... (for 1 resolution...)
-        np.random.seed(42)  # this does not work for MPI...
-
-        w_fft = (
-            np.random.random(oper.shapeK)
-            + 1j * np.random.random(oper.shapeK)
-            - 0.5
-            - 0.5j
-        )
-        z_fft = (
-            np.random.random(oper.shapeK)
-            + 1j * np.random.random(oper.shapeK)
-            - 0.5
-            - 0.5j
-        )
-
-        if mpi.rank == 0:
-            w_fft[0, 0] = 0.0
-            z_fft[0, 0] = 0.0
+        # same field for any number of processes (counter-based generator)
+        w_fft = compute_noise_fft(oper, stream=0)
+        z_fft = compute_noise_fft(oper, stream=1)
 
         oper.dealiasing(w_fft, z_fft)
 
         k0 = 2 * np.pi / lambda0
         delta_k0 = 1.0 * k0
-        w_fft = w_fft * H_smooth(k0 - oper.K, delta_k0)
-        z_fft = z_fft * H_smooth(k0 - oper.K, delta_k0)
+        filter_fft = H_smooth(k0 - oper.K, delta_k0)
+        w_fft *= filter_fft
+        z_fft *= filter_fft
 
         w = oper.ifft2(w_fft)
         z = oper.ifft2(z_fft)
         velo_max = np.sqrt(w**2 + z**2).max()
         if mpi.nb_proc > 1:
             velo_max = oper.comm.allreduce(velo_max, op=mpi.MPI.MAX)
-        w = params.init_fields.noise.velo_max * w / velo_max
-        z = params.init_fields.noise.velo_max * z / velo_max
-        w_fft = oper.fft2(w)
-        z_fft = oper.fft2(z)
+        coef = params.init_fields.noise.velo_max / velo_max
+        w_fft *= coef
+        z_fft *= coef
 
         return w_fft, z_fft
 
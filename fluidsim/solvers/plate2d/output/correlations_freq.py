@@ -15,13 +15,15 @@ import os
 
 import numpy as np
 import h5py
-import matplotlib.pyplot as plt
 
 from transonic import jit
 from fluiddyn.util import mpi
 from fluiddyn.calcul.easypyfft import FFTW1DReal2Complex
 
 from fluidsim.base.output.base import SpecificOutput
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 @jit
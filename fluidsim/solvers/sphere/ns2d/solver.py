@@ -116,16 +116,8 @@ class SimulSphereNS2D(SimulSphericalHarmo):
 
         # oper.dealiasing(Frot_sh)
 
-        T_rot = (Frot_sh.conj() * rot_sh).real
-        print(
-            ("sum(T_rot) = {:9.4e} ; sum(abs(T_rot)) = {:9.4e}").format(
-                self.oper.sum_wavenumbers(T_rot),
-                self.oper.sum_wavenumbers(abs(T_rot)),
-            )
-        )
-
         if self.params.forcing.enable:
-            tendencies_sh += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_sh)
 
         return tendencies_sh
 
@@ -0,0 +1,74 @@
+"""Output of the sphere.sw1l solver (:mod:`fluidsim.solvers.sphere.sw1l.output`)
+================================================================================
+
+.. autoclass:: Output
+   :members:
+   :private-members:
+
+.. autoclass:: ConservationDiagnosticsSphereSW1L
+   :members:
+   :private-members:
+
+"""
+
+import numpy as np
+
+from fluidsim.base.sphericalharmo.output import Output as OutputSphericalHarmo
+from fluidsim.base.output.conservation_diagnostics import (
+    ConservationDiagnostics,
+)
+
+
+class ConservationDiagnosticsSphereSW1L(ConservationDiagnostics):
+    """Check that the nonlinear terms conserve the energy
+
+    The half squares of the state variables (``rot_sh``, ``div_sh`` and
+    ``eta_sh``) are not conserved by the shallow water equations, so only the
+    energy :math:`E = (1 + \\eta) |\\mathbf{u}|^2 / 2 + c^2 \\eta^2 / 2` is
+    diagnosed. Since it is cubic, the ratio is not of the order of the
+    round-off errors but of the truncation errors.
+
+    """
+
+    def compute_transfers(self, tendencies):
+        """Compute the transfer (spectral array) of energy
+
+        The time derivative of the energy density due to the nonlinear terms
+        is :math:`(1 + \\eta) \\mathbf{u} \\cdot \\mathbf{N_u} + (|\\mathbf{u}|^2
+        / 2 + c^2 \\eta) N_\\eta`. The integrals of these products are
+        computed in spectral space.
+
+        """
+        oper = self.oper
+        state_phys = self.sim.state.state_phys
+        ux = state_phys.get_var("ux")
+        uy = state_phys.get_var("uy")
+        eta = state_phys.get_var("eta")
+        Fux, Fuy = oper.vec_from_divrotsh(
+            tendencies.get_var("div_sh"), tendencies.get_var("rot_sh")
+        )
+        h = 1 + eta
+        bernoulli = 0.5 * (ux**2 + uy**2) + self.sim.params.c2 * eta
+        transfer = np.real(
+            oper.sht(h * ux).conj() * oper.sht(Fux)
+            + oper.sht(h * uy).conj() * oper.sht(Fuy)
+            + oper.sht(bernoulli).conj() * tendencies.get_var("eta_sh")
+        )
+        return {"energy": transfer}
+
+
+class Output(OutputSphericalHarmo):
+    """Output for the sphere.sw1l solver."""
+
+    @staticmethod
+    def _complete_info_solver(info_solver):
+        """Complete the `info_solver` container (static method)."""
+
+        OutputSphericalHarmo._complete_info_solver(info_solver)
+
+        classes = info_solver.classes.Output.classes
+
+        classes.ConservationDiagnostics.module_name = __name__
+        classes.ConservationDiagnostics.class_name = (
+            "ConservationDiagnosticsSphereSW1L"
+        )
@@ -160,25 +160,8 @@ class SimulSphereSW1L(SimulSphericalHarmo):
 
         # oper.dealiasing(tendencies_sh)
 
-        # def check_conservation(Fvar_sh, var_sh, var_str):
-        #     import numpy as np
-        #     T = np.real(Fvar_sh.conj() * var_sh + Fvar_sh * var_sh.conj()) / 2.0
-        #     print(
-        #         ("sum(T_{2}) = {0:9.4e} ; sum(abs(T_{2})) = {1:9.4e}").format(
-        #             self.oper.sum_wavenumbers(T),
-        #             self.oper.sum_wavenumbers(abs(T)),
-        #             var_str
-        #         ),
-        #         end =" | "
-        #     )
-        # rot_sh = state_spect.get_var("rot_sh")
-        # div_sh = state_spect.get_var("div_sh")
-        # check_conservation(Frot_sh, rot_sh, "rot")
-        # check_conservation(Fdiv_sh, div_sh, "div")
-        # print()
-
         if self.params.forcing.enable:
-            tendencies_sh += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_sh)
 
         return tendencies_sh
 
@@ -45,8 +45,6 @@ class TestSolverSphereSW1LTendency(TestSimulBase):
 
         params.output.HAS_TO_SAVE = False
 
-    # todo: add the package 'fluidsim.solvers.sphere.sw1l.output'
-
     # @unittest.expectedFailure
     # def test_tendency(self):
     #     sim = self.sim
@@ -62,3 +60,32 @@ class TestSolverSphereSW1LTendency(TestSimulBase):
     #     )
 
     #     self.assertGreater(1e-15, abs(ratio))
+
+
+@unittest.skipUnless(sht_avail, "No SHT transform library available")
+class TestSolverSphereSW1LConservation(TestSimulBase):
+    @classmethod
+    def init_params(self):
+        params = super().init_params()
+        params.forcing.enable = False
+        params.time_stepping.t_end = 0.2
+        params.output.periods_save.conservation_diagnostics = 0.05
+
+    def test_conservation_diagnostics(self):
+        sim = self.sim
+        sim.time_stepping.start()
+        diagnostics = sim.output.conservation_diagnostics
+        results = diagnostics.compute()
+        names = sorted(
+            key[len("ratio_") :] for key in results if key.startswith("ratio_")
+        )
+        assert names == ["energy"]
+        for name in names:
+            assert np.isfinite(results["T_" + name])
+            assert 0 <= results["ratio_" + name] <= 1
+
+        data = diagnostics.load()
+        assert len(data["times"]) > 1
+        assert sorted(key for key in data if key.startswith("ratio_")) == [
+            "ratio_" + name for name in names
+        ]
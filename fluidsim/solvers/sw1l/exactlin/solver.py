@@ -103,7 +103,7 @@ class Simul(SimulSW1L):
         tendencies_fft.set_var("am_fft", Nm_fft)
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         return tendencies_fft
 
@@ -10,7 +10,7 @@ from fluidsim.util.testing import (
 
 @skip_if_no_fluidfft
 class TestSimulSW1LExactlin(TestSimulConserveOutput):
-    zero = 1e-3
+    zero = 1e-2
 
     @classproperty
     def Simul(cls):
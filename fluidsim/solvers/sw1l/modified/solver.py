@@ -112,7 +112,7 @@ class Simul(SimulSW1L):
         oper.dealiasing(tendencies_fft)
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         return tendencies_fft
 
@@ -11,7 +11,7 @@ from fluidsim.util.testing import (
 
 @skip_if_no_fluidfft
 class TestSimulSW1LWaves(TestSimulConserve):
-    zero = 1e-6
+    zero = 1e-5
 
     @classproperty
     def Simul(cls):
@@ -23,6 +23,16 @@ from transonic import jit
 from fluidsim.base.output import OutputBasePseudoSpectral
 
 
+def linear_eigenmodes_from_values(ux_fft, uy_fft, eta_fft, kx, ky, f, c2):
+    """Compute q, d, a (fft) for scalars or arrays of wavenumbers."""
+    div_fft = 1j * (kx * ux_fft + ky * uy_fft)
+    rot_fft = 1j * (kx * uy_fft - ky * ux_fft)
+    q_fft = rot_fft - f * eta_fft
+    k2 = kx**2 + ky**2
+    ageo_fft = f * rot_fft / c2 + k2 * eta_fft
+    return q_fft, div_fft, ageo_fft
+
+
 @jit
 def linear_eigenmode_from_values_1k(
     ux_fft: np.complex128,
@@ -34,12 +44,7 @@ def linear_eigenmode_from_values_1k(
     c2: "float or int",
 ):
     """Compute q, d, a (fft) for a single wavenumber."""
-    div_fft = 1j * (kx * ux_fft + ky * uy_fft)
-    rot_fft = 1j * (kx * uy_fft - ky * ux_fft)
-    q_fft = rot_fft - f * eta_fft
-    k2 = kx**2 + ky**2
-    ageo_fft = f * rot_fft / c2 + k2 * eta_fft
-    return q_fft, div_fft, ageo_fft
+    return linear_eigenmodes_from_values(ux_fft, uy_fft, eta_fft, kx, ky, f, c2)
 
 
 class OutputBaseSW1L(OutputBasePseudoSpectral):
@@ -125,6 +130,12 @@ class OutputBaseSW1L(OutputBasePseudoSpectral):
             ux_fft, uy_fft, eta_fft, kx, ky, self.sim.params.f, self.sim.params.c2
         )
 
+    def linear_eigenmodes_from_values(self, ux_fft, uy_fft, eta_fft, kx, ky):
+        """Compute the linear eigenmodes for arrays of wavenumbers."""
+        return linear_eigenmodes_from_values(
+            ux_fft, uy_fft, eta_fft, kx, ky, self.sim.params.f, self.sim.params.c2
+        )
+
     def omega_from_wavenumber(self, k):
         r"""Evaluates the dispersion relation and returns the linear frequency
 
@@ -1,7 +1,18 @@
 import h5py
 import numpy as np
 
-from fluidsim.base.output.increments import Increments
+from fluiddyn.util import mpi
+
+from fluidsim.base.output.increments import (
+    Increments,
+    compute_sums_products_increments_dim1,
+)
+
+# products of increments of (ux, uy, eta, Jx) for the structure functions
+# uL2JL, uT2JL, h2uL and uT2uL
+_indices_products = np.array(
+    [[0, 0, 3], [1, 1, 3], [2, 2, 0], [1, 1, 0]], dtype=np.int32
+)
 
 
 class IncrementsSW1L(Increments):
@@ -20,29 +31,29 @@ class IncrementsSW1L(Increments):
         super()._online_plot_saving(dict_results, key=key)
 
     def compute(self):
+        """compute the values at one time.
+
+        As for the pdfs, the increments are periodic over the dim 1. The
+        third order structure functions are computed in one sweep of the
+        fields and one MPI reduction.
+
+        """
         dict_results = super().compute()
 
         get_var = self.sim.state.get_var
         ux = get_var("ux")
-        uy = get_var("uy")
         eta = get_var("eta")
-        Jx = (1 + eta) * ux
-
-        S_uL2JL = np.empty([self.nrx])
-        S_uT2JL = np.empty([self.nrx])
-        S_c2h2uL = np.empty([self.nrx])
-        S_uT2uL = np.empty([self.nrx])
-
-        for irx, rx in enumerate(self.rxs):
-            inc_ux = self.oper.compute_increments_dim1(ux, rx)
-            inc_uy = self.oper.compute_increments_dim1(uy, rx)
-            inc_eta = self.oper.compute_increments_dim1(eta, rx)
-            inc_Jx = self.oper.compute_increments_dim1(Jx, rx)
-            inc_uy2 = inc_uy**2
-            S_uL2JL[irx] = np.mean(inc_ux**2 * inc_Jx)
-            S_uT2JL[irx] = np.mean(inc_uy2 * inc_Jx)
-            S_c2h2uL[irx] = self.params.c2 * np.mean(inc_eta**2 * inc_ux)
-            S_uT2uL[irx] = np.mean(inc_uy2 * inc_ux)
+        variables = np.array([ux, get_var("uy"), eta, (1 + eta) * ux])
+        rxs = np.ascontiguousarray(self.rxs, dtype=np.int32)
+
+        sums = compute_sums_products_increments_dim1(
+            variables, _indices_products, rxs
+        )
+        if mpi.nb_proc > 1:
+            mpi.comm.Allreduce(mpi.MPI.IN_PLACE, sums, op=mpi.MPI.SUM)
+        nb_points = self.oper.nx_seq * self.oper.ny_seq
+        S_uL2JL, S_uT2JL, S_h2uL, S_uT2uL = sums / nb_points
+        S_c2h2uL = self.params.c2 * S_h2uL
 
         dict_results["struc_func_uL2JL"] = S_uL2JL
         dict_results["struc_func_uT2JL"] = S_uT2JL
@@ -23,6 +23,28 @@ import numpy as np
 from fluiddyn.util.compat import cached_property
 from fluiddyn.util import mpi
 
+dyad_group = {
+    "GG": ["GG"],
+    "AG": ["GA", "AG"],
+    "aG": ["Ga", "aG"],
+    "AA": ["AA", "Aa", "aA", "aa"],
+}
+
+triad_group = {
+    "GGG": ["GGG"],
+    "AGG": ["AGG", "GAG", "GGA", "aGG", "GaG", "GGa"],
+    "GAAs": ["aaG", "aGa", "Gaa", "AAG", "AGA", "GAA"],
+    "GAAd": ["aAG", "AaG", "aGA", "AGa", "GaA", "GAa"],
+    "AAA": ["AAA", "aaa", "AAa", "AaA", "aAA", "aaA", "aAa", "Aaa"],
+}
+
+
+def _get_index_group(key, grouping):
+    for index, keys_group in enumerate(grouping.values()):
+        if key in keys_group:
+            return index
+    raise KeyError("Not sure which group " + key + " belongs to")
+
 
 class NormalModeBase:
     def __init__(self, output):
@@ -177,26 +199,31 @@ class NormalModeDecomposition(NormalModeBase):
                 "py_eta_fft": 2,
             }
 
-            r = row_index[key]
-            normal_mode_vec_fft = np.einsum(
-                "i...,i...->i...", self.qmat[r], self.bvec_fft
+            normal_mode_vec_fft = self._normalmodefft_from_row(
+                row_index[key], self.bvec_fft, key
             )
-            if "px" in key:
-                for r in range(3):
-                    normal_mode_vec_fft[r] = self.oper.pxffft_from_fft(
-                        normal_mode_vec_fft[r]
-                    )
-            elif "py" in key:
-                for r in range(3):
-                    normal_mode_vec_fft[r] = self.oper.pyffft_from_fft(
-                        normal_mode_vec_fft[r]
-                    )
-
             if "eta" in key:
-                normal_mode_vec_fft = normal_mode_vec_fft / self.params.c2**0.5
+                normal_mode_vec_fft /= self.params.c2**0.5
 
         return key_modes, normal_mode_vec_fft
 
+    @cached_property
+    def _ikx_iky(self):
+        return 1j * self.oper.KX, 1j * self.oper.KY
+
+    def _normalmodefft_from_row(self, row, bvec_fft, key):
+        """Apply one row of the Q matrix (for the 3 modes at once)
+
+        The derivatives ("px_" and "py_" keys) are computed in place.
+
+        """
+        normal_mode_vec_fft = self.qmat[row] * bvec_fft
+        if "px" in key:
+            normal_mode_vec_fft *= self._ikx_iky[0]
+        elif "py" in key:
+            normal_mode_vec_fft *= self._ikx_iky[1]
+        return normal_mode_vec_fft
+
     def normalmodephys_from_keyphys(self, key):
         ifft2 = self.oper.ifft2
         key_modes, normal_mode_vec_fft = self.normalmodefft_from_keyfft(
@@ -208,36 +235,28 @@ class NormalModeDecomposition(NormalModeBase):
 
         return key_modes, normal_mode_vec_phys
 
-    def _group_matrix_using_dict(self, key_matrix, value_matrix, grouping):
-        value_dict = dict.fromkeys(grouping, 0.0)
-        n1, n2 = key_matrix.shape
-        for i in range(n1):
-            for j in range(n2):
-                k1 = key_matrix[i, j]
-                k3 = None
-                for k2 in grouping.keys():
-                    if k1 in grouping[k2]:
-                        k3 = k2
-                        break
-
-                if k3 is None:
-                    raise KeyError(
-                        "Not sure which dyad group " + k1 + " belongs to"
-                    )
-
-                value_dict[k3] += value_matrix[i, j]
-
-        new_matrix = np.array([value_dict[k] for k in value_dict.keys()])
-        new_keys = np.array([list(value_dict)])
-        return new_keys, new_matrix
+    def _group_products(
+        self, key_modes_1, key_modes_2, values_1, values_2, grouping
+    ):
+        """Sum the products ``values_1[i] * values_2[j]`` by groups of keys
+
+        The matrix of the products (shape ``(n1, n2, nk0, nk1)``) is not
+        computed: the products are directly accumulated in the groups.
+
+        """
+        result = np.zeros(
+            (len(grouping),) + values_1.shape[1:],
+            dtype=np.result_type(values_1, values_2),
+        )
+        product = np.empty_like(result[0])
+        for i, key_1 in enumerate(key_modes_1.ravel()):
+            for j, key_2 in enumerate(key_modes_2.ravel()):
+                np.multiply(values_1[i], values_2[j], out=product)
+                result[_get_index_group(key_1 + key_2, grouping)] += product
+        new_keys = np.array([list(grouping)])
+        return new_keys, result
 
     def dyad_from_keyfft(self, conjugate=False, *keys_state_spect):
-        dyad_group = {
-            "GG": ["GG"],
-            "AG": ["GA", "AG"],
-            "aG": ["Ga", "aG"],
-            "AA": ["AA", "Aa", "aA", "aa"],
-        }
         k1, k2 = keys_state_spect
 
         normal_modes = dict()
@@ -248,26 +267,21 @@ class NormalModeDecomposition(NormalModeBase):
             key_modes, normal_modes[k1] = self.normalmodefft_from_keyfft(k1)
             normal_modes[k2] = normal_modes[k1]
 
-        key_modes_mat = np.char.add(key_modes.transpose(), key_modes)
         if conjugate:
             Ni = normal_modes[k1].conj()
-            Nj = normal_modes[k2]
         else:
             Ni = normal_modes[k1]
-            Nj = normal_modes[k2]
-        dyad_mat_fft = np.einsum("i...,j...->ij...", Ni, Nj)
-        del (normal_modes, Ni, Nj)
-        return self._group_matrix_using_dict(
-            key_modes_mat, dyad_mat_fft, dyad_group
-        )
+        Nj = normal_modes[k2]
+        return self._group_products(key_modes, key_modes, Ni, Nj, dyad_group)
 
     def dyad_from_keyphys(self, *keys_state_phys):
-        dyad_group = {
-            "GG": ["GG"],
-            "AG": ["GA", "AG"],
-            "aG": ["Ga", "aG"],
-            "AA": ["AA", "Aa", "aA", "aa"],
-        }
+        """Dyads computed in physical space (grouped and then transformed)
+
+        Since the Fourier transform and the dealiasing are linear, the
+        products are grouped in physical space so that only 4 transforms are
+        needed (instead of one per product).
+
+        """
         k1, k2 = keys_state_phys
 
         normal_modes = dict()
@@ -277,68 +291,44 @@ class NormalModeDecomposition(NormalModeBase):
         else:
             key_modes, normal_modes[k1] = self.normalmodephys_from_keyphys(k1)
             normal_modes[k2] = normal_modes[k1]
-        key_modes_mat = np.char.add(key_modes.transpose(), key_modes)
-        dyad_mat_phys = np.einsum(
-            "i...,j...->ij...", normal_modes[k1], normal_modes[k2]
+        key_modes_dyad, dyads_phys = self._group_products(
+            key_modes, key_modes, normal_modes[k1], normal_modes[k2], dyad_group
         )
         del normal_modes
         fft2 = self.oper.fft2
-        dyad_mat_fft = np.array(
-            [[fft2(dyad_mat_phys[i, j]) for j in range(3)] for i in range(3)]
-        )
-
-        for i in range(3):
-            for j in range(3):
-                self.oper.dealiasing(dyad_mat_fft[i, j])
-
-        del dyad_mat_phys
-        return self._group_matrix_using_dict(
-            key_modes_mat, dyad_mat_fft, dyad_group
-        )
+        dyads_fft = np.array([fft2(dyad_phys) for dyad_phys in dyads_phys])
+        del dyads_phys
+        for dyad_fft in dyads_fft:
+            self.oper.dealiasing(dyad_fft)
+        return key_modes_dyad, dyads_fft
 
     def triad_from_keyfft(self, *keys_state_spect):
-        triad_group = {
-            "GGG": ["GGG"],
-            "AGG": ["AGG", "GAG", "GGA", "aGG", "GaG", "GGa"],
-            "GAAs": ["aaG", "aGa", "Gaa", "AAG", "AGA", "GAA"],
-            "GAAd": ["aAG", "AaG", "aGA", "AGa", "GaA", "GAa"],
-            "AAA": ["AAA", "aaa", "AAa", "AaA", "aAA", "aaA", "aAa", "Aaa"],
-        }
         k1, k2, k3 = keys_state_spect
 
         key_modes_1, normal_modes_1 = self.normalmodefft_from_keyfft(k1)
         key_modes_23, normal_modes_23 = self.dyad_from_keyfft(False, k2, k3)
 
-        key_modes_mat = np.char.add(key_modes_1.transpose(), key_modes_23)
-        triad_mat = np.einsum(
-            "i...,j...->ij...", normal_modes_1.conj(), normal_modes_23
-        )
-
-        return self._group_matrix_using_dict(
-            key_modes_mat, triad_mat, triad_group
+        return self._group_products(
+            key_modes_1,
+            key_modes_23,
+            normal_modes_1.conj(),
+            normal_modes_23,
+            triad_group,
         )
 
     def triad_from_keyfftphys(self, key_state_spect, *keys_state_phys):
-        triad_group = {
-            "GGG": ["GGG"],
-            "AGG": ["AGG", "GAG", "GGA", "aGG", "GaG", "GGa"],
-            "GAAs": ["aaG", "aGa", "Gaa", "AAG", "AGA", "GAA"],
-            "GAAd": ["aAG", "AaG", "aGA", "AGa", "GaA", "GAa"],
-            "AAA": ["AAA", "aaa", "AAa", "AaA", "aAA", "aaA", "aAa", "Aaa"],
-        }
         k1 = key_state_spect
         k2, k3 = keys_state_phys
 
         key_modes_1, normal_modes_1 = self.normalmodefft_from_keyfft(k1)
         key_modes_23, normal_modes_23 = self.dyad_from_keyphys(k2, k3)
 
-        key_modes_mat = np.char.add(key_modes_1.transpose(), key_modes_23)
-        triad_mat = np.einsum(
-            "i...,j...->ij...", normal_modes_1.conj(), normal_modes_23
-        )
-
-        return self._group_matrix_using_dict(
-            key_modes_mat, triad_mat, triad_group
+        return self._group_products(
+            key_modes_1,
+            key_modes_23,
+            normal_modes_1.conj(),
+            normal_modes_23,
+            triad_group,
         )
 
 
@@ -378,21 +368,9 @@ class NormalModeDecompositionModified(NormalModeDecomposition):
             }
 
             key_modes = np.array([["G", "A", "a"]])
-            r = row_index[key]
-            normal_mode_vec_fft = np.einsum(
-                "i...,i...->i...", self.qmat[r], self.bvecrot_fft
+            normal_mode_vec_fft = self._normalmodefft_from_row(
+                row_index[key], self.bvecrot_fft, key
             )
-            if "px" in key:
-                for r in range(3):
-                    normal_mode_vec_fft[r] = self.oper.pxffft_from_fft(
-                        normal_mode_vec_fft[r]
-                    )
-            elif "py" in key:
-                for r in range(3):
-                    normal_mode_vec_fft[r] = self.oper.pyffft_from_fft(
-                        normal_mode_vec_fft[r]
-                    )
-
             return key_modes, normal_mode_vec_fft
 
         else:
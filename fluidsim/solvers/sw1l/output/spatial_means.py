@@ -1,11 +1,13 @@
 import os
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 from fluidsim.base.output.spatial_means import SpatialMeansJSON, inner_prod
 from ._old_spatial_means import load_txt as _old_load_txt
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SpatialMeansMSW1L(SpatialMeansJSON):
@@ -1,12 +1,14 @@
 from typing import List, Optional
 import functools
 import h5py
-import matplotlib as mpl
 import numpy as np
 
 from fluiddyn.util import mpi
 from fluidsim.base.output.spectra import Spectra
 from .normal_mode import NormalModeBase
+from fluidsim.util.lazy import lazy_import
+
+mpl = lazy_import("matplotlib")
 
 
 class SpectraSW1L(Spectra):
@@ -149,7 +151,7 @@ class SpectraSW1L(Spectra):
         delta_t: float = 2,
         coef_compensate: float = 3,
         coef_norm: Optional[np.ndarray] = None,
-        ax: Optional[mpl.axes.Axes] = None,
+        ax: Optional["mpl.axes.Axes"] = None,
         help_lines: bool = True,
     ):
 
@@ -258,7 +260,7 @@ class SpectraSW1L(Spectra):
         keys: List[str] = ["Etot", "EK", "EA", "EKr", "EKd"],
         colors: List[str] = ["k", "r", "b", "r--", "r:"],
         kh_norm: float = 1,
-        ax: Optional[mpl.axes.Axes] = None,
+        ax: Optional["mpl.axes.Axes"] = None,
         help_lines: bool = True,
     ):
 
@@ -243,7 +243,7 @@ class Simul(SimulBasePseudoSpectral):
         oper.dealiasing(tendencies_fft)
 
         if self.params.forcing.enable:
-            tendencies_fft += self.forcing.get_forcing()
+            self.forcing.add_forcing_to(tendencies_fft)
 
         return tendencies_fft
 
@@ -1,10 +1,12 @@
 import unittest
 
 import matplotlib.pyplot as plt
+import numpy as np
 from numpy.testing import assert_array_almost_equal
 
 import fluiddyn.util.mpi as mpi
 from fluidsim.util.testing import (
+    TestSimul,
     TestSimulConserveOutput,
     classproperty,
     skip_if_no_fluidfft,
@@ -65,7 +67,33 @@ class TestSimulSW1L(TestSimulConserveOutput):
 
     def test_increments(self):
         self.plot("increments")
-        self.sim.output.increments.plot_Kolmo()
+        increments = self.sim.output.increments
+        increments.plot_Kolmo()
+
+        results = increments.compute()
+        if mpi.nb_proc > 1:
+            return
+        # same periodic increments as for the pdfs
+        state = self.sim.state
+        ux = state.get_var("ux")
+        uy = state.get_var("uy")
+        eta = state.get_var("eta")
+        Jx = (1 + eta) * ux
+        for irx, rx in enumerate(increments.rxs):
+
+            def inc(var):
+                return np.roll(var, -rx, axis=1) - var
+
+            assert np.isclose(
+                results["struc_func_uL2JL"][irx], np.mean(inc(ux) ** 2 * inc(Jx))
+            )
+            assert np.isclose(
+                results["struc_func_c2h2uL"][irx],
+                self.sim.params.c2 * np.mean(inc(eta) ** 2 * inc(ux)),
+            )
+            assert np.isclose(
+                results["struc_func_uT2uL"][irx], np.mean(inc(uy) ** 2 * inc(ux))
+            )
 
     def test_spectra(self):
         """Test spectra loading and plotting.
@@ -202,5 +230,45 @@ class TestSimulSW1L(TestSimulConserveOutput):
             var_computed = self.sim.state.compute(key)
 
 
+@skip_if_no_fluidfft
+class TestRollbackSW1L(TestSimul):
+    @classproperty
+    def Simul(cls):
+        from fluidsim.solvers.sw1l.solver import Simul
+
+        return Simul
+
+    @classmethod
+    def init_params(cls):
+        super().init_params()
+        params = cls.params
+        params.output.HAS_TO_SAVE = False
+        params.oper.nx = params.oper.ny = 16
+        params.init_fields.type = "noise"
+        params.time_stepping.USE_CFL = True
+        params.time_stepping.it_end = 5
+        params.time_stepping.rollback.nb_snapshots = 1
+        params.time_stepping.rollback.nb_steps_snapshots = 2
+
+    def test_rollback(self):
+        sim = self.sim
+        time_stepping = sim.time_stepping
+        time_stepping.main_loop()
+        # the time increment is limited by the gravity waves
+        deltat_wave = time_stepping._deltat_wave
+        assert time_stepping.deltat == deltat_wave
+
+        sim.state.state_spect[0, 1, 1] = np.nan
+        sim.params.time_stepping.it_end = 8
+        time_stepping.main_loop()
+
+        assert len(time_stepping.rollback_events) == 1
+        assert time_stepping.rollback_events[0]["it"] == 4
+        assert time_stepping._deltat_wave == deltat_wave / 2
+        assert time_stepping.deltat == deltat_wave / 2
+        assert time_stepping.rollback_events[0]["deltat"] == deltat_wave / 2
+        assert not np.isnan(np.sum(sim.state.state_spect))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -11,6 +11,7 @@ Provides:
    console
    scripts
    mini_oper_modif_resol
+   lazy
 
 .. autofunction:: load_sim_for_plot
 
@@ -34,30 +35,12 @@ Provides:
 
 .. autofunction:: get_last_estimated_remaining_duration
 
+.. autofunction:: load_records_stdout
+
 .. autofunction:: open_patient
 
 """
 
-from .util import (
-    load_sim_for_plot,
-    load_state_phys_file,
-    load_for_restart,
-    load_params_simul,
-    times_start_last_from_path,
-    ensure_radians,
-    get_last_estimated_remaining_duration,
-    get_mean_values_from_path,
-    get_dataframe_from_paths,
-    get_memory_usage,
-    available_solver_keys,
-    import_module_solver_from_key,
-    import_simul_class_from_key,
-    modif_resolution_from_dir,
-    modif_resolution_all_dir,
-    modif_resolution_from_dir_memory_efficient,
-    open_patient,
-)
-
 __all__ = [
     "load_sim_for_plot",
     "load_state_phys_file",
@@ -66,6 +49,7 @@ __all__ = [
     "times_start_last_from_path",
     "ensure_radians",
     "get_last_estimated_remaining_duration",
+    "load_records_stdout",
     "get_mean_values_from_path",
     "get_dataframe_from_paths",
     "get_memory_usage",
@@ -78,5 +62,16 @@ __all__ = [
     "open_patient",
 ]
 
-# deprecated
-from .util import times_start_end_from_path
+
+def __getattr__(name):
+    # lazy import of fluidsim.util.util (see fluidsim.util.lazy)
+    # times_start_end_from_path is deprecated
+    if name in __all__ or name == "times_start_end_from_path":
+        from . import util
+
+        return getattr(util, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
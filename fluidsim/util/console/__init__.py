@@ -12,5 +12,7 @@ Provides:
    util
    bench
    bench_analysis
+   microbench
+   capacity
 
 """
@@ -4,7 +4,7 @@
 """
 import argparse
 from fluidsim import __version__, get_local_version
-from . import bench, bench_analysis, profile
+from . import bench, bench_analysis, capacity, microbench, profile
 from .util import ConsoleError
 
 
@@ -52,7 +52,7 @@ def get_parser():
     subparsers = parser.add_subparsers(
         help='see "fluidsim {subcommand} -h" for more details'
     )
-    for module in (bench, bench_analysis, profile):
+    for module in (bench, bench_analysis, capacity, microbench, profile):
         add_subparser(subparsers, module, module.description)
 
     parser_version = subparsers.add_parser(
@@ -100,5 +100,13 @@ def run_bench_analysis():
     _run_from_module(bench_analysis)
 
 
+def run_microbench():
+    _run_from_module(microbench)
+
+
+def run_capacity():
+    _run_from_module(capacity)
+
+
 if __name__ == "__main__":
     run()
@@ -8,10 +8,11 @@ from collections import OrderedDict
 
 import numpy as np
 
-from fluiddyn.util import mpi, info
+from fluiddyn.util import mpi
 from fluiddyn.io import stdout_redirected
 
 from fluidsim import _is_testing
+from fluidsim.util.lazy import lazy_import
 
 from ..util import import_module_solver_from_key
 from .util import (
@@ -24,6 +25,8 @@ from .util import (
     ConsoleError,
 )
 
+# fluiddyn.util.info imports numpy.distutils (slow)
+info = lazy_import("fluiddyn.util.info")
 
 path_results = "/tmp/fluidsim_bench"
 old_print = print
@@ -7,12 +7,14 @@ from glob import glob
 import json
 import sys
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
 
 from .bench import path_results, parse_args_dim, init_parser_base, ConsoleError
+from fluidsim.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+ticker = lazy_import("matplotlib.ticker")
 
 description = "Plot results of benchmarks"
 
@@ -203,7 +205,7 @@ def plot_scaling(
                 label="{}, {}".format(name.replace("fluidfft.", ""), name_dir),
             )
 
-    ax0.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax0.xaxis.set_major_locator(ticker.MaxNLocator(integer=True))
     if type_plot == "strong":
         theoretical = [speedup.index.min(), speedup.index.max()]
         # plot_once(ax0, theoretical, theoretical, 'linear')
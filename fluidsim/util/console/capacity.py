@@ -0,0 +1,809 @@
+"""Plan the resources of a simulation (:mod:`fluidsim.util.console.capacity`)
+===========================================================================
+
+Estimate, before submitting a job, the memory needed by each MPI process and
+the time per time step of a simulation, and suggest numbers of processes and
+FFT libraries::
+
+  fluidsim capacity 1024 4096 4096 -s ns3d.strat --mem-per-proc 3.5
+  fluidsim-capacity --params path/to/a/run --nb-proc 512 1024 2048
+
+No array of the size of the target simulation is allocated:
+
+- The local shapes of the arrays are computed from the global shape, the
+  number of processes and a model of the decomposition of each FFT class of
+  fluidfft (slab or pencil, see :func:`compute_shapes_loc`). For the pencil
+  decompositions, the process grid is only approximately the one chosen by
+  the libraries.
+
+- The allocation plan is measured on 2 small "proxy" simulations created with
+  the same parameters (solver, time scheme, forcing, outputs, ...) but a
+  reduced resolution (:func:`measure_allocations`). The arrays reachable from
+  the simulation object whose shape ends with the local shape of the arrays
+  in real or spectral space (for example ``state.state_spect`` or
+  ``time_stepping._state_spect_tmp``) are counted in number of fields and
+  scaled to the target local shapes. The transient memory (peak of the memory
+  allocated by numpy during the initialization and one time step) is
+  extrapolated linearly with the number of spectral modes.
+
+- The time per time step is extrapolated with a ``N log N`` law and a perfect
+  parallel scaling from the results of :mod:`fluidsim-microbench
+  <fluidsim.util.console.microbench>` (benchmarks ``time_schemes.*``) when
+  they are available or, otherwise, from the largest proxy simulation. The
+  communications are not taken into account so that the predicted times are
+  lower bounds for large numbers of processes.
+
+The memory used by the FFT libraries (plans and internal buffers) and by
+compiled extensions is not counted.
+
+.. autofunction:: compute_shapes_loc
+
+.. autofunction:: measure_allocations
+
+.. autofunction:: plan_capacity
+
+.. autofunction:: print_plan
+
+"""
+
+import gc
+import os
+import re
+import tracemalloc
+from collections import deque
+from copy import deepcopy
+from importlib.util import find_spec
+from math import log2, prod
+from pathlib import Path
+from shutil import rmtree
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+import numpy as np
+
+from fluiddyn.util import mpi
+from fluiddyn.util.paramcontainer import ParamContainer
+from fluiddyn.io import stdout_redirected
+
+from . import microbench
+from ..util import import_module_solver_from_key
+from .util import (
+    ConsoleError,
+    init_parser_base,
+    modif_params2d,
+    modif_params3d,
+    parse_args_dim,
+)
+
+
+description = (
+    "Estimate the memory per process and the time per time step of a "
+    "simulation"
+)
+
+# ordered by preference (slab decompositions first)
+types_fft_mpi = {
+    2: ("fft2d.mpi_with_fftwmpi2d", "fft2d.mpi_with_fftw1d"),
+    3: (
+        "fft3d.mpi_with_fftwmpi3d",
+        "fft3d.mpi_with_fftw1d",
+        "fft3d.mpi_with_mpi4pyfft_slab",
+        "fft3d.mpi_with_p3dfft",
+        "fft3d.mpi_with_pfft",
+        "fft3d.mpi_with_mpi4pyfft",
+    ),
+}
+
+sizes_proxy = (16, 24)
+
+
+def _compute_size_block(size, nb_parts):
+    """Largest local size of a block distribution (ValueError if a part is
+    empty)"""
+    size_block = -(-size // nb_parts)
+    if size_block * (nb_parts - 1) >= size:
+        raise ValueError(f"Cannot distribute {size} points over {nb_parts}")
+    return size_block
+
+
+def _compute_size_balanced(size, nb_parts):
+    """Largest local size of a balanced distribution (sizes differing by at
+    most 1)"""
+    if nb_parts > size:
+        raise ValueError(f"Cannot distribute {size} points over {nb_parts}")
+    return -(-size // nb_parts)
+
+
+def _compute_size_exact(size, nb_parts):
+    if size % nb_parts:
+        raise ValueError(f"{size} is not divisible by {nb_parts}")
+    return size // nb_parts
+
+
+def _create_grid_procs(nb_proc):
+    """2d grid of processes (as balanced as possible, like MPI_Dims_create)"""
+    nb_proc1 = max(
+        divisor
+        for divisor in range(1, int(nb_proc**0.5) + 1)
+        if nb_proc % divisor == 0
+    )
+    return nb_proc // nb_proc1, nb_proc1
+
+
+def compute_shapes_loc(shapeX_seq, nb_proc, type_fft="sequential"):
+    """Compute the local shapes of the arrays of the most loaded process
+
+    Parameters
+    ----------
+
+    shapeX_seq : tuple
+
+      Global shape in real space, i.e. ``(ny, nx)`` or ``(nz, ny, nx)``.
+
+    nb_proc : int
+
+    type_fft : str
+
+      "sequential" or one of the MPI FFT classes of fluidfft (for example
+      "fft3d.mpi_with_fftwmpi3d").
+
+    Returns
+    -------
+
+    shapeX_loc : tuple
+
+    shapeK_loc : tuple
+
+    Raises
+    ------
+
+    ValueError
+
+      If the decomposition is not possible (or if a process would have no
+      data).
+
+    """
+    block = _compute_size_block
+    if type_fft == "sequential":
+        if nb_proc != 1:
+            raise ValueError("Sequential FFT and nb_proc > 1")
+        *shape, nx = shapeX_seq
+        return tuple(shapeX_seq), (*shape, nx // 2 + 1)
+
+    if len(shapeX_seq) == 2:
+        n0, n1 = shapeX_seq
+        if type_fft == "fft2d.mpi_with_fftwmpi2d":
+            return (block(n0, nb_proc), n1), (block(n1 // 2 + 1, nb_proc), n0)
+        elif type_fft == "fft2d.mpi_with_fftw1d":
+            exact = _compute_size_exact
+            return (exact(n0, nb_proc), n1), (exact(n1 // 2, nb_proc), n0)
+        raise ValueError(f"Unknown 2d FFT class {type_fft}")
+
+    n0, n1, n2 = shapeX_seq
+    nk2 = n2 // 2 + 1
+    if type_fft == "fft3d.mpi_with_fftwmpi3d":
+        # transposed output
+        return (block(n0, nb_proc), n1, n2), (block(n1, nb_proc), n0, nk2)
+    elif type_fft == "fft3d.mpi_with_fftw1d":
+        exact = _compute_size_exact
+        return (exact(n0, nb_proc), n1, n2), (exact(n2 // 2, nb_proc), n1, n0)
+
+    # mpi4py-fft, p3dfft and pfft use balanced distributions
+    balanced = _compute_size_balanced
+    if type_fft == "fft3d.mpi_with_mpi4pyfft_slab":
+        return (
+            (balanced(n0, nb_proc), n1, n2),
+            (n0, balanced(n1, nb_proc), nk2),
+        )
+    elif type_fft in (
+        "fft3d.mpi_with_p3dfft",
+        "fft3d.mpi_with_pfft",
+        "fft3d.mpi_with_mpi4pyfft",
+    ):
+        nb_proc0, nb_proc1 = _create_grid_procs(nb_proc)
+        shapeX_loc = (balanced(n0, nb_proc0), balanced(n1, nb_proc1), n2)
+        if type_fft.endswith("p3dfft"):
+            shapeK_loc = (balanced(nk2, nb_proc0), balanced(n1, nb_proc1), n0)
+        elif type_fft.endswith("pfft"):
+            shapeK_loc = (balanced(n1, nb_proc0), balanced(nk2, nb_proc1), n0)
+        else:
+            shapeK_loc = (n0, balanced(n1, nb_proc0), balanced(nk2, nb_proc1))
+        return shapeX_loc, shapeK_loc
+    raise ValueError(f"Unknown 3d FFT class {type_fft}")
+
+
+def _get_keys_shape(params):
+    if hasattr(params.oper, "nz"):
+        return ("nz", "ny", "nx")
+    return ("ny", "nx")
+
+
+def _create_params_proxy(params, size):
+    """Parameters of a small simulation with the same allocations"""
+    params = deepcopy(params)
+    keys = _get_keys_shape(params)
+    coef = size / max(params.oper[key] for key in keys)
+    for key in keys:
+        params.oper[key] = max(4, 2 * round(coef * params.oper[key] / 2))
+
+    params.oper.type_fft = "default"
+    if hasattr(params.oper, "type_fft2d"):
+        params.oper.type_fft2d = "sequential"
+    if "noise" in params.init_fields.available_types:
+        params.init_fields.type = "noise"
+    params.NEW_DIR_RESULTS = True
+    params.short_name_type_run = "capacity_proxy"
+    params.output.ONLINE_PLOT_OK = False
+    params.time_stepping.USE_T_END = False
+    params.time_stepping.it_end = 1
+    params.time_stepping.max_elapsed = None
+    return params
+
+
+def _iter_arrays(sim):
+    """Iterate over the arrays reachable from a simulation object
+
+    Yield ``(path, array)`` (breadth-first, so the path is one of the
+    shortest).
+
+    """
+    ids_seen = set()
+    queue = deque((key, value) for key, value in vars(sim).items())
+    while queue:
+        path, obj = queue.popleft()
+        if id(obj) in ids_seen:
+            continue
+        ids_seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            yield path, obj
+        elif isinstance(obj, dict):
+            queue.extend(
+                (f"{path}[{key!r}]", value) for key, value in obj.items()
+            )
+        elif isinstance(obj, (list, tuple)):
+            queue.extend(
+                (f"{path}[{index}]", value) for index, value in enumerate(obj)
+            )
+        elif (
+            hasattr(obj, "__dict__")
+            and not isinstance(
+                obj,
+                (
+                    ParamContainer,
+                    type,
+                    ModuleType,
+                    FunctionType,
+                    MethodType,
+                    BuiltinFunctionType,
+                ),
+            )
+            and type(obj).__module__.startswith(
+                ("fluidsim", "fluidfft", "fluiddyn")
+            )
+        ):
+            queue.extend(
+                (f"{path}.{key}", value) for key, value in vars(obj).items()
+            )
+
+
+def _get_root_array(arr):
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr
+
+
+def _classify_array(arr, shapes):
+    """Kind of an array ("X", "K" or None) and its number of fields"""
+    for kind, shape in shapes.items():
+        if arr.ndim >= len(shape) and arr.shape[arr.ndim - len(shape) :] == shape:
+            return kind, arr.size // prod(shape)
+    return None, 0
+
+
+def _measure_proxy(Simul, params):
+    """Inventory of the arrays and memory peak of a proxy simulation"""
+    gc.collect()
+    tracemalloc.start()
+    sim = None
+    try:
+        with stdout_redirected():
+            sim = Simul(params)
+            sim.time_stepping.start()
+        memory_current, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if sim is not None and sim.output._has_to_save:
+            rmtree(sim.output.path_run, ignore_errors=True)
+
+    oper = sim.oper
+    shapes = {
+        "K": tuple(int(n) for n in oper.shapeK_loc),
+        "X": tuple(int(n) for n in oper.shapeX_loc),
+    }
+
+    arrays_per_root = {}
+    for path, arr in _iter_arrays(sim):
+        root = _get_root_array(arr)
+        kind, nb_fields = _classify_array(arr, shapes)
+        try:
+            path_old, arr_old, kind_old, _ = arrays_per_root[id(root)]
+        except KeyError:
+            pass
+        else:
+            if (kind_old is not None and kind is None) or (
+                (kind_old is None) == (kind is None)
+                and arr_old.nbytes >= arr.nbytes
+            ):
+                continue
+        arrays_per_root[id(root)] = (path, arr, kind, nb_fields)
+
+    fields = {}
+    others = {}
+    memory_arrays = 0
+    for path, arr, kind, nb_fields in arrays_per_root.values():
+        memory_arrays += arr.nbytes
+        if kind is None:
+            others[path] = arr.nbytes
+        else:
+            fields[path] = (kind, arr.dtype.itemsize, nb_fields)
+
+    time_step = microbench.time_func(
+        sim.time_stepping.one_time_step_computation, repeat=3, min_time=0.02
+    )["min"]
+
+    return {
+        "shapeX_seq": tuple(int(n) for n in oper.shapeX_seq),
+        "shapes": shapes,
+        "fields": fields,
+        "others": others,
+        "transient": memory_peak - memory_current,
+        "not_listed": max(0, memory_current - memory_arrays),
+        "time_step": time_step,
+    }
+
+
+def measure_allocations(params, Simul, sizes=sizes_proxy):
+    """Measure the allocation plan of a simulation on small proxy simulations
+
+    Parameters
+    ----------
+
+    params : ParamContainer
+
+      Parameters of the target simulation (not modified).
+
+    Simul : type
+
+      Simulation class.
+
+    sizes : tuple of 2 int
+
+      Number of points in the largest direction of the 2 proxy simulations.
+
+    Returns
+    -------
+
+    allocations : dict
+
+      With the keys
+
+      - "fields": ``{path: (kind, itemsize, nb_fields)}`` for the arrays of
+        the size of fields (kind "X" for real space and "K" for spectral
+        space),
+
+      - "others": ``{path: nbytes}`` for the other arrays (not scaled),
+
+      - "transient" and "not_listed": ``(bytes_per_mode, constant)``, linear
+        models (as functions of the number of spectral modes per process) of
+        the transient memory and of the memory allocated by numpy but not
+        reachable from the simulation object,
+
+      - "time_step": ``(time, nb_points)`` measured on the largest proxy,
+
+      - "types_time_scheme", "HAS_TO_SAVE" and "shapes_proxy".
+
+    """
+    if mpi.nb_proc > 1:
+        raise ValueError("The allocations have to be measured sequentially")
+
+    results = [
+        _measure_proxy(Simul, _create_params_proxy(params, size))
+        for size in sizes
+    ]
+    result0, result1 = results
+    nb_modes0, nb_modes1 = (prod(result["shapes"]["K"]) for result in results)
+
+    def fit(key):
+        slope = (result1[key] - result0[key]) / (nb_modes1 - nb_modes0)
+        slope = max(0.0, slope)
+        return slope, max(0.0, result1[key] - slope * nb_modes1)
+
+    params_ts = params.time_stepping
+    return {
+        "fields": result1["fields"],
+        "others": result1["others"],
+        "transient": fit("transient"),
+        "not_listed": fit("not_listed"),
+        "time_step": (result1["time_step"], prod(result1["shapeX_seq"])),
+        "type_time_scheme": getattr(params_ts, "type_time_scheme", None),
+        "HAS_TO_SAVE": bool(params.output.HAS_TO_SAVE),
+        "shapes_proxy": [result["shapeX_seq"] for result in results],
+    }
+
+
+def compute_memory_loc(allocations, shapeX_loc, shapeK_loc):
+    """Memory (in bytes) needed by one process for some local shapes
+
+    Returns a dict ``{name: nbytes}``.
+
+    """
+    sizes = {"X": prod(shapeX_loc), "K": prod(shapeK_loc)}
+    memory = {
+        path: nb_fields * itemsize * sizes[kind]
+        for path, (kind, itemsize, nb_fields) in allocations["fields"].items()
+    }
+    memory["(other arrays)"] = sum(allocations["others"].values())
+    for key in ("not_listed", "transient"):
+        slope, constant = allocations[key]
+        memory[f"({key.replace('_', ' ')})"] = slope * sizes["K"] + constant
+    return memory
+
+
+def _get_reference_time_step(key_solver, type_time_scheme, path_microbench):
+    """Reference time step from the results of fluidsim-microbench"""
+    if not key_solver.startswith("ns3d") or not os.path.exists(path_microbench):
+        return None
+    pattern = re.compile(
+        re.escape(f"time_schemes.{type_time_scheme}") + r"\[n=(\d+)\]$"
+    )
+    for results in reversed(microbench.load_history(path_microbench)):
+        benchmarks = results["benchmarks"]
+        sizes = [
+            int(match.group(1))
+            for match in map(pattern.match, benchmarks)
+            if match is not None
+        ]
+        if not sizes:
+            continue
+        n = max(sizes)
+        time = benchmarks[f"time_schemes.{type_time_scheme}[n={n}]"]["min"]
+        if key_solver != "ns3d":
+            # microbench only runs the time schemes for ns3d
+            try:
+                time *= (
+                    benchmarks[
+                        f"tendencies.{key_solver}.tendencies_nonlin[n={n}]"
+                    ]["min"]
+                    / benchmarks[f"tendencies.ns3d.tendencies_nonlin[n={n}]"][
+                        "min"
+                    ]
+                )
+            except KeyError:
+                continue
+        return {
+            "time": time,
+            "nb_points": n**3,
+            "nb_proc": results["nb_proc"],
+            "source": (
+                f"microbench {results['commit']} ({results['hostname']}, "
+                f"n={n}, np={results['nb_proc']})"
+            ),
+        }
+    return None
+
+
+def _predict_time_step(reference, nb_points, nb_proc):
+    """N log N law with a perfect parallel scaling"""
+    nb_points_ref = reference["nb_points"]
+    return (
+        reference["time"]
+        * reference["nb_proc"]
+        / nb_proc
+        * (nb_points * log2(nb_points))
+        / (nb_points_ref * log2(nb_points_ref))
+    )
+
+
+def _is_available(type_fft):
+    """Check (without importing them) that the modules needed by a FFT class
+    are installed"""
+    modules = ["fluidfft." + type_fft]
+    if "mpi4pyfft" in type_fft:
+        modules.append("mpi4py_fft")
+    try:
+        return all(find_spec(module) is not None for module in modules)
+    except ImportError:
+        return False
+
+
+def plan_capacity(
+    params,
+    Simul,
+    nb_procs=None,
+    mem_per_proc=None,
+    types_fft=None,
+    path_microbench=None,
+    allocations=None,
+):
+    """Compute the resources needed by a simulation for some numbers of
+    processes
+
+    Parameters
+    ----------
+
+    params : ParamContainer
+
+      Parameters of the target simulation.
+
+    Simul : type
+
+      Simulation class.
+
+    nb_procs : sequence of int, optional
+
+      By default, the powers of 2 for which a decomposition is possible.
+
+    mem_per_proc : float, optional
+
+      Memory available per process (in bytes), used to choose the recommended
+      configuration.
+
+    types_fft : sequence of str, optional
+
+      MPI FFT classes considered (by default all the classes of fluidfft for
+      this dimension, the classes that can be imported being preferred).
+
+    path_microbench : str, optional
+
+      Directory of the results of fluidsim-microbench.
+
+    allocations : dict, optional
+
+      Result of :func:`measure_allocations` (computed if not given).
+
+    Returns
+    -------
+
+    plan : dict
+
+      With the keys "allocations", "shapeX_seq", "reference_time_step",
+      "configurations" (one dict per possible pair ``(nb_proc, type_fft)``)
+      and "recommended" (one of the configurations or None).
+
+    """
+    if allocations is None:
+        allocations = measure_allocations(params, Simul)
+    if path_microbench is None:
+        path_microbench = microbench.path_results
+
+    shapeX_seq = tuple(params.oper[key] for key in _get_keys_shape(params))
+    nb_points = prod(shapeX_seq)
+    dim = len(shapeX_seq)
+    if types_fft is None:
+        types_fft = types_fft_mpi[dim]
+    if nb_procs is None:
+        nb_procs = [2**exponent for exponent in range(21)]
+
+    reference = _get_reference_time_step(
+        Simul.InfoSolver().short_name,
+        allocations["type_time_scheme"],
+        path_microbench,
+    )
+    if reference is None:
+        time, nb_points_proxy = allocations["time_step"]
+        reference = {
+            "time": time,
+            "nb_points": nb_points_proxy,
+            "nb_proc": 1,
+            "source": f"proxy simulation (np=1, {nb_points_proxy} points)",
+        }
+
+    configurations = []
+    for nb_proc in nb_procs:
+        candidates = ["sequential"] if nb_proc == 1 else types_fft
+        candidates = sorted(
+            candidates,
+            key=lambda type_fft: nb_proc > 1 and not _is_available(type_fft),
+        )
+        for type_fft in candidates:
+            try:
+                shapeX_loc, shapeK_loc = compute_shapes_loc(
+                    shapeX_seq, nb_proc, type_fft
+                )
+            except ValueError:
+                continue
+            memory = compute_memory_loc(allocations, shapeX_loc, shapeK_loc)
+            if nb_proc > 1 and allocations["HAS_TO_SAVE"]:
+                # the state is gathered on process 0 (without parallel h5py)
+                memory_rank0_extra = 8 * nb_points
+            else:
+                memory_rank0_extra = 0
+            configurations.append(
+                {
+                    "nb_proc": nb_proc,
+                    "type_fft": type_fft,
+                    "is_available": nb_proc == 1 or _is_available(type_fft),
+                    "shapeX_loc": shapeX_loc,
+                    "shapeK_loc": shapeK_loc,
+                    "memory": sum(memory.values()),
+                    "memory_rank0_extra": memory_rank0_extra,
+                    "time_step": _predict_time_step(
+                        reference, nb_points, nb_proc
+                    ),
+                }
+            )
+
+    recommended = None
+    if mem_per_proc is not None:
+        fitting = [
+            configuration
+            for configuration in configurations
+            if configuration["memory"] + configuration["memory_rank0_extra"]
+            <= mem_per_proc
+        ]
+        # the FFT classes available here are preferred
+        fitting.sort(key=lambda configuration: not configuration["is_available"])
+        if fitting:
+            recommended = fitting[0]
+
+    return {
+        "allocations": allocations,
+        "shapeX_seq": shapeX_seq,
+        "reference_time_step": reference,
+        "configurations": configurations,
+        "recommended": recommended,
+    }
+
+
+def _format_bytes(nbytes):
+    for unit in ("B", "kB", "MB", "GB"):
+        if abs(nbytes) < 1000:
+            return f"{nbytes:.3g} {unit}"
+        nbytes /= 1000
+    return f"{nbytes:.3g} TB"
+
+
+def print_plan(plan, all_types_fft=False):
+    """Print the result of :func:`plan_capacity`"""
+    allocations = plan["allocations"]
+    configurations = plan["configurations"]
+    recommended = plan["recommended"]
+    print(f"shapeX_seq = {plan['shapeX_seq']}")
+    print(f"proxy simulations: shapeX_seq = {allocations['shapes_proxy']}")
+    print(f"time per time step from {plan['reference_time_step']['source']}")
+
+    print(
+        f"\n{'nb_proc':>8s}  {'type_fft':38s}{'shapeK_loc':>22s}"
+        f"{'memory/proc':>13s}{'+ proc 0':>10s}{'time step':>11s}"
+    )
+    nb_proc_printed = None
+    for configuration in configurations:
+        nb_proc = configuration["nb_proc"]
+        if nb_proc == nb_proc_printed and not all_types_fft:
+            continue
+        nb_proc_printed = nb_proc
+        type_fft = configuration["type_fft"]
+        if not configuration["is_available"]:
+            type_fft += " (n/a)"
+        print(
+            f"{nb_proc:8d}  {type_fft:38s}"
+            f"{str(configuration['shapeK_loc']):>22s}"
+            f"{_format_bytes(configuration['memory']):>13s}"
+            f"{_format_bytes(configuration['memory_rank0_extra']):>10s}"
+            f"{configuration['time_step']:9.3g} s"
+            + ("  <- recommended" if configuration is recommended else "")
+        )
+
+    configuration = recommended
+    if configuration is None:
+        if not configurations:
+            return
+        configuration = configurations[0]
+    print(
+        f"\nAllocation plan per process for nb_proc = {configuration['nb_proc']} "
+        f"({configuration['type_fft']}):"
+    )
+    memory = compute_memory_loc(
+        allocations, configuration["shapeX_loc"], configuration["shapeK_loc"]
+    )
+    fields = allocations["fields"]
+    for name, nbytes in sorted(memory.items(), key=lambda item: -item[1]):
+        try:
+            kind, itemsize, nb_fields = fields[name]
+        except KeyError:
+            description_fields = ""
+        else:
+            description_fields = f"{nb_fields:3d} x {kind} ({itemsize} bytes)"
+        print(
+            f"  {name:50s}{description_fields:>18s}{_format_bytes(nbytes):>12s}"
+        )
+    print(f"  {'total':50s}{'':18s}{_format_bytes(sum(memory.values())):>12s}")
+
+
+def init_parser(parser):
+    """Initialize argument parser for `fluidsim capacity`."""
+    init_parser_base(parser)
+    parser.add_argument(
+        "--params",
+        default=None,
+        help="directory of a simulation whose parameters are used",
+    )
+    parser.add_argument(
+        "-t", "--type-time-scheme", default=None, help="for example RK4"
+    )
+    parser.add_argument("-np", "--nb-proc", nargs="+", type=int, default=None)
+    parser.add_argument(
+        "-m",
+        "--mem-per-proc",
+        type=float,
+        default=None,
+        help="memory available per process (GB)",
+    )
+    parser.add_argument(
+        "--types-fft", nargs="+", default=None, help="MPI FFT classes"
+    )
+    parser.add_argument("-i", "--microbench-dir", default=microbench.path_results)
+    parser.add_argument(
+        "-a",
+        "--all-types-fft",
+        action="store_true",
+        help="print all possible FFT classes for each number of processes",
+    )
+
+
+def _get_params_simul_from_args(args):
+    if args.params is None:
+        args = parse_args_dim(args)
+        Simul = import_module_solver_from_key(args.solver).Simul
+        params = Simul.create_default_params()
+        if args.dim == "3d":
+            modif_params3d(params, args.n0, args.n1, args.n2, name_run="capacity")
+        else:
+            modif_params2d(params, args.n0, args.n1, name_run="capacity")
+    else:
+        from fluidsim.base.params import fix_old_params, load_params_simul
+        from fluidsim.extend_simul import _extend_simul_class_from_path
+        from fluidsim.util.util import (
+            _import_solver_from_path,
+            pathdir_from_namedir,
+        )
+
+        path_dir = pathdir_from_namedir(args.params)
+        params = load_params_simul(path_dir)
+        fix_old_params(params)
+        Simul = _extend_simul_class_from_path(
+            _import_solver_from_path(path_dir).Simul,
+            Path(path_dir) / "info_solver.xml",
+        )
+        shape = [n for n in (args.n0, args.n1, args.n2) if n is not None]
+        if shape:
+            keys = _get_keys_shape(params)
+            if len(shape) == 1:
+                shape *= len(keys)
+            if len(shape) != len(keys):
+                raise ConsoleError(f"The shape should be given as {keys}")
+            for key, n in zip(keys, shape):
+                params.oper[key] = n
+
+    if args.type_time_scheme is not None:
+        params.time_stepping.type_time_scheme = args.type_time_scheme
+    return params, Simul
+
+
+def run(args):
+    """Run `fluidsim capacity` command."""
+    if mpi.nb_proc > 1:
+        raise ConsoleError("fluidsim capacity has to be run sequentially")
+
+    params, Simul = _get_params_simul_from_args(args)
+    mem_per_proc = args.mem_per_proc
+    if mem_per_proc is not None:
+        mem_per_proc *= 1e9
+    plan = plan_capacity(
+        params,
+        Simul,
+        nb_procs=args.nb_proc,
+        mem_per_proc=mem_per_proc,
+        types_fft=args.types_fft,
+        path_microbench=args.microbench_dir,
+    )
+    print_plan(plan, args.all_types_fft)
@@ -0,0 +1,706 @@
+"""Run microbenchmarks (:mod:`fluidsim.util.console.microbench`)
+================================================================
+
+Contrary to ``fluidsim-bench`` which times whole simulations, this command
+times small and well defined pieces of code:
+
+- operators (``dealiasing``, ``project_perpk3d``, ``compute_1dspectra`` and
+  ``put_coarse_array_in_array_fft``),
+
+- one time step for each ``type_time_scheme``,
+
+- the nonlinear tendencies of the ns3d and ns3d.strat solvers,
+
+- the method ``compute`` of the specific outputs,
+
+- saving and loading state files,
+
+- the normal mode decomposition of the sw1l solver (dyads, triads and
+  spectral energy budget),
+
+- the spectra outputs of the ns2d.strat solver (fused computations and, for
+  comparison, the former computations with one call per energy array),
+
+for several resolutions, and the import of fluidsim and of few solvers (in new
+processes). The results of one run are saved in a JSON file in a local
+directory (by default ``$FLUIDSIM_PATH/microbench``) together with the git
+commit of the fluidsim source. The history of runs can be listed and two runs
+can be compared to detect regressions::
+
+  fluidsim-microbench run --sizes 32 64
+  fluidsim-microbench history
+  fluidsim-microbench compare              # the two last runs
+  fluidsim-microbench compare 1a2b3c4 HEAD --threshold 0.15
+
+The command ``import-time`` checks that the import times are smaller than a
+budget (exit code 1 otherwise)::
+
+  fluidsim-microbench import-time --budget fluidsim=0.5
+
+.. autofunction:: run_microbenchmarks
+
+.. autofunction:: compare_results
+
+.. autofunction:: time_import
+
+.. autofunction:: check_import_budgets
+
+"""
+
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import timeit
+from fnmatch import fnmatch
+from inspect import signature
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from fluiddyn.util import mpi, time_as_str
+from fluiddyn.io import FLUIDSIM_PATH, stdout_redirected
+
+import fluidsim
+
+from .util import modif_params3d
+
+
+path_results = os.path.join(FLUIDSIM_PATH, "microbench")
+old_print = print
+print = mpi.printby0
+description = "Run microbenchmarks and compare the results between commits"
+
+type_time_schemes = (
+    "Euler",
+    "Euler_phaseshift",
+    "Euler_phaseshift_random",
+    "RK2",
+    "RK2_trapezoid",
+    "RK2_phaseshift",
+    "RK2_phaseshift_random",
+    "RK2_phaseshift_exact",
+    "RK4",
+)
+
+groups = (
+    "operators",
+    "time_schemes",
+    "tendencies",
+    "outputs",
+    "state_files",
+    "normal_modes",
+    "ns2d_strat_spectra",
+)
+
+modules_import = (
+    "fluidsim",
+    "fluidsim.solvers.ns2d.solver",
+    "fluidsim.solvers.ns3d.solver",
+)
+
+# import times in s
+import_budgets = {"fluidsim": 0.5, "fluidsim.solvers.ns3d.solver": 3.0}
+
+
+def time_func(func, repeat=5, min_time=0.05):
+    """Time a function and return statistics on the time per call
+
+    The number of calls per measurement is chosen by the process 0 such that a
+    measurement lasts at least ``min_time`` (same number for all processes).
+
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    if mpi.rank == 0:
+        while True:
+            if timer.timeit(number) >= min_time or number >= 1000:
+                break
+            number *= 2
+    if mpi.nb_proc > 1:
+        number = mpi.comm.bcast(number)
+
+    times = [time / number for time in timer.repeat(repeat, number)]
+    return {
+        "min": min(times),
+        "median": median(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def time_import(module, repeat=5):
+    """Time the import of a module (and the creation of the default params)
+
+    Each measurement is done in a new Python process (the time to start the
+    interpreter is not included).
+
+    """
+    code = (
+        "from time import perf_counter as clock\n"
+        "t0 = clock()\n"
+        f"import {module}\n"
+        f"if hasattr({module}, 'Simul'):\n"
+        f"    {module}.Simul.create_default_params()\n"
+        "print(clock() - t0)\n"
+    )
+    env = os.environ.copy()
+    env.pop("OMPI_COMM_WORLD_SIZE", None)
+    times = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+            env=env,
+        )
+        times.append(float(process.stdout.split()[-1]))
+    return {
+        "min": min(times),
+        "median": median(times),
+        "number": 1,
+        "repeat": repeat,
+    }
+
+
+def check_import_budgets(budgets=None, repeat=3):
+    """Check that the import times are smaller than budgets
+
+    Returns
+    -------
+
+    failures : dict
+
+      ``{module: (time, budget)}`` for the modules over budget.
+
+    """
+    if budgets is None:
+        budgets = import_budgets
+    failures = {}
+    for module, budget in budgets.items():
+        time = time_import(module, repeat)["min"]
+        old_print(f"import {module:40s}{time:8.3f} s (budget {budget} s)")
+        if time > budget:
+            failures[module] = (time, budget)
+    return failures
+
+
+def _create_sim(n, solver="ns3d", **kwargs_time_stepping):
+    Simul = fluidsim.import_simul_class_from_key(solver)
+
+    params = Simul.create_default_params()
+    modif_params3d(params, n, name_run="microbench", it_end=1)
+    params.output.HAS_TO_SAVE = False
+    params.output.ONLINE_PLOT_OK = False
+    for key, value in kwargs_time_stepping.items():
+        params.time_stepping[key] = value
+
+    with stdout_redirected():
+        sim = Simul(params)
+    return sim
+
+
+def _iter_benchmarks_operators(n):
+    sim = _create_sim(n)
+    oper = sim.oper
+    vx_fft, vy_fft, vz_fft = (
+        sim.state.get_var(key) for key in ("vx_fft", "vy_fft", "vz_fft")
+    )
+    energy_fft = 0.5 * (abs(vx_fft) ** 2 + abs(vy_fft) ** 2 + abs(vz_fft) ** 2)
+
+    yield "dealiasing", lambda: oper.dealiasing(sim.state.state_spect)
+    yield "project_perpk3d", lambda: oper.project_perpk3d(vx_fft, vy_fft, vz_fft)
+    yield "compute_1dspectra", lambda: oper.compute_1dspectra(energy_fft)
+
+    if mpi.rank == 0:
+        params = oper._create_default_params()
+        params.oper.nx = params.oper.ny = params.oper.nz = n // 2
+        params.oper.type_fft = "sequential"
+        oper_coarse = oper.__class__(params)
+        shapeK_coarse = oper_coarse.shapeK_loc
+        arr_coarse = oper_coarse.create_arrayK(value=1.0)
+    else:
+        oper_coarse = arr_coarse = shapeK_coarse = None
+    if mpi.nb_proc > 1:
+        shapeK_coarse = mpi.comm.bcast(shapeK_coarse, root=0)
+    arr = oper.create_arrayK(value=0.0)
+
+    def put_coarse_array_in_array_fft():
+        oper.put_coarse_array_in_array_fft(
+            arr_coarse, arr, oper_coarse, shapeK_coarse
+        )
+
+    yield "put_coarse_array_in_array_fft", put_coarse_array_in_array_fft
+
+
+def _iter_benchmarks_time_schemes(n):
+    for type_time_scheme in type_time_schemes:
+        sim = _create_sim(n, type_time_scheme=type_time_scheme)
+        yield type_time_scheme, sim.time_stepping.one_time_step_computation
+
+
+def _iter_benchmarks_tendencies(n):
+    for solver in ("ns3d", "ns3d.strat"):
+        sim = _create_sim(n, solver=solver)
+        tendencies = sim.tendencies_nonlin()
+        yield solver + ".tendencies_nonlin", (
+            lambda sim=sim, tendencies=tendencies: sim.tendencies_nonlin(
+                old=tendencies
+            )
+        )
+
+
+def _iter_benchmarks_outputs(n):
+    from fluidsim.base.output.base import SpecificOutput
+
+    sim = _create_sim(n)
+    for key in sorted(sim.output.params.periods_save._get_key_attribs()):
+        spec_output = getattr(sim.output, key, None)
+        if not isinstance(spec_output, SpecificOutput) or (
+            type(spec_output).compute is SpecificOutput.compute
+        ):
+            continue
+        compute = spec_output.compute
+        if any(
+            parameter.default is parameter.empty
+            for parameter in signature(compute).parameters.values()
+        ):
+            continue
+        yield key + ".compute", compute
+
+
+def _iter_benchmarks_state_files(n):
+    from fluidsim.base.init_fields import InitFieldsFromFile
+    from fluidsim.util.output import save_file, ext
+
+    sim = _create_sim(n)
+    path_dir = None
+    if mpi.rank == 0:
+        tmp_dir = TemporaryDirectory(prefix="fluidsim_microbench")
+        path_dir = tmp_dir.name
+    if mpi.nb_proc > 1:
+        path_dir = mpi.comm.bcast(path_dir)
+    path_file = os.path.join(path_dir, f"state_phys.{ext}")
+
+    def save():
+        if mpi.rank == 0 and os.path.exists(path_file):
+            os.remove(path_file)
+        save_file(
+            path_file,
+            sim.state.state_phys,
+            sim.info,
+            sim.output.name_run,
+            sim.oper,
+            sim.time_stepping.t,
+            sim.time_stepping.it,
+        )
+
+    yield "save", save
+
+    save()
+    sim.params.init_fields.from_file.path = path_file
+    init_from_file = InitFieldsFromFile(sim)
+
+    def load():
+        with stdout_redirected():
+            init_from_file()
+
+    yield "load", load
+
+    if mpi.rank == 0:
+        tmp_dir.cleanup()
+
+
+def _iter_benchmarks_normal_modes(n):
+    from fluidsim.solvers.sw1l.solver import Simul
+
+    params = Simul.create_default_params()
+    params.short_name_type_run = "microbench"
+    params.oper.nx = params.oper.ny = n
+    params.f = 1.0
+    params.init_fields.type = "noise"
+    params.output.HAS_TO_SAVE = False
+    params.output.ONLINE_PLOT_OK = False
+
+    with stdout_redirected():
+        sim = Simul(params)
+    spect_energy_budg = sim.output.spect_energy_budg
+    norm_mode = spect_energy_budg.norm_mode
+    norm_mode.compute()
+
+    yield "dyad_from_keyfft", lambda: norm_mode.dyad_from_keyfft(
+        True, "ux_fft", "px_eta_fft"
+    )
+    yield "dyad_from_keyphys", lambda: norm_mode.dyad_from_keyphys("ux", "eta")
+    yield "triad_from_keyfftphys", lambda: norm_mode.triad_from_keyfftphys(
+        "ux_fft", "ux", "px_ux"
+    )
+    yield "spect_energy_budg.compute", spect_energy_budg.compute
+
+
+def _iter_benchmarks_ns2d_strat_spectra(n):
+    from fluidsim.solvers.ns2d.strat.solver import Simul
+
+    params = Simul.create_default_params()
+    params.short_name_type_run = "microbench"
+    params.oper.nx = params.oper.ny = n
+    params.N = 1.0
+    params.init_fields.type = "noise"
+    params.output.HAS_TO_SAVE = False
+    params.output.ONLINE_PLOT_OK = False
+
+    with stdout_redirected():
+        sim = Simul(params)
+    output = sim.output
+    oper = sim.oper
+
+    def compute_spectra_per_energy():
+        energyK_fft, energyA_fft = output.compute_energies_fft()
+        energyK_ux_fft, energyK_uy_fft = output.compute_energies2_fft()
+        for energy_fft in (
+            energyK_fft + energyA_fft,
+            energyK_fft,
+            energyA_fft,
+            energyK_ux_fft,
+            energyK_uy_fft,
+        ):
+            oper.spectra1D_from_fft(energy_fft)
+            oper.spectrum2D_from_fft(energy_fft)
+
+    def compute_spectra_multidim_per_energy():
+        energyK_fft, energyA_fft = output.compute_energies_fft()
+        ap_fft = sim.state.compute("ap_fft")
+        am_fft = sim.state.compute("am_fft")
+        for energy_fft in (
+            energyK_fft,
+            energyA_fft,
+            abs(ap_fft) ** 2,
+            abs(am_fft) ** 2,
+        ):
+            oper.compute_spectrum_kykx(energy_fft, folded=False)
+
+    yield "spectra.compute", output.spectra.compute
+    yield "spectra.compute_per_energy", compute_spectra_per_energy
+    yield "spectra_multidim.compute", output.spectra_multidim.compute
+    if mpi.nb_proc == 1:
+        yield "spectra_multidim.compute_per_energy", (
+            compute_spectra_multidim_per_energy
+        )
+
+
+def get_commit():
+    """Get the git commit of the fluidsim source (or the fluidsim version)"""
+    path_src = Path(fluidsim.__file__).parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=path_src,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+        is_dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=path_src,
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return fluidsim.get_local_version(), False
+    return commit, is_dirty
+
+
+def run_microbenchmarks(
+    sizes=(32,), benchmark="*", path_dir=None, repeat=5, min_time=0.05
+):
+    """Run the microbenchmarks and save the results in a JSON file
+
+    Parameters
+    ----------
+
+    sizes : sequence of int
+
+      Numbers of grid points in each direction.
+
+    benchmark : str
+
+      Glob pattern to select the benchmarks (for example "operators.*" or
+      "*.RK4*").
+
+    path_dir : str
+
+      Directory where the results are saved (by default
+      ``$FLUIDSIM_PATH/microbench``). If it is an empty string, nothing is
+      saved.
+
+    Returns
+    -------
+
+    path : str or None
+
+      Path of the results file.
+
+    results : dict
+
+    """
+    if path_dir is None:
+        path_dir = path_results
+
+    commit, is_dirty = get_commit()
+    time_str = time_as_str()
+    results = {
+        "commit": commit,
+        "is_dirty": is_dirty,
+        "fluidsim_version": fluidsim.__version__,
+        "time_as_str": time_str,
+        "hostname": socket.gethostname(),
+        "nb_proc": mpi.nb_proc,
+        "numpy_version": np.__version__,
+        "benchmarks": {},
+    }
+    benchmarks = results["benchmarks"]
+
+    if mpi.rank == 0 and fnmatch("imports", benchmark.split(".")[0]):
+        for module in modules_import:
+            full_name = f"imports.{module}"
+            if not fnmatch(full_name, benchmark):
+                continue
+            print(f"{full_name:55s}", end="", flush=True)
+            result = time_import(module, repeat)
+            benchmarks[full_name] = result
+            print(f"{result['min']:12.4g} s")
+
+    for n in sizes:
+        for group in groups:
+            if not fnmatch(group, benchmark.split(".")[0]):
+                continue
+            iter_benchmarks = globals()["_iter_benchmarks_" + group](n)
+            for name, func in iter_benchmarks:
+                full_name = f"{group}.{name}[n={n}]"
+                if not fnmatch(full_name, benchmark):
+                    continue
+                print(f"{full_name:55s}", end="", flush=True)
+                result = time_func(func, repeat, min_time)
+                benchmarks[full_name] = result
+                print(f"{result['min']:12.4g} s")
+            gc.collect()
+
+    if not path_dir or mpi.rank > 0:
+        return None, results
+
+    path_dir = Path(path_dir)
+    path_dir.mkdir(parents=True, exist_ok=True)
+    name_file = "_".join(
+        [
+            "microbench",
+            commit + ("-dirty" if is_dirty else ""),
+            socket.gethostname(),
+            f"np={mpi.nb_proc}",
+            time_str,
+        ]
+    )
+    path = path_dir / (name_file + ".json")
+    index = 1
+    while path.exists():
+        # 2 runs during the same second
+        index += 1
+        path = path_dir / (name_file + f"_{index}.json")
+    with open(path, "w") as file:
+        json.dump(results, file, indent=1, sort_keys=True)
+        file.write("\n")
+    print(f"results saved in\n{path}")
+    return str(path), results
+
+
+def load_history(path_dir=None):
+    """Load all the results saved in a directory (sorted by time)"""
+    if path_dir is None:
+        path_dir = path_results
+    history = []
+    for path in Path(path_dir).glob("microbench_*.json"):
+        with open(path) as file:
+            results = json.load(file)
+        results["path"] = str(path)
+        history.append(results)
+    history.sort(key=lambda results: results["time_as_str"])
+    return history
+
+
+def _select_results(history, revision):
+    """Last results corresponding to a revision (commit, index or path)"""
+    if os.path.exists(revision):
+        with open(revision) as file:
+            return json.load(file)
+    try:
+        return history[int(revision)]
+    except (ValueError, IndexError):
+        pass
+    if revision == "HEAD":
+        revision = get_commit()[0]
+    for results in reversed(history):
+        if results["commit"].startswith(revision) or revision.startswith(
+            results["commit"]
+        ):
+            return results
+    raise ValueError(f"No results found for revision {revision}")
+
+
+def compare_results(results_old, results_new, threshold=0.1):
+    """Compare two sets of results
+
+    The minimum times are compared. A benchmark is flagged as a regression if
+    its time increased by more than ``threshold`` (relative).
+
+    Returns
+    -------
+
+    comparison : list of tuple
+
+      ``(name, time_old, time_new, ratio, flag)`` with flag equal to
+      "regression", "improvement" or "".
+
+    """
+    benchs_old = results_old["benchmarks"]
+    benchs_new = results_new["benchmarks"]
+    comparison = []
+    for name in sorted(set(benchs_old).intersection(benchs_new)):
+        time_old = benchs_old[name]["min"]
+        time_new = benchs_new[name]["min"]
+        ratio = time_new / time_old if time_old > 0 else np.inf
+        if ratio > 1 + threshold:
+            flag = "regression"
+        elif ratio < 1 / (1 + threshold):
+            flag = "improvement"
+        else:
+            flag = ""
+        comparison.append((name, time_old, time_new, ratio, flag))
+    return comparison
+
+
+def print_comparison(results_old, results_new, comparison):
+    """Print the result of :func:`compare_results`"""
+
+    def describe(results):
+        commit = results["commit"] + ("-dirty" if results["is_dirty"] else "")
+        return f"{commit} ({results['time_as_str']}, {results['hostname']})"
+
+    old_print("old:", describe(results_old))
+    old_print("new:", describe(results_new))
+    old_print(f"{'benchmark':55s}{'old (s)':>12s}{'new (s)':>12s}{'ratio':>8s}")
+    for name, time_old, time_new, ratio, flag in comparison:
+        old_print(
+            f"{name:55s}{time_old:12.4g}{time_new:12.4g}{ratio:8.2f}  {flag}"
+        )
+    nb_regressions = sum(flag == "regression" for *_, flag in comparison)
+    old_print(f"{nb_regressions} regression(s)")
+
+
+def init_parser(parser):
+    """Initialize argument parser for `fluidsim microbench`."""
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_run = subparsers.add_parser("run", help="run the microbenchmarks")
+    parser_run.add_argument(
+        "--sizes", nargs="+", type=int, default=[32], help="resolutions"
+    )
+    parser_run.add_argument(
+        "-b", "--benchmark", default="*", help="glob pattern on the names"
+    )
+    parser_run.add_argument("-o", "--output-dir", default=path_results)
+    parser_run.add_argument("--repeat", type=int, default=5)
+    parser_run.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="minimum duration of one measurement (s)",
+    )
+
+    parser_import_time = subparsers.add_parser(
+        "import-time", help="check the import times"
+    )
+    parser_import_time.add_argument(
+        "--budget",
+        nargs="+",
+        default=[f"{key}={value}" for key, value in import_budgets.items()],
+        help="budgets as module=seconds",
+    )
+    parser_import_time.add_argument("--repeat", type=int, default=3)
+
+    parser_history = subparsers.add_parser(
+        "history", help="list the saved results"
+    )
+    parser_history.add_argument("-i", "--input-dir", default=path_results)
+
+    parser_compare = subparsers.add_parser(
+        "compare",
+        help=(
+            "compare two results (commits, indices in the history or paths; "
+            "by default the two last results)"
+        ),
+    )
+    parser_compare.add_argument("old", nargs="?", default="-2")
+    parser_compare.add_argument("new", nargs="?", default="-1")
+    parser_compare.add_argument("-i", "--input-dir", default=path_results)
+    parser_compare.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative increase of time flagged as regression",
+    )
+    parser_compare.add_argument(
+        "--fail",
+        action="store_true",
+        help="exit with an error code if there are regressions",
+    )
+
+
+def run(args):
+    """Run `fluidsim microbench` command."""
+    command = args.command
+    if command is None or command == "run":
+        run_microbenchmarks(
+            getattr(args, "sizes", [32]),
+            getattr(args, "benchmark", "*"),
+            getattr(args, "output_dir", path_results),
+            getattr(args, "repeat", 5),
+            getattr(args, "min_time", 0.05),
+        )
+        return
+
+    if mpi.rank > 0:
+        return
+
+    if command == "import-time":
+        budgets = {}
+        for budget in args.budget:
+            module, time = budget.split("=")
+            budgets[module] = float(time)
+        if check_import_budgets(budgets, args.repeat):
+            raise SystemExit(1)
+        return
+
+    history = load_history(args.input_dir)
+    if command == "history":
+        for index, results in enumerate(history):
+            commit = results["commit"] + ("-dirty" if results["is_dirty"] else "")
+            old_print(
+                f"{index:4d} {commit:20s} {results['time_as_str']} "
+                f"{results['hostname']} np={results['nb_proc']} "
+                f"({len(results['benchmarks'])} benchmarks)"
+            )
+    elif command == "compare":
+        results_old = _select_results(history, args.old)
+        results_new = _select_results(history, args.new)
+        comparison = compare_results(results_old, results_new, args.threshold)
+        print_comparison(results_old, results_new, comparison)
+        if args.fail and any(flag == "regression" for *_, flag in comparison):
+            raise SystemExit(1)
@@ -12,7 +12,6 @@ import pstats
 import cProfile
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 from fluiddyn.io import stdout_redirected
@@ -30,6 +29,9 @@ from .util import (
 )
 
 from .bench import get_opfft
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 path_results = "/tmp/fluidsim_profile"
@@ -0,0 +1,157 @@
+"""Test capacity planner (:mod:`fluidsim.util.console.test_capacity`)
+====================================================================
+
+"""
+import json
+import sys
+import unittest
+from math import prod
+from pathlib import Path
+from shutil import rmtree
+
+import pytest
+
+from fluiddyn.util import mpi
+from fluidsim.util.testing import TestCase, skip_if_no_fluidfft
+
+from fluidsim.util.console.__main__ import run_capacity
+from fluidsim.util.console.capacity import (
+    compute_shapes_loc,
+    measure_allocations,
+    plan_capacity,
+)
+from fluidsim.util.console.util import modif_params2d, modif_params3d
+
+
+path_tmp = "/tmp/fluidsim_test_capacity"
+
+
+def test_compute_shapes_loc():
+    shapeX_seq = (64, 128, 256)
+    assert compute_shapes_loc(shapeX_seq, 1) == (shapeX_seq, (64, 128, 129))
+    assert compute_shapes_loc(shapeX_seq, 8, "fft3d.mpi_with_fftwmpi3d") == (
+        (8, 128, 256),
+        (16, 64, 129),
+    )
+    assert compute_shapes_loc(shapeX_seq, 16, "fft3d.mpi_with_fftw1d") == (
+        (4, 128, 256),
+        (8, 128, 64),
+    )
+    shapeX_loc, shapeK_loc = compute_shapes_loc(
+        shapeX_seq, 8, "fft3d.mpi_with_p3dfft"
+    )
+    assert shapeX_loc == (16, 64, 256)
+    assert shapeK_loc == (33, 64, 64)
+
+    # slabs: at most one plane per process
+    with pytest.raises(ValueError):
+        compute_shapes_loc(shapeX_seq, 128, "fft3d.mpi_with_fftwmpi3d")
+    with pytest.raises(ValueError):
+        compute_shapes_loc(shapeX_seq, 48, "fft3d.mpi_with_fftw1d")
+    with pytest.raises(ValueError):
+        compute_shapes_loc(shapeX_seq, 2)
+
+    assert compute_shapes_loc((32, 64), 4, "fft2d.mpi_with_fftwmpi2d") == (
+        (8, 64),
+        (9, 32),
+    )
+
+
+@skip_if_no_fluidfft
+@unittest.skipIf(mpi.nb_proc > 1, "The planner is sequential")
+class TestCapacity(TestCase):
+    """Test the capacity planner."""
+
+    @classmethod
+    def setUpClass(cls):
+        rmtree(path_tmp, ignore_errors=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(path_tmp, ignore_errors=True)
+
+    def test_measure_allocations(self):
+        from fluidsim.solvers.ns3d.solver import Simul
+
+        params = Simul.create_default_params()
+        modif_params3d(params, 128, name_run="test_capacity")
+        params.time_stepping.type_time_scheme = "RK4"
+        allocations = measure_allocations(params, Simul, sizes=(8, 12))
+        fields = allocations["fields"]
+        assert fields["state.state_spect"] == ("K", 16, 3)
+        assert fields["state.state_phys"][:2] == ("X", 8)
+        assert fields["time_stepping._state_spect_tmp"] == ("K", 16, 3)
+        assert fields["time_stepping._state_spect_tmp1"] == ("K", 16, 3)
+        assert allocations["transient"][0] > 0
+
+        params.time_stepping.type_time_scheme = "Euler"
+        allocations_euler = measure_allocations(params, Simul, sizes=(8, 12))
+        assert "time_stepping._state_spect_tmp" not in allocations_euler["fields"]
+        assert allocations_euler["transient"][0] < allocations["transient"][0]
+
+        # reference time step from microbench results
+        path_dir = Path(path_tmp) / "microbench"
+        path_dir.mkdir(parents=True, exist_ok=True)
+        results = {
+            "commit": "0123456",
+            "is_dirty": False,
+            "time_as_str": "2024-01-01_00-00-00",
+            "hostname": "cluster",
+            "nb_proc": 4,
+            "benchmarks": {
+                "time_schemes.RK4[n=16]": {"min": 0.5},
+                "time_schemes.RK4[n=32]": {"min": 2.0},
+            },
+        }
+        with open(path_dir / "microbench_0123456.json", "w") as file:
+            json.dump(results, file)
+
+        plan = plan_capacity(
+            params,
+            Simul,
+            nb_procs=[1, 4, 1024],
+            mem_per_proc=1e9,
+            path_microbench=str(path_dir),
+            allocations=allocations,
+        )
+        assert plan["reference_time_step"]["source"].startswith("microbench")
+        configurations = plan["configurations"]
+        nb_procs = [configuration["nb_proc"] for configuration in configurations]
+        # no slab decomposition with 1024 processes
+        assert nb_procs.count(1) == 1 and 1024 in nb_procs
+        assert "fft3d.mpi_with_fftwmpi3d" not in (
+            configuration["type_fft"]
+            for configuration in configurations
+            if configuration["nb_proc"] == 1024
+        )
+        seq = configurations[0]
+        assert seq["memory"] > 16 * 3 * 3 * prod(seq["shapeK_loc"])
+        # ideal scaling from the largest microbench size
+        assert seq["time_step"] == pytest.approx(
+            2.0 * 4 * 128**3 * 21 / (32**3 * 15)
+        )
+        recommended = plan["recommended"]
+        assert recommended["memory"] <= 1e9
+        assert all(
+            configuration["memory"] > 1e9
+            for configuration in configurations
+            if configuration["nb_proc"] < recommended["nb_proc"]
+        )
+
+    def test_console(self):
+        from fluidsim.solvers.ns2d.solver import Simul
+
+        params = Simul.create_default_params()
+        modif_params2d(params, 32)
+        plan = plan_capacity(params, Simul, nb_procs=[2], path_microbench="")
+        configuration = plan["configurations"][0]
+        assert configuration["type_fft"].startswith("fft2d.mpi_with_")
+        assert plan["reference_time_step"]["source"].startswith("proxy")
+
+        sys.argv = "fluidsim-capacity 64 -s ns2d -np 1 2 4 -m 1 -i".split()
+        sys.argv.append(path_tmp)
+        run_capacity()
+
+
+if __name__ == "__main__":
+    unittest.main()
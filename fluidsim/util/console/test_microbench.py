@@ -0,0 +1,110 @@
+"""Test microbenchmarks (:mod:`fluidsim.util.console.test_microbench`)
+======================================================================
+
+"""
+import json
+import sys
+import unittest
+from pathlib import Path
+from shutil import rmtree
+
+from fluiddyn.util import mpi
+from fluidsim.util.testing import TestCase, skip_if_no_fluidfft
+
+from fluidsim.util.console.__main__ import run_microbench
+from fluidsim.util.console.microbench import (
+    check_import_budgets,
+    compare_results,
+    load_history,
+    run_microbenchmarks,
+)
+
+
+path_tmp = "/tmp/fluidsim_test_microbench"
+
+
+@skip_if_no_fluidfft
+class TestMicrobench(TestCase):
+    """Test microbenchmarks."""
+
+    @classmethod
+    def setUpClass(cls):
+        if mpi.rank == 0:
+            rmtree(path_tmp, ignore_errors=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if mpi.rank == 0:
+            rmtree(path_tmp, ignore_errors=True)
+
+    def test_run_compare(self):
+        kwargs = dict(path_dir=path_tmp, repeat=1, min_time=0.0)
+        path, results = run_microbenchmarks([8], "operators.*", **kwargs)
+        names = list(results["benchmarks"])
+        assert "operators.dealiasing[n=8]" in names
+        assert "operators.put_coarse_array_in_array_fft[n=8]" in names
+        assert all(name.startswith("operators.") for name in names)
+
+        # nothing saved with path_dir=""
+        kwargs_not_saved = dict(kwargs, path_dir="")
+        path_not_saved, results_state_files = run_microbenchmarks(
+            [8], "state_files.*", **kwargs_not_saved
+        )
+        assert path_not_saved is None
+        names = list(results_state_files["benchmarks"])
+        assert names == ["state_files.save[n=8]", "state_files.load[n=8]"]
+
+        command = (
+            "fluidsim-microbench run --sizes 8 -b time_schemes.RK4* "
+            f"-o {path_tmp} --repeat 1 --min-time 0"
+        )
+        sys.argv = command.split()
+        run_microbench()
+
+        if mpi.rank > 0:
+            return
+
+        history = load_history(path_tmp)
+        assert len(history) == 2
+        assert history[0]["commit"] == history[1]["commit"]
+
+        # fake a regression
+        with open(path) as file:
+            results_new = json.load(file)
+        for name, bench in results_new["benchmarks"].items():
+            bench["min"] *= 2 if name.startswith("operators") else 1
+        comparison = compare_results(results, results_new)
+        for name, _, _, ratio, flag in comparison:
+            if name.startswith("operators"):
+                assert flag == "regression"
+            else:
+                assert flag == ""
+
+        path_new = Path(path_tmp) / "new.json"
+        with open(path_new, "w") as file:
+            json.dump(results_new, file)
+
+        sys.argv = "fluidsim-microbench history -i".split() + [path_tmp]
+        run_microbench()
+
+        sys.argv = [
+            "fluidsim-microbench",
+            "compare",
+            path,
+            str(path_new),
+            "-i",
+            path_tmp,
+            "--fail",
+        ]
+        with self.assertRaises(SystemExit):
+            run_microbench()
+
+    @unittest.skipIf(mpi.nb_proc > 1, "No subprocess with MPI")
+    def test_import_time(self):
+        assert check_import_budgets({"fluidsim": 10.0}, repeat=1) == {}
+        failures = check_import_budgets({"fluidsim": 0.0}, repeat=1)
+        assert list(failures) == ["fluidsim"]
+
+
+if __name__ == "__main__":
+    unittest.main()
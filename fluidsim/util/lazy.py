@@ -0,0 +1,103 @@
+"""Lazy imports (:mod:`fluidsim.util.lazy`)
+==========================================
+
+Importing heavy packages (matplotlib, pandas, xarray, scipy, ...) at module
+level makes ``import fluidsim`` and the creation of the solvers slow, which is
+costly for short scripts, the command line tools and large MPI jobs (import
+storm on a shared file system).
+
+With :func:`lazy_import`, the modules are only imported at the first access to
+one of their attributes::
+
+  plt = lazy_import("matplotlib.pyplot")
+
+.. autofunction:: lazy_import
+
+.. autofunction:: register_import_hook
+
+.. autofunction:: set_lazy_attribute
+
+.. autoclass:: LazyModule
+   :members:
+
+"""
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+_hooks = {}
+
+
+def register_import_hook(name_package, func):
+    """Register a function called when a package is lazily imported
+
+    ``func`` is called (with the package as argument) the first time a
+    :class:`LazyModule` of this package (or of one of its subpackages) is
+    actually imported, or directly if the package is already imported.
+
+    """
+    _hooks.setdefault(name_package, []).append(func)
+    if name_package in sys.modules:
+        _run_hooks(name_package)
+
+
+def _run_hooks(fullname):
+    name_package = fullname.split(".")[0]
+    if name_package in _hooks:
+        for func in _hooks.pop(name_package):
+            func(sys.modules[name_package])
+
+
+def set_lazy_attribute(module, name, fullname):
+    """Define an attribute of a module imported at its first access
+
+    The attribute ``name`` of ``module`` is taken from the module ``fullname``
+    (imported at the first access, see :pep:`562`). Nothing is done if the
+    attribute already exists.
+
+    """
+    if name in module.__dict__:
+        return
+    getattr_previous = module.__dict__.get("__getattr__")
+
+    def __getattr__(name_attr):
+        if name_attr == name:
+            value = getattr(import_module(fullname), name)
+            setattr(module, name, value)
+            return value
+        if getattr_previous is not None:
+            return getattr_previous(name_attr)
+        raise AttributeError(
+            f"module {module.__name__!r} has no attribute {name_attr!r}"
+        )
+
+    module.__getattr__ = __getattr__
+
+
+class LazyModule(ModuleType):
+    """Module imported at the first access to one of its attributes"""
+
+    def _load(self):
+        try:
+            return self.__dict__["_module"]
+        except KeyError:
+            pass
+        module = import_module(self.__name__)
+        _run_hooks(self.__name__)
+        self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(fullname):
+    """Return a lazy module (or the module if it is already imported)"""
+    try:
+        return sys.modules[fullname]
+    except KeyError:
+        return LazyModule(fullname)
@@ -1,11 +1,19 @@
 """Mini operator to modify the resolution (Fourier)
 ===================================================
 
+With MPI, the fields are distributed over the processes (3d only) and the
+Fourier modes are exchanged between the processes with one ``Alltoallv`` per
+field (see :class:`RemapModesMPI`), so that no process holds a global array.
+
 Internal API
 ------------
 
 .. autofunction:: fill_field_fft_3d
 
+.. autoclass:: RemapModesMPI
+   :members:
+   :private-members:
+
 .. autoclass:: MiniOperModifResol
    :members:
    :private-members:
@@ -14,6 +22,7 @@ Internal API
 
 import numpy as np
 
+from fluiddyn.util import mpi
 from fluiddyn.calcul.easypyfft import FFTW2DReal2Complex, FFTW3DReal2Complex
 
 from fluidsim.base.init_fields import fill_field_fft_2d
@@ -53,17 +62,163 @@ def fill_field_fft_3d(field_fft_in: A, field_fft_out: A):
                     field_fft_out[ik0, -ik1, ik2] = field_fft_in[ik0, -ik1, ik2]
 
 
+def _k_adim_from_seq_indices(iseqs, n, is_half):
+    """Integer wavenumbers from indices along one dimension of a K array"""
+    if is_half:
+        return iseqs
+    return np.where(iseqs <= n // 2, iseqs, iseqs - n)
+
+
+class RemapModesMPI:
+    """Copy the Fourier modes between two distributed resolutions
+
+    The same modes as with :func:`fill_field_fft_3d` are copied. The local K
+    arrays of the processes are "boxes" of the global K arrays, so the modes
+    sent from one process to another one form a sub-box defined by 1d
+    arrays of indices (one per dimension). These indices are computed once
+    (by the sender and the receiver) and the modes of one field are exchanged
+    with one ``Alltoallv``.
+
+    The operators have to provide the attributes ``shapeX_seq``,
+    ``shapeK_seq``, ``shapeK_loc``, ``seq_indices_first_K`` and ``dimX_K``.
+
+    """
+
+    def __init__(self, oper_in, oper_out):
+        if tuple(oper_in.dimX_K) != tuple(oper_out.dimX_K):
+            raise ValueError("The operators have to use the same FFT layout")
+
+        self.shapeK_loc_out = tuple(oper_out.shapeK_loc)
+
+        infos_dims = []
+        for index_dim, dimX in enumerate(oper_in.dimX_K):
+            n_in = oper_in.shapeX_seq[dimX]
+            n_out = oper_out.shapeX_seq[dimX]
+            is_half = oper_in.shapeK_seq[index_dim] != n_in
+            infos_dims.append((n_in, n_out, is_half))
+        self._infos_dims = infos_dims
+
+        boxes_in = self._allgather_boxes(oper_in)
+        boxes_out = self._allgather_boxes(oper_out)
+
+        rank = mpi.rank
+        self._indices_send = [
+            self._compute_indices(boxes_in[rank], box_out)
+            for box_out in boxes_out
+        ]
+        self._indices_recv = [
+            self._compute_indices(box_in, boxes_out[rank]) for box_in in boxes_in
+        ]
+        self.sendcounts = np.array(
+            [self._count(indices) for indices in self._indices_send]
+        )
+        self.recvcounts = np.array(
+            [self._count(indices) for indices in self._indices_recv]
+        )
+
+    @staticmethod
+    def _allgather_boxes(oper):
+        box = (tuple(oper.seq_indices_first_K), tuple(oper.shapeK_loc))
+        if mpi.nb_proc == 1:
+            return [box]
+        return mpi.comm.allgather(box)
+
+    @staticmethod
+    def _count(indices):
+        if indices is None:
+            return 0
+        return int(np.prod([src.size for src, _ in indices]))
+
+    def _compute_indices(self, box_in, box_out):
+        """Local indices of the modes sent from an input box to an output box
+
+        Returns a list of tuples (indices_in, indices_out) (one per dimension)
+        or None if there is no mode to be sent.
+
+        """
+        indices = []
+        for start_in, n_loc_in, start_out, n_loc_out, infos_dim in zip(
+            *box_in, *box_out, self._infos_dims
+        ):
+            n_in, n_out, is_half = infos_dim
+            k_adim = _k_adim_from_seq_indices(
+                np.arange(start_in, start_in + n_loc_in), n_in, is_half
+            )
+            n_min = min(n_in, n_out)
+            if is_half:
+                iseqs_out = k_adim
+            else:
+                iseqs_out = k_adim % n_out
+            cond = (
+                (k_adim > -(n_min // 2))
+                & (k_adim <= n_min // 2)
+                & (iseqs_out >= start_out)
+                & (iseqs_out < start_out + n_loc_out)
+            )
+            if not cond.any():
+                return None
+            indices.append((np.flatnonzero(cond), iseqs_out[cond] - start_out))
+        return indices
+
+    def remap(self, field_fft_in, field_fft_out=None):
+        """Fill field_fft_out with the modes of field_fft_in (collective)"""
+        if field_fft_out is None:
+            field_fft_out = np.zeros(self.shapeK_loc_out, dtype=np.complex128)
+        else:
+            field_fft_out.fill(0.0)
+
+        sendbuf = np.empty(self.sendcounts.sum(), dtype=np.complex128)
+        start = 0
+        for indices, count in zip(self._indices_send, self.sendcounts):
+            if count:
+                sendbuf[start : start + count] = field_fft_in[
+                    np.ix_(*[src for src, _ in indices])
+                ].ravel()
+                start += count
+
+        if mpi.nb_proc == 1:
+            recvbuf = sendbuf
+        else:
+            recvbuf = np.empty(self.recvcounts.sum(), dtype=np.complex128)
+            mpi.comm.Alltoallv(
+                [sendbuf, self.sendcounts], [recvbuf, self.recvcounts]
+            )
+        del sendbuf
+
+        start = 0
+        for indices, count in zip(self._indices_recv, self.recvcounts):
+            if count:
+                field_fft_out[np.ix_(*[dst for _, dst in indices])] = recvbuf[
+                    start : start + count
+                ].reshape([dst.size for _, dst in indices])
+                start += count
+        return field_fft_out
+
+
 class MiniOperModifResol:
-    def __init__(self, shape):
+    """Minimal operator to modify the resolution
 
-        self.shape = shape
+    Sequential (pyfftw through :mod:`fluiddyn.calcul.easypyfft`) or, with
+    MPI, based on a distributed fluidfft class (3d only).
+
+    """
+
+    def __init__(self, shape, type_fft=None):
+
+        self.shape = self.shapeX_seq = tuple(shape)
 
         dimension = self.dimension = len(shape)
 
         if dimension not in [2, 3]:
             raise NotImplementedError
 
-        if dimension == 2:
+        if mpi.nb_proc > 1:
+            if dimension == 2:
+                raise NotImplementedError(
+                    "Resolution change with MPI is only implemented in 3d."
+                )
+            self._init_fft_mpi(type_fft)
+        elif dimension == 2:
             ny, nx = shape
             self.oper_fft = FFTW2DReal2Complex(nx, ny)
             self.axes = tuple("xy")
@@ -78,8 +233,45 @@ class MiniOperModifResol:
         self.create_arrayX = self.oper_fft.create_arrayX
         self.create_arrayK = self.oper_fft.create_arrayK
 
+        if mpi.nb_proc == 1:
+            self.shapeX_loc = self.shapeX_seq
+            self.seq_indices_first_X = (0,) * dimension
+            self.gather_Xspace = None
+
+        self.slices_X_loc = tuple(
+            slice(start, start + n_loc)
+            for start, n_loc in zip(self.seq_indices_first_X, self.shapeX_loc)
+        )
+        self._remaps = {}
+
+    def _init_fft_mpi(self, type_fft):
+        from fluidfft import create_fft_object
+        from fluidfft.fft3d.operators import get_simple_3d_mpi_method
+
+        if type_fft is None or type_fft in ("default", "sequential"):
+            type_fft = get_simple_3d_mpi_method()
+
+        nz, ny, nx = self.shape
+        self.oper_fft = oper_fft = create_fft_object(type_fft, nz, ny, nx)
+        self.axes = tuple("xyz")
+        self.shapeX_loc = tuple(oper_fft.get_shapeX_loc())
+        self.seq_indices_first_X = tuple(oper_fft.get_seq_indices_first_X())
+        self.shapeK_loc = tuple(oper_fft.get_shapeK_loc())
+        self.shapeK_seq = tuple(oper_fft.get_shapeK_seq())
+        self.seq_indices_first_K = tuple(oper_fft.get_seq_indices_first_K())
+        self.dimX_K = tuple(oper_fft.get_dimX_K())
+        self.gather_Xspace = oper_fft.gather_Xspace
+
     def fill_field_fft(self, field_spect, field2_spect, oper):
 
+        if mpi.nb_proc > 1:
+            try:
+                remap = self._remaps[id(oper)]
+            except KeyError:
+                remap = self._remaps[id(oper)] = RemapModesMPI(oper, self)
+            remap.remap(field_spect, field2_spect)
+            return
+
         if self.dimension == 2:
             return fill_field_fft_2d(field_spect, field2_spect)
 
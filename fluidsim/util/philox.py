@@ -0,0 +1,169 @@
+"""Counter-based random numbers (Philox)
+=======================================
+
+The random numbers are computed with the counter-based generator Philox4x32-10
+(Salmon et al., "Parallel random numbers: as easy as 1, 2, 3", SC11): each
+random number is a pure function of a counter (here a global index of a mode
+or of a grid point), of a stream number and of a seed. A process can thus
+fill its local part of a field without any communication and the result does
+not depend on the domain decomposition.
+
+.. autofunction:: philox4x32
+
+.. autofunction:: random_uniform_from_counters
+
+.. autofunction:: compute_random_uniform_phys_loc
+
+.. autofunction:: compute_noise_fft
+
+"""
+
+import numpy as np
+
+from transonic import boost, Array
+
+Au64 = Array[np.uint64, "1d"]
+
+
+@boost
+def philox4x32(counters: Au64, stream: np.uint64, seed: np.uint64):
+    """Philox4x32-10 applied on the counters (counters, 0, stream, 0)
+
+    The counters are 64-bit integers split in 2 words of 32 bits. Returns 4
+    arrays of 32-bit integers (stored in uint64 arrays).
+
+    """
+    mask = np.uint64(0xFFFFFFFF)
+    mult0 = np.uint64(0xD2511F53)
+    mult1 = np.uint64(0xCD9E8D57)
+    weyl0 = np.uint64(0x9E3779B9)
+    weyl1 = np.uint64(0xBB67AE85)
+
+    key0 = seed & mask
+    key1 = seed >> np.uint64(32)
+
+    ctr0 = counters & mask
+    ctr1 = counters >> np.uint64(32)
+    ctr2 = (counters & np.uint64(0)) + (stream & mask)
+    ctr3 = (counters & np.uint64(0)) + (stream >> np.uint64(32))
+
+    for _ in range(10):
+        prod0 = mult0 * ctr0
+        prod1 = mult1 * ctr2
+        ctr0, ctr1, ctr2, ctr3 = (
+            (prod1 >> np.uint64(32)) ^ ctr1 ^ key0,
+            prod1 & mask,
+            (prod0 >> np.uint64(32)) ^ ctr3 ^ key1,
+            prod0 & mask,
+        )
+        key0 = (key0 + weyl0) & mask
+        key1 = (key1 + weyl1) & mask
+
+    return ctr0, ctr1, ctr2, ctr3
+
+
+def random_uniform_from_counters(counters, stream=0, seed=42):
+    """Two arrays of random numbers uniformly distributed in [0, 1)
+
+    Each number uses 53 random bits (2 words of 32 bits).
+
+    """
+    counters = np.ascontiguousarray(counters, dtype=np.uint64).ravel()
+    ctr0, ctr1, ctr2, ctr3 = philox4x32(
+        counters, np.uint64(stream), np.uint64(seed)
+    )
+    coef = 1.0 / 9007199254740992.0
+    result0 = ((ctr0 >> 5) * 67108864.0 + (ctr1 >> 6)) * coef
+    result1 = ((ctr2 >> 5) * 67108864.0 + (ctr3 >> 6)) * coef
+    return result0, result1
+
+
+def compute_random_uniform_phys_loc(
+    shapeX_loc, shapeX_seq=None, seq_indices_first_X=None, stream=0, seed=42
+):
+    """Local part of a random field (uniform in [0, 1)) in physical space
+
+    The counters are the indices of the grid points in the global array so
+    that the global field does not depend on the decomposition.
+
+    """
+    shapeX_loc = tuple(shapeX_loc)
+    if shapeX_seq is None:
+        shapeX_seq = shapeX_loc
+    if seq_indices_first_X is None:
+        seq_indices_first_X = (0,) * len(shapeX_loc)
+
+    indices = np.zeros(shapeX_loc, dtype=np.uint64)
+    stride = 1
+    for dim in reversed(range(len(shapeX_loc))):
+        shape = [1] * len(shapeX_loc)
+        shape[dim] = shapeX_loc[dim]
+        start = seq_indices_first_X[dim]
+        indices_dim = np.arange(start, start + shapeX_loc[dim], dtype=np.uint64)
+        indices += np.uint64(stride) * indices_dim.reshape(shape)
+        stride *= shapeX_seq[dim]
+
+    result, _ = random_uniform_from_counters(indices, stream, seed)
+    return result.reshape(shapeX_loc)
+
+
+def _compute_index_modes(iks, nxs):
+    """Global index of the modes from their integer wavenumbers"""
+    index = iks[0].copy()
+    stride = nxs[0] // 2 + 1
+    for ik, n in zip(iks[1:], nxs[1:]):
+        index += stride * (ik % n)
+        stride *= n
+    return index
+
+
+def compute_noise_fft(oper, stream=0, seed=42):
+    """Local part of a random field in spectral space
+
+    The real and imaginary parts of the modes are uniformly distributed in
+    [-0.5, 0.5). The counters are computed from the integer wavenumbers, so
+    that the field does not depend on the decomposition and on the layout of
+    the spectral arrays. The field is Hermitian-consistent (the modes of the
+    planes kx = 0 and kx = nx/2 are equal to the complex conjugate of their
+    symmetric) and its mean is zero.
+
+    Works with the 2d and 3d pseudo-spectral operators.
+
+    """
+    if hasattr(oper, "Kz"):
+        Ks = (oper.Kx, oper.Ky, oper.Kz)
+        deltaks = (oper.deltakx, oper.deltaky, oper.deltakz)
+        nxs = (oper.nx_seq, oper.ny_seq, oper.nz_seq)
+    else:
+        Ks = (oper.KX, oper.KY)
+        deltaks = (oper.deltakx, oper.deltaky)
+        nxs = (oper.nx_seq, oper.ny_seq)
+
+    shapeK = Ks[0].shape
+    iks = [
+        np.rint(np.ravel(K) / deltak).astype(np.int64)
+        for K, deltak in zip(Ks, deltaks)
+    ]
+
+    index = _compute_index_modes(iks, nxs)
+    index_sym = _compute_index_modes([iks[0]] + [-ik for ik in iks[1:]], nxs)
+
+    ikx = iks[0]
+    in_plane = ikx == 0
+    if nxs[0] % 2 == 0:
+        in_plane |= ikx == nxs[0] // 2
+    index_sym = np.where(in_plane, index_sym, index)
+
+    real, imag = random_uniform_from_counters(
+        np.minimum(index, index_sym), stream, seed
+    )
+    real -= 0.5
+    imag -= 0.5
+    imag[index > index_sym] *= -1
+    imag[in_plane & (index == index_sym)] = 0.0
+
+    field_fft = np.empty(real.shape, dtype=np.complex128)
+    field_fft.real = real
+    field_fft.imag = imag
+    field_fft[index == 0] = 0.0
+    return field_fft.reshape(shapeK)
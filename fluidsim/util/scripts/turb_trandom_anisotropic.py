@@ -10,10 +10,12 @@ from math import pi, asin, sin
 import argparse
 import sys
 
-import matplotlib.pyplot as plt
 
 from fluiddyn.util import mpi
 from fluidsim.util.scripts import parse_args
+from fluidsim.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 doc = """Launcher for simulations with the solver ns3d.strat and
 the forcing tcrandom_anisotropic.
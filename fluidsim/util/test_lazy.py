@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import unittest
+from types import ModuleType
+
+import pytest
+
+from fluiddyn.util import mpi
+
+from fluidsim.util.lazy import (
+    LazyModule,
+    lazy_import,
+    register_import_hook,
+    set_lazy_attribute,
+)
+
+heavy_modules = ("matplotlib", "pandas", "xarray", "scipy.signal")
+
+
+def get_imported_modules(code):
+    code += (
+        "\nimport sys\n"
+        f"print(*[name for name in {heavy_modules} if name in sys.modules])"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return process.stdout.split("\n")[-2].split()
+
+
+def test_lazy_import():
+    module = lazy_import("fluidsim.util.test_lazy")
+    assert module is sys.modules[__name__]
+
+    name_module = "fluidsim.util.frequency_modulation"
+    sys.modules.pop(name_module, None)
+    module = lazy_import(name_module)
+    assert isinstance(module, LazyModule)
+    assert name_module not in sys.modules
+    assert module.FrequencyModulatedSignalMaker.__name__ == (
+        "FrequencyModulatedSignalMaker"
+    )
+    assert name_module in sys.modules
+    # the module is cached in the lazy module
+    module_imported = sys.modules.pop(name_module)
+    assert module.FrequencyModulatedSignalMaker is (
+        module_imported.FrequencyModulatedSignalMaker
+    )
+    assert name_module not in sys.modules
+    sys.modules[name_module] = module_imported
+
+    modules_hook = []
+    register_import_hook("fluidsim", modules_hook.append)
+    assert modules_hook == [sys.modules["fluidsim"]]
+
+
+def test_set_lazy_attribute():
+    module = ModuleType("module_for_test")
+    set_lazy_attribute(module, "dedent", "textwrap")
+    assert "dedent" not in module.__dict__
+    assert module.dedent is sys.modules["textwrap"].dedent
+    assert "dedent" in module.__dict__
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        module.missing
+
+
+@unittest.skipIf(mpi.nb_proc > 1, "No subprocess with MPI")
+def test_import_fluidsim_light():
+    code = (
+        "import fluidsim\n"
+        "from fluidsim import load_params_simul\n"
+        "from fluidsim.solvers.ns2d.solver import Simul\n"
+        "params = Simul.create_default_params()"
+    )
+    assert get_imported_modules(code) == []
+
+    # fld.show is available (matplotlib is imported at the first access)
+    code = "import fluidsim\nimport fluiddyn as fld\nfld.show\n"
+    assert "matplotlib" in get_imported_modules(code)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from fluiddyn.util import mpi
+from fluiddyn.calcul.easypyfft import FFTW3DReal2Complex
+
+from .mini_oper_modif_resol import RemapModesMPI, fill_field_fft_3d
+
+
+class FakeOperSlabs:
+    """Sequential operator split in slabs along the first dimension of K
+
+    Mimics the attributes of the distributed fluidfft classes so that the
+    remapping of the modes can be tested without MPI FFT libraries.
+
+    """
+
+    def __init__(self, shape):
+        self.shapeX_seq = shape
+        nz, ny, nx = shape
+        self.shapeK_seq = (nz, ny, nx // 2 + 1)
+        self.dimX_K = (0, 1, 2)
+        nk0_loc, remainder = divmod(nz, mpi.nb_proc)
+        starts = [
+            rank * nk0_loc + min(rank, remainder) for rank in range(mpi.nb_proc)
+        ]
+        if mpi.rank < remainder:
+            nk0_loc += 1
+        start = starts[mpi.rank]
+        self.slice_K0 = slice(start, start + nk0_loc)
+        self.shapeK_loc = (nk0_loc,) + self.shapeK_seq[1:]
+        self.seq_indices_first_K = (start, 0, 0)
+
+
+def _create_field_fft(shape):
+    nz, ny, nx = shape
+    oper_fft = FFTW3DReal2Complex(nx, ny, nz)
+    rng = np.random.default_rng(0)
+    return oper_fft.fft(rng.standard_normal(shape))
+
+
+@pytest.mark.parametrize(
+    "shape_in, shape_out",
+    [
+        ((8, 12, 16), (12, 18, 24)),
+        ((8, 12, 16), (16, 24, 32)),
+        ((12, 18, 24), (8, 12, 16)),
+        ((7, 12, 16), (8, 12, 10)),
+    ],
+)
+def test_remap_modes(shape_in, shape_out):
+    field_fft_in = _create_field_fft(shape_in)
+    nz, ny, nx = shape_out
+    field_fft_out = np.zeros((nz, ny, nx // 2 + 1), dtype=np.complex128)
+    fill_field_fft_3d(field_fft_in, field_fft_out)
+
+    oper_in = FakeOperSlabs(shape_in)
+    oper_out = FakeOperSlabs(shape_out)
+    remap = RemapModesMPI(oper_in, oper_out)
+
+    result = remap.remap(np.ascontiguousarray(field_fft_in[oper_in.slice_K0]))
+    assert result.shape == oper_out.shapeK_loc
+    # allclose because the FFTW plans can differ between the processes
+    assert np.allclose(result, field_fft_out[oper_out.slice_K0])
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from .philox import (
+    philox4x32,
+    compute_random_uniform_phys_loc,
+    compute_noise_fft,
+)
+
+
+@pytest.mark.parametrize(
+    "counter, key, expected",
+    [
+        ((0, 0, 0, 0), (0, 0), (0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8)),
+        (
+            (0xFFFFFFFF,) * 4,
+            (0xFFFFFFFF,) * 2,
+            (0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD),
+        ),
+        (
+            (0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344),
+            (0xA4093822, 0x299F31D0),
+            (0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1),
+        ),
+    ],
+)
+def test_philox4x32_known_answers(counter, key, expected):
+    counters = np.array([counter[0] | counter[1] << 32], dtype=np.uint64)
+    stream = np.uint64(counter[2] | counter[3] << 32)
+    seed = np.uint64(key[0] | key[1] << 32)
+    result = philox4x32(counters, stream, seed)
+    assert tuple(int(words[0]) for words in result) == expected
+
+
+def _create_oper_3d(nz, ny, nx):
+    """Minimal 3d operator (sequential layout of fluidfft)"""
+    deltak = 1.0
+    kz = deltak * np.fft.fftfreq(nz, 1 / nz)
+    ky = deltak * np.fft.fftfreq(ny, 1 / ny)
+    kx = deltak * np.arange(nx // 2 + 1)
+    Kz, Ky, Kx = np.meshgrid(kz, ky, kx, indexing="ij")
+    return SimpleNamespace(
+        Kx=Kx,
+        Ky=Ky,
+        Kz=Kz,
+        deltakx=deltak,
+        deltaky=deltak,
+        deltakz=deltak,
+        nx_seq=nx,
+        ny_seq=ny,
+        nz_seq=nz,
+    )
+
+
+def _split_oper(oper, slices, axes=(0, 1, 2)):
+    """Local part of a 3d operator, possibly with a transposed layout"""
+    return SimpleNamespace(
+        **{
+            key: (
+                np.transpose(value[slices], axes)
+                if isinstance(value, np.ndarray)
+                else value
+            )
+            for key, value in vars(oper).items()
+        }
+    )
+
+
+def test_noise_fft_independent_of_decomposition():
+    shape = (6, 8, 10)
+    oper = _create_oper_3d(*shape)
+    field_fft = compute_noise_fft(oper, stream=3)
+
+    assert field_fft[0, 0, 0] == 0.0
+    # Hermitian symmetry
+    field = np.fft.irfftn(field_fft, shape)
+    assert np.allclose(np.fft.rfftn(field), field_fft)
+
+    for slices in [
+        np.s_[2:5],
+        np.s_[:, 3:7],
+        np.s_[1:4, :, 2:],
+    ]:
+        oper_loc = _split_oper(oper, slices)
+        assert np.array_equal(
+            compute_noise_fft(oper_loc, stream=3), field_fft[slices]
+        )
+
+    oper_loc = _split_oper(oper, np.s_[:, 3:7], axes=(2, 0, 1))
+    assert np.array_equal(
+        compute_noise_fft(oper_loc, stream=3),
+        np.transpose(field_fft[:, 3:7], (2, 0, 1)),
+    )
+
+    assert not np.array_equal(compute_noise_fft(oper, stream=2), field_fft)
+    assert not np.array_equal(
+        compute_noise_fft(oper, stream=3, seed=1), field_fft
+    )
+
+
+def test_random_uniform_phys_loc():
+    shape = (4, 6, 5)
+    field = compute_random_uniform_phys_loc(shape)
+    assert field.min() >= 0.0 and field.max() < 1.0
+    for start in range(shape[0]):
+        field_loc = compute_random_uniform_phys_loc(
+            (1,) + shape[1:], shape, (start, 0, 0)
+        )
+        assert np.array_equal(field_loc, field[start : start + 1])
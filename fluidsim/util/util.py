@@ -21,7 +21,6 @@ import inspect
 import h5netcdf
 import h5py
 import numpy as np
-from rich.progress import track
 
 import fluiddyn as fld
 from fluiddyn.io.redirect_stdout import stdout_redirected
@@ -72,7 +71,7 @@ h5netcdf.File = partial(h5netcdf.File, decode_vlen_strings=True)
 
 def print_memory_usage_seq(message, flush=None):
     mem = get_memory_usage()
-    print(message, f"{mem/1024: 7.3f} Go", flush=flush)
+    mpi.printby0(message, f"{mem/1024: 7.3f} Go", flush=flush)
 
 
 def available_solver_keys():
@@ -461,12 +460,20 @@ def modif_resolution_from_dir(
     print("The new file is saved.")
 
     if PLOT:
+
         sim.output.phys_fields.plot(numfig=0)
         sim2.output.phys_fields.plot(numfig=1)
         fld.show()
 
 
 class StatePhysLike:
+    """Read the fields in a file and change their resolution
+
+    With MPI, each process reads only its part of the fields (hyperslab) and
+    the Fourier modes are redistributed without global arrays.
+
+    """
+
     def __init__(self, path_file, oper, oper2):
         self.path_file = path_file
         self.oper = oper
@@ -478,13 +485,13 @@ class StatePhysLike:
         print_memory_usage_seq("Memory usage after init fields:           ")
 
         self.field2 = oper2.create_arrayX()
-        print(
+        mpi.printby0(
             "size field2:                               "
             f"{self.field2.nbytes / 1024**3:7.3f} Go"
         )
         print_memory_usage_seq("Memory usage after init field2:           ")
         self.field2_spect = oper2.create_arrayK(0)
-        print(
+        mpi.printby0(
             "size field2_spect:                         "
             f"{self.field2_spect.nbytes / 1024**3:7.3f} Go"
         )
@@ -503,19 +510,20 @@ class StatePhysLike:
             self.name_run = h5file.attrs["name_run"]
 
     def get_var(self, key):
-        print(f'get_var("{key}")')
+        mpi.printby0(f'get_var("{key}")')
 
         def start_counter(message):
-            print(f"- {message + '...':30s}", end="", flush=True)
+            mpi.printby0(f"- {message + '...':30s}", end="", flush=True)
             return perf_counter()
 
         def end_counter(t_start):
-            print(f"done in {timedelta(seconds=perf_counter() - t_start)}")
+            mpi.printby0(f"done in {timedelta(seconds=perf_counter() - t_start)}")
 
         t_start = start_counter("reading field from disk")
         with self.h5pack.File(self.path_file, "r") as h5file:
             group_state_phys = h5file["/state_phys"]
-            self.field[:] = group_state_phys[key][...]
+            # only the local part of the field (hyperslab selection)
+            self.field[:] = group_state_phys[key][self.oper.slices_X_loc]
         end_counter(t_start)
 
         t_start = start_counter("forward fft smaller field")
@@ -545,14 +553,15 @@ def modif_resolution_from_dir_memory_efficient(
     Faster and more memory efficient than ``modif_resolution_from_dir`` (but
     not plot).
 
+    Can be run with MPI (3d only): the fields are distributed over the
+    processes, each process reads only its part of the fields and the new
+    file is written collectively (with parallel HDF5 if h5py supports it).
+
     """
     t_start = perf_counter()
 
-    if mpi.nb_proc > 1:
-        raise NotImplementedError
-
     path_file = _path_file_from_time_approx(name_dir, t_approx)
-    print(f"Changing resolution of the state contained in\n{path_file}")
+    mpi.printby0(f"Changing resolution of the state contained in\n{path_file}")
     path_dir = path_file.parent
 
     solver = _import_solver_from_path(path_dir)
@@ -566,7 +575,10 @@ def modif_resolution_from_dir_memory_efficient(
     with h5py.File(path_file, "r") as h5file:
         params = Parameters(hdf5_object=h5file["/info_simul/params"])
 
+    type_fft = None
     try:
+        if mpi.nb_proc > 1:
+            type_fft = params.oper.type_fft
         params.oper.type_fft = "default"
         params.oper.type_fft2d = "sequential"
     except AttributeError:
@@ -590,11 +602,11 @@ def modif_resolution_from_dir_memory_efficient(
 
     from .mini_oper_modif_resol import MiniOperModifResol
 
-    oper = MiniOperModifResol(shape)
+    oper = MiniOperModifResol(shape, type_fft)
     print_memory_usage_seq(
         'Memory usage after init operator "input": ', flush=True
     )
-    oper2 = MiniOperModifResol(shape2)
+    oper2 = MiniOperModifResol(shape2, type_fft)
 
     print_memory_usage_seq('Memory usage after init operator "output":')
     info2 = create_info_simul(info_solver, params2)
@@ -607,8 +619,11 @@ def modif_resolution_from_dir_memory_efficient(
         dir_new_new = f"State_phys_{nx2}x{ny2}"
 
     path_file_out = path_file.parent / dir_new_new / path_file.name
-    path_file_out.parent.mkdir(exist_ok=True)
-    print(f"Saving file {path_file_out.name}...", flush=True)
+    if mpi.rank == 0:
+        path_file_out.parent.mkdir(exist_ok=True)
+    if mpi.nb_proc > 1:
+        mpi.comm.barrier()
+    mpi.printby0(f"Saving file {path_file_out.name}...", flush=True)
     save_file(
         path_file_out,
         state_phys,
@@ -619,16 +634,63 @@ def modif_resolution_from_dir_memory_efficient(
         state_phys.it,
         particular_attr="modif_resolution",
     )
-    print(
+    mpi.printby0(
         f"File {path_file_out.name} saved in:\n{path_file_out.parent}\n"
         f"total duration: {timedelta(seconds=perf_counter() - t_start)}"
     )
 
 
+#: Records saved in stdout_records.bin (see ``params.output.print_stdout``)
+dtype_records_stdout = np.dtype(
+    [
+        ("it", np.int64),
+        ("t", np.float64),
+        ("deltat", np.float64),
+        ("clock_time", np.float64),
+        ("remaining_duration", np.float64),
+    ]
+)
+
+
+def load_records_stdout(path):
+    """Load the records saved in stdout_records.bin (structured array)
+
+    ``path`` can be a result directory or the path of the file.
+
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / "stdout_records.bin"
+    data = path.read_bytes()
+    # the last record may be incomplete
+    nb_records = len(data) // dtype_records_stdout.itemsize
+    return np.frombuffer(
+        data, dtype=dtype_records_stdout, count=nb_records
+    ).copy()
+
+
+def _has_it_line(path_file):
+    with open(path_file, "r") as file:
+        return any(line.startswith("it =") for line in file)
+
+
 def times_start_last_from_path(path):
-    """Return the start and last times from a result directory path."""
+    """Return the start and last times from a result directory path.
+
+    The times are read from stdout.txt or, if this file does not contain any
+    time step (for example because it is buffered), from stdout_records.bin.
+
+    """
 
     path_file = Path(path) / "stdout.txt"
+    path_records = Path(path) / "stdout_records.bin"
+    if path_records.exists() and (
+        not path_file.exists() or not _has_it_line(path_file)
+    ):
+        records = load_records_stdout(path_records)
+        if records.size > 0:
+            return float(records["t"][0]), float(records["t"][-1])
+
     if not path_file.exists():
         print(f"Given path does not exist:\n{path}")
         return 666, 666
@@ -676,8 +738,23 @@ def times_start_end_from_path(path):
 
 
 def get_last_estimated_remaining_duration(path):
-    """Get last estimated remaining duration written in stdout.txt"""
+    """Get last estimated remaining duration written in stdout.txt
+
+    The records saved in stdout_records.bin are used if stdout.txt does not
+    exist.
+
+    """
     path_file = Path(path) / "stdout.txt"
+    path_records = Path(path) / "stdout_records.bin"
+    if not path_file.exists() and path_records.exists():
+        durations = load_records_stdout(path_records)["remaining_duration"]
+        durations = durations[~np.isnan(durations)]
+        if durations.size == 0:
+            raise RuntimeError(
+                f"No estimated remaining duration in file {path_records}"
+            )
+        return str(timedelta(seconds=int(durations[-1])))
+
     if not path_file.exists():
         raise ValueError(f"No file stdout.txt in {path}")
 
@@ -897,7 +974,10 @@ def get_dataframe_from_paths(
 
     from pandas import DataFrame
 
+    from rich.progress import track
+
     values = []
+
     for path in track(paths, "Getting the mean values"):
         values.append(
             get_mean_values_from_path(path, tmin, tmax, use_cache, customize)
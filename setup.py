@@ -128,17 +128,24 @@ if FFTW3:
 def transonize():
 
     paths = [
+        "fluidsim/base/time_stepping/base.py",
         "fluidsim/base/time_stepping/pseudo_spect.py",
         "fluidsim/base/output/increments.py",
+        "fluidsim/base/output/cross_corr3d.py",
         "fluidsim/operators/operators2d.py",
         "fluidsim/operators/operators3d.py",
+        "fluidsim/operators/op_finitediff1d.py",
+        "fluidsim/operators/op_finitediff2d.py",
         "fluidsim/solvers/ns2d/solver.py",
         "fluidsim/solvers/ns3d/strat/solver.py",
         "fluidsim/solvers/ns3d/forcing/watu.py",
         "fluidsim/util/mini_oper_modif_resol.py",
+        "fluidsim/util/philox.py",
         "fluidsim/base/output/spatiotemporal_spectra.py",
         "fluidsim/solvers/ns3d/output/spatiotemporal_spectra.py",
         "fluidsim/solvers/ns2d/output/spatiotemporal_spectra.py",
+        "fluidsim/solvers/ns2d/strat/output/spectra.py",
+        "fluidsim/solvers/ns2d/strat/output/spectra_multidim.py",
     ]
     make_backend_files([here / path for path in paths], backend=TRANSONIC_BACKEND)
 